@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Ham IQ Kayıt Modülü
+Sensörden gelen (num_chirps, num_samples) complex64 frame'lerini
+önceden ayrılmış, bellek eşlemeli (memory-mapped) kayıt dosyalarına yazar
+"""
+
+import os
+import json
+import time
+import queue
+import struct
+import threading
+from datetime import datetime
+
+import numpy as np
+
+# Dosya düzeni:
+#   [0:8]    magic
+#   [8:12]   versiyon (uint32)
+#   [12:16]  JSON başlık uzunluğu (uint32)
+#   [16:24]  yazılmış frame sayısı (uint64) - her frame'den sonra güncellenir
+#   [24:..]  JSON başlık (config, geometri, kapasite)
+#   index    float64[capacity] zaman damgaları
+#   frames   complex64[capacity, num_chirps, num_samples]
+CAPTURE_MAGIC = b'PLUTOCAP'
+CAPTURE_VERSION = 1
+CAPTURE_EXTENSION = '.rcap'
+_PREFIX = struct.Struct('<8sIIQ')
+_ALIGN = 4096
+
+# Dosya başına frame kapasitesi sınırı (dosya boyutu önceden ayrılır)
+MAX_FRAMES_PER_FILE = 10000
+
+
+def _align(offset):
+    """Ofseti sayfa sınırına yuvarla"""
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout(header_len, capacity, num_chirps, num_samples):
+    """Başlık uzunluğundan index/frame ofsetlerini ve dosya boyutunu hesapla"""
+    index_offset = _align(_PREFIX.size + header_len)
+    frames_offset = _align(index_offset + capacity * 8)
+    frame_bytes = num_chirps * num_samples * np.dtype(np.complex64).itemsize
+    total_size = frames_offset + capacity * frame_bytes
+    return index_offset, frames_offset, total_size
+
+
+class CaptureFile:
+    """
+    Tek bir kayıt dosyası (okuma veya yazma)
+
+    Okuma modunda frame'ler memmap üzerinden kopyasız döndürülür.
+    """
+
+    def __init__(self, path, mode='r'):
+        """
+        path: Kayıt dosyası yolu
+        mode: 'r' (salt okunur) veya 'r+' (yazma)
+        """
+        self.path = path
+        self.mode = mode
+
+        with open(path, 'rb') as f:
+            magic, version, header_len, _ = _PREFIX.unpack(f.read(_PREFIX.size))
+            if magic != CAPTURE_MAGIC:
+                raise ValueError(f"Geçersiz kayıt dosyası: {path}")
+            if version != CAPTURE_VERSION:
+                raise ValueError(f"Desteklenmeyen kayıt versiyonu: {version}")
+            self.header = json.loads(f.read(header_len).decode('utf-8'))
+
+        self.config = self.header['config']
+        self.capacity = self.header['capacity']
+        self.num_chirps = self.header['num_chirps']
+        self.num_samples = self.header['num_samples']
+
+        index_offset, frames_offset, _ = _layout(
+            header_len, self.capacity, self.num_chirps, self.num_samples)
+
+        self._prefix = np.memmap(path, dtype=np.uint8, mode=mode,
+                                 offset=0, shape=(_PREFIX.size,))
+        self._count = self._prefix[16:24].view(np.uint64)
+        self._timestamps = np.memmap(path, dtype=np.float64, mode=mode,
+                                     offset=index_offset, shape=(self.capacity,))
+        self._frames = np.memmap(path, dtype=np.complex64, mode=mode,
+                                 offset=frames_offset,
+                                 shape=(self.capacity, self.num_chirps, self.num_samples))
+
+    @classmethod
+    def create(cls, path, config, num_chirps, num_samples, capacity):
+        """
+        Yeni kayıt dosyası oluştur ve diski önceden ayır
+
+        return: 'r+' modunda açılmış CaptureFile
+        """
+        header = json.dumps({
+            'config': config,
+            'num_chirps': int(num_chirps),
+            'num_samples': int(num_samples),
+            'dtype': 'complex64',
+            'capacity': int(capacity),
+            'created': datetime.now().isoformat()
+        }, default=float).encode('utf-8')
+
+        _, _, total_size = _layout(len(header), capacity, num_chirps, num_samples)
+
+        with open(path, 'wb') as f:
+            f.write(_PREFIX.pack(CAPTURE_MAGIC, CAPTURE_VERSION, len(header), 0))
+            f.write(header)
+            f.truncate(total_size)
+            # Gerçek disk ayırma (destekleniyorsa) - yazma sırasında
+            # dosya sistemi blok ayırma gecikmesini önler
+            if hasattr(os, 'posix_fallocate'):
+                try:
+                    os.posix_fallocate(f.fileno(), 0, total_size)
+                except OSError:
+                    pass
+
+        return cls(path, mode='r+')
+
+    def __len__(self):
+        return int(self._count[0])
+
+    @property
+    def full(self):
+        return len(self) >= self.capacity
+
+    @property
+    def timestamps(self):
+        """Yazılmış frame'lerin zaman damgaları (kopyasız görünüm)"""
+        return self._timestamps[:len(self)]
+
+    def read(self, start, stop=None):
+        """
+        Frame aralığını oku (kopyasız memmap görünümü)
+
+        return: (stop - start, num_chirps, num_samples) complex64
+        """
+        count = len(self)
+        if stop is None:
+            stop = start + 1
+        start, stop, _ = slice(start, stop).indices(count)
+        return self._frames[start:stop]
+
+    def read_time_range(self, t_start, t_end):
+        """Zaman aralığındaki frame'leri oku: (timestamps, frames)"""
+        ts = self.timestamps
+        i0 = int(np.searchsorted(ts, t_start, side='left'))
+        i1 = int(np.searchsorted(ts, t_end, side='right'))
+        return ts[i0:i1], self._frames[i0:i1]
+
+    def append(self, frame, timestamp):
+        """Frame'i bir sonraki boş yuvaya yaz (yalnızca yazıcı iş parçacığı)"""
+        idx = len(self)
+        if idx >= self.capacity:
+            raise ValueError("Kayıt dosyası dolu")
+        self._frames[idx] = frame
+        self._timestamps[idx] = timestamp
+        # Sayaç en son güncellenir: canlı dosyayı okuyan süreç
+        # yarım yazılmış frame görmez
+        self._count[0] = idx + 1
+
+    def flush(self):
+        if self.mode != 'r':
+            self._frames.flush()
+            self._timestamps.flush()
+            self._prefix.flush()
+
+    def close(self):
+        self.flush()
+        del self._frames, self._timestamps, self._count, self._prefix
+
+
+class CaptureRecorder:
+    """
+    Arka planda çalışan ham IQ kaydedici
+
+    write() çağrısı yalnızca bir kuyruğa referans ekler; kopyalama ve disk
+    yazımı ayrı bir iş parçacığında yapılır, böylece veri alım döngüsüne
+    gecikme eklenmez. Kuyruk dolarsa frame düşürülür ve sayılır. Yazıcı
+    hata verirse kayıt durur (error) ve write() frame kabul etmez.
+    """
+
+    def __init__(self, directory, config, frames_per_file=600, queue_size=64,
+                 flush_interval=1.0):
+        """
+        directory: Kayıt dosyalarının yazılacağı dizin
+        config: İşleme konfigürasyonu (başlığa yazılır)
+        frames_per_file: Dosya başına frame kapasitesi (1-MAX_FRAMES_PER_FILE)
+        queue_size: Bekleyen frame kuyruğu boyutu
+        flush_interval: Diske flush aralığı (saniye)
+        """
+        if (isinstance(frames_per_file, bool) or not isinstance(frames_per_file, int) or
+                not 1 <= frames_per_file <= MAX_FRAMES_PER_FILE):
+            raise ValueError(f"frames_per_file 1-{MAX_FRAMES_PER_FILE} arası tam sayı olmalı")
+        self.directory = directory
+        self.config = dict(config)
+        self.num_chirps = int(config['num_chirps'])
+        self.num_samples = int(config['num_samples'])
+        self.frames_per_file = frames_per_file
+        self.flush_interval = flush_interval
+
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self.files = []
+        self.error = None
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._current = None
+        self._file_index = 0
+        self._session = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self._running = False
+        self._thread = None
+
+        os.makedirs(directory, exist_ok=True)
+
+    def start(self):
+        """Yazıcı iş parçacığını başlat"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+        print(f"✓ IQ kaydı başladı: {self.directory}")
+
+    def stop(self, timeout=5.0):
+        """Kuyruktaki frame'leri yaz ve dosyayı kapat (en fazla timeout saniye bekler)"""
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._running = False
+        # Yazıcı hata ile durduysa kuyruğu okuyan kalmamıştır
+        if thread.is_alive():
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass  # Yazıcı _running'i kuyruk boşalınca da görür
+            thread.join(timeout)
+        print(f"✓ IQ kaydı durdu: {self.frames_written} frame, "
+              f"{self.frames_dropped} düşürülen")
+
+    def write(self, frame, timestamp=None):
+        """
+        Frame'i kayda ekle (bloklamaz)
+
+        frame: (num_chirps, num_samples) kompleks array. Kuyruğa referans
+               olarak eklenir; çağıran taraf sonradan üzerine yazmamalıdır.
+        return: Frame kuyruğa alındıysa True
+        """
+        if not self._running:
+            return False
+        if timestamp is None:
+            timestamp = time.time()
+        try:
+            self._queue.put_nowait((frame, timestamp))
+            return True
+        except queue.Full:
+            self.frames_dropped += 1
+            return False
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def _open_next_file(self):
+        if self._current is not None:
+            self._current.close()
+        name = f"capture_{self._session}_{self._file_index:04d}{CAPTURE_EXTENSION}"
+        path = os.path.join(self.directory, name)
+        self._current = CaptureFile.create(path, self.config, self.num_chirps,
+                                           self.num_samples, self.frames_per_file)
+        self._file_index += 1
+        self.files.append(path)
+
+    def _append(self, frame, timestamp):
+        if self._current is None or self._current.full:
+            self._open_next_file()
+
+        frame = np.asarray(frame).reshape(self.num_chirps, self.num_samples)
+        self._current.append(frame, timestamp)
+        self.frames_written += 1
+
+    def _writer_loop(self):
+        try:
+            self._write_queue()
+        except Exception as e:
+            # Kayıt durur: write() frame almaz, stop() yazıcıyı beklemez
+            self.error = str(e)
+            self._running = False
+            print(f"✗ IQ kaydı hatası ({self.directory}): {e}")
+        finally:
+            if self._current is not None:
+                self._current.close()
+                self._current = None
+
+    def _write_queue(self):
+        last_flush = time.time()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if not self._running:
+                    break
+                continue
+            if item is None:
+                break
+            self._append(*item)
+
+            now = time.time()
+            if now - last_flush >= self.flush_interval:
+                self._current.flush()
+                last_flush = now
+
+        # Durdurma sinyalinden sonra (write() ile yarışan) kuyruğa girenler
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                self._append(*item)
+
+    def get_status(self):
+        return {
+            'active': self._running,
+            'directory': self.directory,
+            'error': self.error,
+            'frames_written': self.frames_written,
+            'frames_dropped': self.frames_dropped,
+            'queue_depth': self.queue_depth,
+            'files': list(self.files)
+        }
+
+
+def list_captures(directory):
+    """Dizindeki kayıt dosyalarını sıralı döndür"""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory)
+                  if name.endswith(CAPTURE_EXTENSION))
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Kullanım: python3 capture_recorder.py <kayıt.rcap>")
+        sys.exit(1)
+
+    capture = CaptureFile(sys.argv[1])
+    ts = capture.timestamps
+    print(f"Dosya: {capture.path}")
+    print(f"  Frame: {len(capture)} / {capture.capacity}")
+    print(f"  Geometri: {capture.num_chirps} x {capture.num_samples}")
+    if len(ts) > 1:
+        print(f"  Süre: {ts[-1] - ts[0]:.2f} s")
+    print(f"  Config: {capture.config}")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+CFAR Kabadan İnceye Piramit Karşılaştırması
+Sahne simülatörüyle üretilen frame'lerde tam harita CFAR ile piramit
+CFAR'ın süresini ve piramidin kaba seviyede kaçırdığı tespit oranını ölçer
+
+Örnek:
+    python3 cfar_benchmark.py --geometries 128x256,256x1024,512x2048 --levels 1,2,3
+    python3 cfar_benchmark.py --frames 50 --coarse-pfa 1e-3 --json sonuc.json
+    python3 cfar_benchmark.py --geometries 512x2048 --levels 1 --workers 4
+"""
+
+import sys
+import json
+import time
+import argparse
+import contextlib
+import io
+
+import numpy as np
+
+from signal_processor import FMCWProcessor
+from scene_simulator import SceneSimulator, PointTarget
+
+
+def _median_ms(values):
+    return float(np.median(values)) * 1000 if values else None
+
+
+def make_scene(config, num_targets, seed):
+    """Rastgele mesafe, hız ve genlikte (zayıftan güçlüye) hedefler + statik yankı"""
+    rng = np.random.default_rng(seed)
+    max_range = 0.9 * (config['num_samples'] // 2) * 3e8 / (2 * config['chirp_bandwidth'])
+    max_velocity = 0.8 * config['num_chirps'] / 2 * \
+        3e8 / (2 * config['center_freq'] * config['chirp_duration'] * config['num_chirps'])
+    targets = [PointTarget(rng.uniform(0.1, 0.9) * max_range,
+                           rng.uniform(-max_velocity, max_velocity),
+                           10 ** rng.uniform(-1.7, -0.5))
+               for _ in range(num_targets)]
+    clutter = [(rng.uniform(0.05, 0.95) * max_range, 10 ** rng.uniform(-1, 0))
+               for _ in range(3)]
+    return SceneSimulator(config, targets, clutter, noise_std=1.0, seed=seed)
+
+
+def _cluster_missed(processor, full, coarse, eps=1.5):
+    """Tam CFAR kümelerinden piramit sonucunda karşılığı olmayanların sayısı"""
+    found = processor.cluster_detections(coarse)
+    missed = 0
+    for r, d, _, _ in processor.cluster_detections(full):
+        if not any(abs(r - fr) <= eps and abs(d - fd) <= eps for fr, fd, _, _ in found):
+            missed += 1
+    return missed
+
+
+def run_geometry(num_chirps, num_samples, levels, frames, num_targets, coarse_pfa, seed,
+                 workers=1):
+    config = {
+        'sample_rate': 2e6,
+        'chirp_bandwidth': 1e9,
+        'chirp_duration': num_samples / 2e6,
+        'num_chirps': num_chirps,
+        'num_samples': num_samples,
+        'center_freq': 2.45e9,
+        'cfar_pyramid_pfa': coarse_pfa,
+        'parallel_workers': workers,
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor = FMCWProcessor(config)
+
+    stats = {level: {'cfar': [], 'cluster': [], 'detections': 0, 'missed': [],
+                     'clusters': 0, 'clusters_missed': 0}
+             for level in [0] + levels}
+
+    for i in range(frames):
+        scene = make_scene(config, num_targets, seed + i)
+        rd_frame = processor.process_frame_power(scene.frame())
+        full = None
+        for level in [0] + levels:
+            # Her seviye piramidi kendisi kursun diye frame'i yeniden sar
+            frame = type(rd_frame)(power=rd_frame.power, looks=rd_frame.looks)
+            start = time.perf_counter()
+            detections = processor.cfar_detector(frame, levels=level)
+            stats[level]['cfar'].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            processor.cluster_detections(detections)
+            stats[level]['cluster'].append(time.perf_counter() - start)
+            stats[level]['detections'] += len(detections)
+
+            if level == 0:
+                full = detections
+                stats[0]['clusters'] += len(processor.cluster_detections(full))
+            else:
+                found = {(r, d) for r, d, _ in detections}
+                stats[level]['missed'].extend(snr for r, d, snr in full if (r, d) not in found)
+                stats[level]['clusters_missed'] += _cluster_missed(processor, full, detections)
+
+    results = []
+    for level in [0] + levels:
+        s = stats[level]
+        full_count = stats[0]['detections']
+        full_clusters = stats[0]['clusters']
+        results.append({
+            'geometry': f'{num_chirps}x{num_samples}',
+            'levels': level,
+            'cfar_ms': _median_ms(s['cfar']),
+            'cluster_ms': _median_ms(s['cluster']),
+            'detections_per_frame': s['detections'] / frames,
+            'coarse_miss_rate': (len(s['missed']) / full_count if level and full_count else
+                                 (0.0 if level else None)),
+            # Kaçan hücrelerin en yüksek SNR'ı: eşiğe yakınsa yalnızca sınırdaki
+            # zayıf hücreler kaçıyordur
+            'missed_snr_max': max(s['missed'], default=None),
+            'cluster_miss_rate': (s['clusters_missed'] / full_clusters if level and full_clusters
+                                  else (0.0 if level else None)),
+        })
+    return results
+
+
+def _fmt(value, spec='.2f'):
+    return '-' if value is None else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tam harita / piramit CFAR karşılaştırması')
+    parser.add_argument('--geometries', default='128x256,256x1024,512x2048',
+                        help='Virgülle ayrılmış CHIRPxÖRNEK frame boyutları')
+    parser.add_argument('--levels', default='1,2,3', help='Denenecek piramit seviyeleri')
+    parser.add_argument('--frames', type=int, default=20, help='Geometri başına frame')
+    parser.add_argument('--targets', type=int, default=6, help='Frame başına hedef sayısı')
+    parser.add_argument('--coarse-pfa', type=float, default=1e-2,
+                        help='Kaba seviye yanlış alarm oranı (cfar_pyramid_pfa)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Tam harita CFAR döşeme iş parçacıkları (parallel_workers)')
+    parser.add_argument('--json', help='Sonuçları JSON dosyasına yaz')
+    args = parser.parse_args()
+
+    levels = [int(n) for n in args.levels.split(',')]
+    print(f"{'geometri':>10} {'seviye':>6} {'cfar_ms':>8} {'küme_ms':>8} "
+          f"{'tespit':>7} {'hücre_kaçan':>11} {'küme_kaçan':>10} {'kaçan_snr':>9}")
+
+    results = []
+    for geometry in args.geometries.split(','):
+        num_chirps, num_samples = (int(n) for n in geometry.lower().split('x'))
+        for r in run_geometry(num_chirps, num_samples, levels, args.frames,
+                              args.targets, args.coarse_pfa, args.seed, args.workers):
+            results.append(r)
+            print(f"{r['geometry']:>10} {r['levels']:>6} {_fmt(r['cfar_ms']):>8} "
+                  f"{_fmt(r['cluster_ms']):>8} {r['detections_per_frame']:>7.1f} "
+                  f"{_fmt(r['coarse_miss_rate'], '.3f'):>11} "
+                  f"{_fmt(r['cluster_miss_rate'], '.3f'):>10} "
+                  f"{_fmt(r['missed_snr_max'], '.1f'):>9}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'frames': args.frames, 'targets': args.targets, 'workers': args.workers,
+                       'coarse_pfa': args.coarse_pfa, 'results': results}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
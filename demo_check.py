@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Demo Sınıflandırma Kontrolü
+Demo sahne dizisini (Yok, Oturma, Ayakta, Yürüme, Yatma) sunucunun kullandığı
+işleme zincirinden ve anahtarlı modelden geçirir; her aktivitenin kendisi
+olarak sınıflandırıldığını doğrular. Doğruluğu --min-accuracy altında kalan
+aktivite varsa çıkış kodu 1'dir.
+
+Örnek:
+    python3 demo_check.py
+    python3 demo_check.py --rate 10 --cycles 3 --min-accuracy 0.9
+"""
+
+import sys
+import argparse
+import contextlib
+import io
+from collections import Counter
+
+from signal_processor import FMCWProcessor
+from scene_simulator import activity_scene
+from dsp_worker import process_raw_frame
+from model_manager import ModelManager
+from prediction_cache import configure_cache
+from sensor_pipeline import DEFAULT_CONFIG, DEMO_CONFIG, DEMO_SCENE_SECONDS, ACTIVITY_LABELS
+from train_model import ActivityClassifier
+
+
+def run_demo(classifier, config, rate, cycles, seed):
+    """
+    Demo döngüsünün sahne sırası: ilk boş sahnede statik yankı öğrenilir ve
+    sabitlenir (sensor_pipeline._demo_loop ile aynı), ardından her aktivite
+    cycles kez oynatılır
+
+    return: {aktivite: Counter(tahmin)}
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor = FMCWProcessor(config)
+    frames_per_scene = max(1, int(DEMO_SCENE_SECONDS * rate))
+    predictions = {activity: Counter() for activity in ACTIVITY_LABELS}
+
+    scene = None
+    for frame_index in range(frames_per_scene * (1 + len(ACTIVITY_LABELS) * cycles)):
+        if frame_index % frames_per_scene == 0:
+            if frame_index == frames_per_scene and config['clutter_alpha'] > 0:
+                processor.reconfigure(dict(processor.config, clutter_freeze=1))
+            activity = ACTIVITY_LABELS[(frame_index // frames_per_scene) %
+                                       len(ACTIVITY_LABELS)]
+            scene = activity_scene(activity, config, seed=seed + frame_index)
+
+        _, record = process_raw_frame(processor, classifier, scene.frame(),
+                                      timestamp=frame_index / rate)
+        scene.step(max(0.0, 1.0 / rate - scene.frame_duration))
+        # İlk boş sahne yalnızca arka plan kalibrasyonu içindir
+        if frame_index >= frames_per_scene:
+            predictions[activity][record['activity']] += 1
+    return predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Demo aktivitelerinin sınıflandırma kontrolü')
+    parser.add_argument('--rate', type=float, default=1.0, help='Demo frame hızı (Hz)')
+    parser.add_argument('--cycles', type=int, default=2, help='Aktivite dizisinin tekrar sayısı')
+    parser.add_argument('--min-accuracy', type=float, default=0.8,
+                        help='Aktivite başına en düşük doğru sınıflandırma oranı')
+    parser.add_argument('--models', default='models', help='Anahtarlı model dizini')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    manager = ModelManager(args.models)
+    manager.start()
+    if not manager.wait():
+        print(f"✗ Model hazırlanamadı: {manager.error}")
+        return 1
+    classifier = ActivityClassifier()
+    _, classifier.model, classifier.scaler = manager.current
+
+    config = dict(DEFAULT_CONFIG, **DEMO_CONFIG)
+    classifier.cache = configure_cache(config)
+    predictions = run_demo(classifier, config, args.rate, args.cycles, args.seed)
+
+    failed = []
+    print(f"{'aktivite':>8} {'doğru':>6} {'toplam':>6} {'oran':>5}  tahminler")
+    for activity, counts in predictions.items():
+        total = sum(counts.values())
+        accuracy = counts[activity] / total if total else 0.0
+        if accuracy < args.min_accuracy:
+            failed.append(activity)
+        summary = ', '.join(f'{name}: {n}' for name, n in counts.most_common())
+        print(f"{activity:>8} {counts[activity]:>6} {total:>6} {accuracy:>5.2f}  {summary}")
+
+    if failed:
+        print(f"✗ Eşik ({args.min_accuracy:.2f}) altında: {', '.join(failed)}")
+        return 1
+    print("✓ Tüm demo aktiviteleri doğru sınıflandırıldı")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Süreç Havuzunda DSP İşleme
+Ham frame'ler ve Range-Doppler haritaları paylaşımlı bellek üzerinden
+aktarılır; web sürecine yalnızca küçük sonuç kayıtları döner
+"""
+
+import os
+import sys
+import time
+import queue
+import threading
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from metrics import STAGE_LATENCY, FRAMES_DROPPED, WORKER_RESTARTS
+from tracing import TRACER
+
+
+def process_raw_frame(processor, classifier, frame, render_image=None, timestamp=None,
+                      classify=True):
+    """
+    Tek frame için tüm işleme zinciri
+
+    timestamp: Frame'in alındığı zaman (mikro-Doppler STFT sürekliliği için)
+    classify: False ise özellik çıkarımı ve tahmin atlanır (activity ve
+              confidence None; QoS ile her N frame'de bir sınıflandırma)
+
+    return: (RangeDopplerFrame, sonuç kaydı)
+        kayıt: targets, activity, confidence, num_detections, image, timings,
+               prediction_cached, prediction_saved, map_extent
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    rd_frame = processor.process_frame_power(frame)
+    timings['process_frame'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    detections = processor.cfar_detector(rd_frame)
+    timings['cfar_detector'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    clusters = processor.cluster_detections(detections)
+    timings['cluster_detections'] = time.perf_counter() - start
+
+    targets = []
+    physical_targets = []
+    for r, d, snr, count in clusters:
+        distance, velocity = processor.range_doppler_to_physical(r, d)
+        targets.append({
+            'distance': float(distance),
+            'velocity': float(velocity),
+            'snr': float(snr)
+        })
+        physical_targets.append((distance, velocity, snr, count))
+
+    start = time.perf_counter()
+    micro_doppler = processor.micro_doppler_features(clusters, timestamp)
+    timings['micro_doppler'] = time.perf_counter() - start
+
+    # Özellikler ve görüntü yalnızca ROI üzerinden (mesafe kapısı kapalıysa tüm harita)
+    roi_map = processor.roi_view(rd_frame)
+
+    pred_name = confidence = cache = None
+    if classify:
+        start = time.perf_counter()
+        features = classifier.extract_features(roi_map, physical_targets, micro_doppler)
+        timings['extract_features'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        pred_class, pred_name, confidence = classifier.predict(features)
+        timings['predict'] = time.perf_counter() - start
+        confidence = float(confidence)
+        cache = classifier.cache
+
+    image = None
+    if render_image is not None:
+        start = time.perf_counter()
+        image = render_image(roi_map, processor.roi_extent())
+        timings['render_range_doppler_image'] = time.perf_counter() - start
+
+    return rd_frame, {
+        'targets': targets,
+        'activity': pred_name,
+        'confidence': confidence,
+        'num_detections': len(detections),
+        'image': image,
+        'timings': timings,
+        'prediction_cached': None if cache is None else cache.last_hit,
+        'prediction_saved': 0.0 if cache is None else cache.last_saved,
+        'map_extent': processor.map_extent()
+    }
+
+
+def _attach(name):
+    """Web sürecinin oluşturduğu paylaşımlı belleğe bağlan (sahiplik almadan)"""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+class FrameSlots:
+    """
+    Sensör başına paylaşımlı bellek yuvaları
+
+    input:  complex64[num_slots, num_chirps, num_samples]  ham frame
+    output: float32[num_slots, num_chirps, num_samples//2] Range-Doppler (dB)
+
+    Bir yuva, frame gönderildiğinden sonucu işlenene kadar meşguldür.
+    """
+
+    def __init__(self, num_slots, num_chirps, num_samples):
+        self.num_slots = num_slots
+        self.frame_shape = (num_chirps, num_samples)
+        self.map_shape = (num_chirps, num_samples // 2)
+
+        self._input = shared_memory.SharedMemory(
+            create=True, size=num_slots * num_chirps * num_samples * 8)
+        self._output = shared_memory.SharedMemory(
+            create=True, size=num_slots * num_chirps * (num_samples // 2) * 4)
+        self.frames = np.ndarray((num_slots,) + self.frame_shape, dtype=np.complex64,
+                                 buffer=self._input.buf)
+        self.maps = np.ndarray((num_slots,) + self.map_shape, dtype=np.float32,
+                               buffer=self._output.buf)
+
+        self._free = queue.Queue()
+        for i in range(num_slots):
+            self._free.put(i)
+
+    @property
+    def input_name(self):
+        return self._input.name
+
+    @property
+    def output_name(self):
+        return self._output.name
+
+    def acquire(self):
+        """Boş yuva al (yoksa None)"""
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            return None
+
+    def release(self, slot):
+        self._free.put(slot)
+
+    @property
+    def busy(self):
+        """Sonucu beklenen (gönderilmiş) yuva sayısı"""
+        return self.num_slots - self._free.qsize()
+
+    def map_view(self, slot, shape):
+        """Yuvadaki Range-Doppler haritasının kopyasız görünümü"""
+        return self.maps[slot, :shape[0], :shape[1]]
+
+    def close(self):
+        del self.frames, self.maps
+        for shm in (self._input, self._output):
+            shm.close()
+            shm.unlink()
+
+
+def _worker_main(tasks, results):
+    """İşçi süreç: görevleri al, işle, sonuç kaydını gönder"""
+    from signal_processor import FMCWProcessor
+    from train_model import ActivityClassifier
+    from rd_render import render_range_doppler_png
+    from prediction_cache import configure_cache
+    from model_manager import FallbackModel
+
+    # Web süreci modeli hazırlayana kadar yedek model; görevdeki 'model'
+    # (sürüm, dosya) değişince dosyadan yüklenir
+    classifier = ActivityClassifier()
+    classifier.model = classifier.scaler = FallbackModel()
+    model = None
+
+    processors = {}
+    caches = {}
+    attachments = {}
+    sensor_buffers = {}
+
+    def view(name, shape, dtype):
+        if name not in attachments:
+            attachments[name] = _attach(name)
+        return np.ndarray(shape, dtype=dtype, buffer=attachments[name].buf)
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+
+        config = task['config']
+        num_slots = task['num_slots']
+        # Yuva geometrisi; Doppler FFT'ye giren chirp sayısı QoS ile daha az olabilir
+        num_chirps, num_samples = task['frame_shape']
+        slot = task['slot']
+
+        result = {'sensor_id': task['sensor_id'], 'seq': task['seq'], 'slot': slot,
+                  'input': task['input'], 'config_version': task['config_version'],
+                  'timestamp': task['timestamp'], 'submitted': task.get('submitted')}
+
+        # İzleme web sürecinde açıksa span'lar toplanıp sonuçla geri gönderilir
+        TRACER.enabled = task.get('trace', False)
+        with TRACER.frame(task['sensor_id'], task['seq'], retain=False) as scope:
+            if task.get('submitted') is not None:
+                TRACER.add_span('queue_wait', task['submitted'], time.perf_counter())
+            try:
+                # Sensör başına tek işlemci; config sürümü değişince yeniden kurulur
+                version, processor = processors.get(task['sensor_id'], (None, None))
+                if version != task['config_version']:
+                    if processor is None:
+                        processor = FMCWProcessor(config)
+                    else:
+                        processor.reconfigure(config)
+                    processors[task['sensor_id']] = (task['config_version'], processor)
+
+                    # Sınıflandırma önbelleği de sensör başına (model ortak)
+                    caches[task['sensor_id']] = configure_cache(
+                        config, caches.get(task['sensor_id']))
+                if task.get('model') != model:
+                    classifier.load(task['model'][1])
+                    model = task['model']
+                    # Önbellekler eski modelin tahminlerini tutar
+                    for cache in caches.values():
+                        if cache is not None:
+                            cache.clear()
+                classifier.cache = caches.get(task['sensor_id'])
+
+                # Sensörün yuvaları yeniden oluşturulduysa eski eşlemeleri bırak
+                buffers = (task['input'], task['output'])
+                previous = sensor_buffers.get(task['sensor_id'])
+                if previous is not None and previous != buffers:
+                    for name in previous:
+                        shm = attachments.pop(name, None)
+                        if shm is not None:
+                            shm.close()
+                sensor_buffers[task['sensor_id']] = buffers
+
+                frames = view(task['input'], (num_slots, num_chirps, num_samples), np.complex64)
+                maps = view(task['output'], (num_slots, num_chirps, num_samples // 2), np.float32)
+
+                render_image = render_range_doppler_png if task['render'] else None
+                processor.set_quality(*task.get('quality', (0, None)))
+                rd_frame, record = process_raw_frame(
+                    processor, classifier, frames[slot],
+                    render_image, timestamp=task['timestamp'],
+                    classify=task.get('classify', True))
+
+                h, w = rd_frame.shape
+                maps[slot, :h, :w] = rd_frame.db
+                record['map_shape'] = (h, w)
+                result.update(record)
+            except Exception as e:
+                result['error'] = str(e)
+        if scope.spans:
+            result['spans'] = scope.spans
+
+        results.put(result)
+
+    for shm in attachments.values():
+        shm.close()
+
+
+class ProcessingPool:
+    """
+    DSP işçi süreç havuzu
+
+    Tüm sensörler tek havuzu paylaşır; sonuçlar bir dağıtıcı iş parçacığı
+    tarafından sensör kimliğine göre kayıtlı işleyiciye iletilir.
+
+    Her sensör kayıtta tek bir işçiye bağlanır (en az sensörlü işçi) ve
+    frame'leri yalnızca o işçinin kuyruğuna gider. Zamansal durum (statik
+    yankı arka planı, entegrasyon halkası, mikro-Doppler izleri) işçide
+    tutulduğundan sensörün tüm frame'leri sırayla aynı işlemciden geçer;
+    paralellik sensörler arasındadır.
+
+    Dağıtıcı işçileri CHECK_INTERVAL saniyede bir denetler; çöken işçi aynı
+    indeksle yeni kuyrukla yeniden başlatılır (sensör atamaları korunur) ve
+    bağlı sensörlere bildirilir: kuyruktaki frame'ler kaybolmuştur, sonuçları
+    hiç gelmeyecek yuvalar sensör tarafında yenilenmelidir.
+    """
+
+    CHECK_INTERVAL = 1.0
+
+    def __init__(self, num_workers=None):
+        if num_workers is None:
+            num_workers = max(1, (os.cpu_count() or 2) - 1)
+        self.num_workers = num_workers
+
+        self._ctx = multiprocessing.get_context('spawn')
+        self._tasks = []
+        self._results = None
+        self._workers = []
+        self._handlers = {}
+        self._restart_handlers = {}
+        self._assignment = {}
+        self._dispatcher = None
+        self.running = False
+
+    def start(self):
+        if self.running:
+            return
+        self._tasks = [self._ctx.Queue() for _ in range(self.num_workers)]
+        self._results = self._ctx.Queue()
+        self._workers = [self._spawn(index) for index in range(self.num_workers)]
+
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+        self._dispatcher.start()
+        self.running = True
+        print(f"✓ DSP süreç havuzu başlatıldı: {self.num_workers} işçi")
+
+    def stop(self):
+        if not self.running:
+            return
+        self.running = False
+        for tasks in self._tasks:
+            tasks.put(None)
+        for worker in self._workers:
+            worker.join(timeout=5)
+        self._workers = []
+        self._results.put(None)
+        self._dispatcher.join()
+
+    def _spawn(self, index):
+        worker = self._ctx.Process(target=_worker_main,
+                                   args=(self._tasks[index], self._results),
+                                   daemon=True)
+        worker.start()
+        return worker
+
+    def register(self, sensor_id, handler, on_restart=None):
+        """
+        handler(result) sonuçları dağıtıcı iş parçacığında çağrılır
+        on_restart() sensörün işçisi çöküp yeniden başlatıldığında çağrılır
+        (dağıtıcı iş parçacığında)
+
+        Sensör ilk kayıtta bir işçiye atanır; yeniden kayıtta aynı işçide kalır.
+        """
+        self._handlers[sensor_id] = handler
+        if on_restart is not None:
+            self._restart_handlers[sensor_id] = on_restart
+        self.worker_of(sensor_id)
+
+    def unregister(self, sensor_id):
+        self._handlers.pop(sensor_id, None)
+        self._restart_handlers.pop(sensor_id, None)
+
+    def worker_of(self, sensor_id):
+        """Sensörün bağlı olduğu işçinin indeksi (yoksa en az yüklü işçiye ata)"""
+        worker = self._assignment.get(sensor_id)
+        if worker is None:
+            load = [0] * self.num_workers
+            for index in self._assignment.values():
+                load[index] += 1
+            worker = self._assignment[sensor_id] = load.index(min(load))
+        return worker
+
+    def submit(self, task):
+        self._tasks[self.worker_of(task['sensor_id'])].put(task)
+
+    @property
+    def queue_depth(self):
+        try:
+            return sum(tasks.qsize() for tasks in self._tasks)
+        except (NotImplementedError, AttributeError):
+            return 0
+
+    def _check_workers(self):
+        """Çöken işçileri yeniden başlat ve bağlı sensörlere bildir"""
+        for index, worker in enumerate(self._workers):
+            if worker.is_alive() or not self.running:
+                continue
+            print(f"✗ DSP işçisi {index} durdu (çıkış kodu {worker.exitcode}), "
+                  f"yeniden başlatılıyor")
+            WORKER_RESTARTS.labels(index).inc()
+            # Ölü işçinin kuyruğundaki görevler kayboldu; kuyruk bırakılır
+            tasks = self._tasks[index]
+            self._tasks[index] = self._ctx.Queue()
+            tasks.cancel_join_thread()
+            tasks.close()
+            self._workers[index] = self._spawn(index)
+
+            for sensor_id, assigned in list(self._assignment.items()):
+                callback = self._restart_handlers.get(sensor_id)
+                if assigned != index or callback is None:
+                    continue
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"[{sensor_id}] İşçi yeniden başlatması işlenemedi: {e}")
+
+    def _dispatch_loop(self):
+        next_check = time.monotonic() + self.CHECK_INTERVAL
+        while True:
+            now = time.monotonic()
+            if now >= next_check:
+                self._check_workers()
+                next_check = now + self.CHECK_INTERVAL
+            try:
+                result = self._results.get(timeout=next_check - now)
+            except queue.Empty:
+                continue
+            if result is None:
+                break
+
+            for stage, duration in result.get('timings', {}).items():
+                STAGE_LATENCY.labels(stage).observe(duration)
+
+            handler = self._handlers.get(result['sensor_id'])
+            if handler is None:
+                FRAMES_DROPPED.labels(result['sensor_id'], 'orphan').inc()
+                continue
+            try:
+                handler(result)
+            except Exception as e:
+                print(f"[{result['sensor_id']}] Sonuç işlenemedi: {e}")
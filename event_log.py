@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Kalıcı Olay Kaydı
+Aktivite geçişleri, hedef izi özetleri ve periyodik doluluk örnekleri
+WAL modundaki bir SQLite veritabanına arka planda toplu olarak yazılır
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+from metrics import stage_timer
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_segments (
+    sensor_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,        -- geçiş anı (segmentin sonu)
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    activity TEXT NOT NULL,
+    next_activity TEXT,             -- NULL: boru hattı durdu
+    frames INTEGER NOT NULL,
+    confidence_mean REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS activity_segments_time
+    ON activity_segments (sensor_id, timestamp);
+CREATE INDEX IF NOT EXISTS activity_segments_activity
+    ON activity_segments (sensor_id, activity, timestamp);
+
+CREATE TABLE IF NOT EXISTS track_summaries (
+    sensor_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,        -- izin bittiği an
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    frames INTEGER NOT NULL,
+    range_min REAL,
+    range_max REAL,
+    range_mean REAL,
+    speed_max REAL,
+    snr_max REAL,
+    activity TEXT                   -- iz boyunca en sık görülen aktivite
+);
+CREATE INDEX IF NOT EXISTS track_summaries_time
+    ON track_summaries (sensor_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS occupancy_samples (
+    sensor_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,        -- örnek aralığının sonu
+    interval REAL NOT NULL,
+    frames INTEGER NOT NULL,
+    occupied_ratio REAL NOT NULL,
+    targets_mean REAL NOT NULL,
+    targets_max INTEGER NOT NULL,
+    activity TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS occupancy_samples_time
+    ON occupancy_samples (sensor_id, timestamp);
+"""
+
+_INSERT = {
+    'activity': 'INSERT INTO activity_segments VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+    'track': 'INSERT INTO track_summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+    'occupancy': 'INSERT INTO occupancy_samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+}
+
+_TABLES = {
+    'activity': 'activity_segments',
+    'track': 'track_summaries',
+    'occupancy': 'occupancy_samples',
+}
+
+
+class EventLog:
+    """
+    Arka planda toplu yazan SQLite olay kaydı
+
+    Boru hattı yalnızca kuyruğa satır ekler; yazıcı iş parçacığı kuyruktan
+    batch_size satıra veya flush_interval süresine kadar toplar ve tek bir
+    işlemde (transaction) yazar. WAL modunda okuyucular (REST sorguları)
+    yazıcıyı beklemez. Kuyruk dolarsa olay düşürülür ve sayılır.
+    """
+
+    def __init__(self, path, batch_size=256, flush_interval=1.0, queue_size=10000):
+        """
+        path: Veritabanı dosyası
+        batch_size: İşlem başına en fazla satır
+        flush_interval: Bekleyen satırların en geç yazılma süresi (saniye)
+        queue_size: Bekleyen olay kuyruğu boyutu
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.events_written = 0
+        self.events_dropped = 0
+        self.batches = 0
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._running = False
+        self._thread = None
+        self._local = threading.local()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        db = self._connect()
+        try:
+            db.executescript(_SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10.0)
+        db.execute('PRAGMA journal_mode=WAL')
+        # WAL ile NORMAL: commit'te fsync yok, checkpoint'te var; güç
+        # kesintisinde yalnızca son işlemler kaybolabilir
+        db.execute('PRAGMA synchronous=NORMAL')
+        db.row_factory = sqlite3.Row
+        return db
+
+    def start(self):
+        """Yazıcı iş parçacığını başlat"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Kuyruktaki olayları yaz ve yazıcıyı durdur"""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(None)
+        self._thread.join()
+
+    def write(self, kind, row):
+        """
+        Olayı kuyruğa ekle (bloklamaz)
+
+        kind: 'activity', 'track' veya 'occupancy'
+        row: Tablo sütun sırasıyla değerler
+        return: Olay kuyruğa alındıysa True
+        """
+        try:
+            self._queue.put_nowait((kind, row))
+            return True
+        except queue.Full:
+            self.events_dropped += 1
+            return False
+
+    @property
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def _writer_loop(self):
+        db = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is None:
+                    break
+                batch = {kind: [] for kind in _INSERT}
+                batch[item[0]].append(item[1])
+                count = 1
+                deadline = time.monotonic() + self.flush_interval
+                # İlk olaydan sonra batch dolana veya süre dolana kadar topla
+                while count < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    try:
+                        item = self._queue.get(timeout=timeout) if timeout > 0 \
+                            else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch[item[0]].append(item[1])
+                    count += 1
+                self._commit(db, batch, count)
+        finally:
+            db.close()
+
+    def _commit(self, db, batch, count):
+        try:
+            with stage_timer('event_log_commit'):
+                with db:
+                    for kind, rows in batch.items():
+                        if rows:
+                            db.executemany(_INSERT[kind], rows)
+        except sqlite3.Error as e:
+            print(f"Olay kaydı yazılamadı: {e}")
+            self.events_dropped += count
+            return
+        self.events_written += count
+        self.batches += 1
+
+    def _reader(self):
+        """İş parçacığı başına salt okuma bağlantısı"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self._connect()
+            self._local.db = db
+        return db
+
+    def query(self, kind, sensor_id, t_start, t_end, activity=None, limit=1000):
+        """
+        Zaman aralığındaki olaylar (en yeniden eskiye)
+
+        kind: 'activity', 'track' veya 'occupancy'
+        activity: Yalnızca bu aktivite (activity ve track için)
+        return: Sözlük listesi
+        """
+        sql = f'SELECT * FROM {_TABLES[kind]} WHERE sensor_id = ? AND timestamp BETWEEN ? AND ?'
+        params = [sensor_id, t_start, t_end]
+        if activity is not None:
+            sql += ' AND activity = ?'
+            params.append(activity)
+        sql += ' ORDER BY timestamp DESC LIMIT ?'
+        params.append(int(limit))
+        return [dict(row) for row in self._reader().execute(sql, params)]
+
+    def activity_summary(self, sensor_id, t_start, t_end):
+        """
+        Aktivite başına toplamlar: segment sayısı, aralıkla kesişen süre,
+        ortalama segment süresi ve ortalama güven
+
+        Segmentin aralık dışına taşan kısmı süreye katılmaz.
+        """
+        rows = self._reader().execute(
+            """
+            SELECT activity,
+                   COUNT(*) AS segments,
+                   SUM(MIN(timestamp, :end) - MAX(started_at, :start)) AS duration,
+                   AVG(duration) AS duration_mean,
+                   SUM(confidence_mean * frames) / SUM(frames) AS confidence_mean,
+                   SUM(frames) AS frames
+            FROM activity_segments
+            WHERE sensor_id = :sensor AND timestamp >= :start AND started_at <= :end
+            GROUP BY activity
+            ORDER BY duration DESC
+            """,
+            {'sensor': sensor_id, 'start': t_start, 'end': t_end})
+        return [dict(row) for row in rows]
+
+    def track_summary(self, sensor_id, t_start, t_end):
+        """Aralıktaki iz sayısı, toplam/ortalama iz süresi ve mesafe aralığı"""
+        row = self._reader().execute(
+            """
+            SELECT COUNT(*) AS tracks,
+                   COALESCE(SUM(duration), 0) AS duration,
+                   AVG(duration) AS duration_mean,
+                   MIN(range_min) AS range_min,
+                   MAX(range_max) AS range_max
+            FROM track_summaries
+            WHERE sensor_id = ? AND timestamp BETWEEN ? AND ?
+            """, (sensor_id, t_start, t_end)).fetchone()
+        return dict(row)
+
+    def get_status(self):
+        return {
+            'path': self.path,
+            'active': self._running,
+            'events_written': self.events_written,
+            'events_dropped': self.events_dropped,
+            'batches': self.batches,
+            'queue_depth': self.queue_depth
+        }
+
+
+class SensorEvents:
+    """
+    Tek sensörün frame akışını olaylara dönüştürür
+
+    Her frame'de yalnızca bellekteki sayaçlar güncellenir; satırlar aktivite
+    değiştiğinde, iz bittiğinde ve her doluluk aralığı sonunda EventLog
+    kuyruğuna eklenir. Süreç modunda update() havuzun dağıtıcı iş
+    parçacığından, close() boru hattı iş parçacığından çağrılır; ikisi
+    kilitle sıralanır.
+    """
+
+    def __init__(self, sensor_id, log, labels, occupancy_interval=60.0):
+        """
+        sensor_id: Sensör kimliği
+        log: EventLog
+        labels: Aktivite etiketleri (doluluk örneğinde en sık aktivite için)
+        occupancy_interval: Doluluk örneği aralığı (saniye, 0: kapalı)
+        """
+        self.sensor_id = sensor_id
+        self.log = log
+        self.labels = list(labels)
+        self.occupancy_interval = occupancy_interval
+
+        self._segment = None
+        self._track = None
+        self._occupancy = None
+        self._lock = threading.Lock()
+
+    def update(self, timestamp, activity, confidence, targets):
+        """Frame sonucunu işle (targets: yayınlanan hedef sözlükleri)"""
+        with self._lock:
+            self._update_segment(timestamp, activity, confidence)
+            self._update_track(timestamp, activity, targets)
+            if self.occupancy_interval > 0:
+                self._update_occupancy(timestamp, activity, len(targets))
+
+    def close(self, timestamp=None):
+        """Açık segment, iz ve doluluk aralığını yaz (boru hattı durduğunda)"""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self._end_segment(timestamp, None)
+            self._end_track(timestamp)
+            self._end_occupancy(timestamp)
+
+    def _update_segment(self, timestamp, activity, confidence):
+        segment = self._segment
+        if segment is not None and segment['activity'] != activity:
+            self._end_segment(timestamp, activity)
+            segment = None
+        if segment is None:
+            self._segment = {'activity': activity, 'started_at': timestamp,
+                             'frames': 1, 'confidence': float(confidence)}
+        else:
+            segment['frames'] += 1
+            segment['confidence'] += float(confidence)
+
+    def _end_segment(self, timestamp, next_activity):
+        segment, self._segment = self._segment, None
+        if segment is None:
+            return
+        self.log.write('activity', (
+            self.sensor_id, timestamp, segment['started_at'],
+            timestamp - segment['started_at'], segment['activity'], next_activity,
+            segment['frames'], segment['confidence'] / segment['frames']))
+
+    def _update_track(self, timestamp, activity, targets):
+        # İz: birincil hedefin kesintisiz görüldüğü frame dizisi (Kalman
+        # takipçisi hedef kaybolunca sıfırlanır)
+        if not targets:
+            self._end_track(timestamp)
+            return
+        primary = max(targets, key=lambda t: t['snr'])
+        distance = primary.get('tracked_distance', primary['distance'])
+        speed = abs(primary['velocity'])
+        track = self._track
+        if track is None:
+            self._track = {'started_at': timestamp, 'frames': 1,
+                           'range_min': distance, 'range_max': distance,
+                           'range_sum': distance, 'speed_max': speed,
+                           'snr_max': primary['snr'], 'activities': {activity: 1}}
+            return
+        track['frames'] += 1
+        track['range_min'] = min(track['range_min'], distance)
+        track['range_max'] = max(track['range_max'], distance)
+        track['range_sum'] += distance
+        track['speed_max'] = max(track['speed_max'], speed)
+        track['snr_max'] = max(track['snr_max'], primary['snr'])
+        track['activities'][activity] = track['activities'].get(activity, 0) + 1
+
+    def _end_track(self, timestamp):
+        track, self._track = self._track, None
+        if track is None:
+            return
+        activities = track['activities']
+        self.log.write('track', (
+            self.sensor_id, timestamp, track['started_at'],
+            timestamp - track['started_at'], track['frames'],
+            float(track['range_min']), float(track['range_max']),
+            float(track['range_sum'] / track['frames']),
+            float(track['speed_max']), float(track['snr_max']),
+            max(activities, key=activities.get)))
+
+    def _update_occupancy(self, timestamp, activity, num_targets):
+        sample = self._occupancy
+        if sample is not None and timestamp - sample['started_at'] >= self.occupancy_interval:
+            self._end_occupancy(timestamp)
+            sample = None
+        if sample is None:
+            sample = self._occupancy = {'started_at': timestamp, 'frames': 0, 'occupied': 0,
+                                        'targets': 0, 'targets_max': 0,
+                                        'activities': [0] * len(self.labels)}
+        sample['frames'] += 1
+        sample['occupied'] += num_targets > 0
+        sample['targets'] += num_targets
+        sample['targets_max'] = max(sample['targets_max'], num_targets)
+        sample['activities'][self.labels.index(activity)] += 1
+
+    def _end_occupancy(self, timestamp):
+        sample, self._occupancy = self._occupancy, None
+        if sample is None:
+            return
+        frames = sample['frames']
+        activities = sample['activities']
+        self.log.write('occupancy', (
+            self.sensor_id, timestamp, timestamp - sample['started_at'], frames,
+            sample['occupied'] / frames, sample['targets'] / frames,
+            sample['targets_max'], self.labels[activities.index(max(activities))]))
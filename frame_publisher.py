@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Paylaşımlı Bellekte Son Frame Yayını
+Her sensörün son Range-Doppler haritası, kümeleri ve aktivitesi adlandırılmış
+bir paylaşımlı bellek bölümüne yazılır; aynı makinedeki süreçler (ev otomasyonu
+köprüsü, kayıt ajanları) web sunucusunu yormadan istedikleri hızda okur
+
+Örnek:
+    python3 frame_publisher.py default            # son frame özetini yazdır
+    python3 frame_publisher.py salon --rate 10    # saniyede 10 okuma
+"""
+
+import re
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+SEGMENT_PREFIX = 'pluto_'
+PUBLISH_MAGIC = b'PLUTOPUB'
+PUBLISH_VERSION = 1
+MAX_TARGETS = 64
+
+# Bölüm düzeni:
+#   header            _HEADER (64 byte)
+#   buffer[0], [1]    _BUFFER başlığı (128 byte) + hedefler + harita
+#
+# Çift tampon + tampon başına seqlock: yazıcı her zaman son yayınlanmayan
+# tampona yazar, yazarken sırasını tek sayıya çeker, bitince çift sayıya
+# çeker ve header.latest'i o tampona çevirir. Okuyucu kilit almaz: sırayı
+# okur, veriyi kullanır, sıra değişmediyse görüntü tutarlıdır. Yazıcı aynı
+# tampona ancak iki yayın sonra döndüğünden kopyasız okuyucunun en az bir
+# frame süresi vardır.
+_HEADER = np.dtype([
+    ('magic', 'S8'),
+    ('version', '<u4'),
+    ('state', '<u4'),          # 0: açık, 1: yenisiyle değiştirildi (yeniden bağlan)
+    ('max_rows', '<u4'),
+    ('max_cols', '<u4'),
+    ('max_targets', '<u4'),
+    ('latest', '<u4'),         # Son yayınlanan tampon
+    ('published', '<u8'),      # Yayınlanan frame sayısı
+], align=True)
+_HEADER_SIZE = 64
+
+_BUFFER = np.dtype([
+    ('seq', '<u8'),            # Tek: yazılıyor, çift: tutarlı
+    ('frame', '<u8'),          # Bu tampondaki frame'in yayın numarası
+    ('timestamp', '<f8'),
+    ('rows', '<u4'),           # Doppler
+    ('cols', '<u4'),           # Mesafe
+    ('num_targets', '<u4'),
+    ('confidence', '<f4'),
+    ('extent', '<f4', (4,)),   # [min_m, max_m, min_v, max_v]
+    ('activity', 'S32'),       # UTF-8
+], align=True)
+_BUFFER_SIZE = 128
+
+# Hedef sütunları
+TARGET_FIELDS = ('distance', 'velocity', 'snr')
+
+STATE_OPEN = 0
+STATE_REPLACED = 1
+
+# Bu süreçte FramePublisher'ın oluşturduğu bölümler
+_owned = set()
+
+
+def segment_name(sensor_id, prefix=SEGMENT_PREFIX):
+    """Sensörün paylaşımlı bellek bölümü adı"""
+    return prefix + re.sub(r'[^A-Za-z0-9_.-]', '_', sensor_id)
+
+
+def _align(size, alignment=64):
+    return (size + alignment - 1) // alignment * alignment
+
+
+def _layout(max_rows, max_cols, max_targets):
+    """(tampon boyutu, hedef ofseti, harita ofseti) - tampon başına"""
+    targets_offset = _BUFFER_SIZE
+    map_offset = _align(targets_offset + max_targets * len(TARGET_FIELDS) * 4)
+    return _align(map_offset + max_rows * max_cols * 4), targets_offset, map_offset
+
+
+class _Segment:
+    """Bölüm üzerindeki numpy görünümleri (yazıcı ve okuyucu ortak)"""
+
+    def __init__(self, shm, max_rows, max_cols, max_targets):
+        self.shm = shm
+        self.header = np.ndarray((), dtype=_HEADER, buffer=shm.buf)
+        buffer_size, targets_offset, map_offset = _layout(max_rows, max_cols, max_targets)
+        self.buffers = []
+        for i in range(2):
+            base = _HEADER_SIZE + i * buffer_size
+            self.buffers.append((
+                np.ndarray((), dtype=_BUFFER, buffer=shm.buf, offset=base),
+                np.ndarray((max_targets, len(TARGET_FIELDS)), dtype=np.float32,
+                           buffer=shm.buf, offset=base + targets_offset),
+                np.ndarray((max_rows, max_cols), dtype=np.float32,
+                           buffer=shm.buf, offset=base + map_offset)))
+
+    def close(self):
+        del self.header, self.buffers
+        try:
+            self.shm.close()
+        except BufferError:
+            # Kopyasız okunmuş görüntüler hâlâ kullanımda: eşleme onlarla birlikte kalkar
+            pass
+
+
+class FramePublisher:
+    """
+    Sensörün son frame'ini paylaşımlı belleğe yazar (tek yazıcı)
+
+    Bölüm ilk yayında frame boyutuna göre oluşturulur; harita daha büyük
+    bir geometriye geçerse bölüm yeniden oluşturulur ve eski bölüm
+    'değiştirildi' olarak işaretlenir (okuyucular kendiliğinden yeniden bağlanır).
+    """
+
+    def __init__(self, sensor_id, prefix=SEGMENT_PREFIX, max_targets=MAX_TARGETS):
+        self.sensor_id = sensor_id
+        self.name = segment_name(sensor_id, prefix)
+        self.max_targets = max_targets
+        self._segment = None
+
+    def _create(self, max_rows, max_cols):
+        buffer_size, _, _ = _layout(max_rows, max_cols, self.max_targets)
+        size = _HEADER_SIZE + 2 * buffer_size
+        try:
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        except FileExistsError:
+            # Önceki (çökmüş veya değiştirilen) sunucudan kalan bölüm
+            stale = shared_memory.SharedMemory(name=self.name)
+            if stale.size >= _HEADER_SIZE:
+                header = np.ndarray((), dtype=_HEADER, buffer=stale.buf)
+                header['state'] = STATE_REPLACED
+                del header
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=self.name, create=True, size=size)
+        _owned.add(self.name)
+
+        segment = _Segment(shm, max_rows, max_cols, self.max_targets)
+        header = segment.header
+        header['version'] = PUBLISH_VERSION
+        header['state'] = STATE_OPEN
+        header['max_rows'] = max_rows
+        header['max_cols'] = max_cols
+        header['max_targets'] = self.max_targets
+        header['latest'] = 0
+        header['published'] = 0
+        # Magic en son: okuyucu yarım başlatılmış bölüme bağlanmaz
+        header['magic'] = PUBLISH_MAGIC
+        return segment
+
+    def publish(self, rd_map, targets, activity, confidence, extent, timestamp=None):
+        """
+        Frame'i bir sonraki tampona yaz ve yayınla
+
+        rd_map: (doppler, mesafe) Range-Doppler haritası (dB)
+        targets: distance/velocity/snr içeren hedef sözlükleri (en fazla
+                 max_targets, fazlası SNR'a göre kırpılır)
+        extent: Haritanın [min_m, max_m, min_v, max_v] sınırları
+        """
+        rows, cols = rd_map.shape
+        segment = self._segment
+        if segment is None or rows > segment.header['max_rows'] or \
+                cols > segment.header['max_cols']:
+            if segment is not None:
+                segment.header['state'] = STATE_REPLACED
+                segment.shm.unlink()
+                segment.close()
+            segment = self._segment = self._create(rows, cols)
+
+        if len(targets) > self.max_targets:
+            targets = sorted(targets, key=lambda t: t['snr'], reverse=True)[:self.max_targets]
+        if timestamp is None:
+            timestamp = time.time()
+
+        header = segment.header
+        index = 1 - int(header['latest'])
+        meta, target_array, map_array = segment.buffers[index]
+
+        meta['seq'] += 1
+        meta['frame'] = int(header['published']) + 1
+        meta['timestamp'] = timestamp
+        meta['rows'] = rows
+        meta['cols'] = cols
+        meta['num_targets'] = len(targets)
+        meta['confidence'] = confidence
+        meta['extent'] = extent
+        meta['activity'] = activity.encode('utf-8')[:32]
+        for i, target in enumerate(targets):
+            target_array[i] = (target['distance'], target['velocity'], target['snr'])
+        map_array[:rows, :cols] = rd_map
+        meta['seq'] += 1
+
+        header['latest'] = index
+        header['published'] = int(meta['frame'])
+
+    @property
+    def published(self):
+        return 0 if self._segment is None else int(self._segment.header['published'])
+
+    def close(self):
+        """Bölümü kaldır (okuyucular yeniden bağlanmayı bekler)"""
+        if self._segment is None:
+            return
+        self._segment.header['state'] = STATE_REPLACED
+        self._segment.shm.unlink()
+        self._segment.close()
+        self._segment = None
+        _owned.discard(self.name)
+
+
+class FrameSnapshot:
+    """Yayınlanmış bir frame (copy=False ise diziler paylaşımlı bellek görünümüdür)"""
+
+    __slots__ = ('frame', 'timestamp', 'activity', 'confidence', 'extent',
+                 'targets', 'range_doppler', '_buffer', '_seq')
+
+    def as_dict(self):
+        """Hedefleri sözlük listesi olarak içeren JSON uyumlu özet (harita hariç)"""
+        return {
+            'frame': self.frame,
+            'timestamp': self.timestamp,
+            'activity': self.activity,
+            'confidence': self.confidence,
+            'extent': self.extent,
+            'targets': [dict(zip(TARGET_FIELDS, map(float, row))) for row in self.targets],
+            'map_shape': list(self.range_doppler.shape)
+        }
+
+
+class FrameReader:
+    """
+    Sensörün son frame'ini paylaşımlı bellekten okur
+
+    Kilit kullanmaz ve yazıcıyı hiçbir zaman bekletmez. read() varsayılan
+    olarak tutarlı bir kopya döndürür; copy=False ile diziler kopyasız
+    görünümdür ve kullanıldıktan sonra valid() ile doğrulanmalıdır.
+
+        reader = FrameReader('salon')
+        snapshot = reader.read()
+        if snapshot is not None:
+            print(snapshot.activity, snapshot.targets)
+    """
+
+    def __init__(self, sensor_id, prefix=SEGMENT_PREFIX, retries=8):
+        self.name = segment_name(sensor_id, prefix)
+        self.retries = retries
+        self._segment = None
+
+    def _attach(self):
+        # Okuyucu bölümün sahibi değil: kapanışta silinmemeli (aynı süreçteki
+        # yazıcının kaydına dokunulmaz)
+        try:
+            if sys.version_info >= (3, 13):
+                shm = shared_memory.SharedMemory(name=self.name, track=False)
+            else:
+                shm = shared_memory.SharedMemory(name=self.name)
+        except FileNotFoundError:
+            return None
+        if sys.version_info < (3, 13) and self.name not in _owned:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        header = np.ndarray((), dtype=_HEADER, buffer=shm.buf)
+        if header['magic'].item() != PUBLISH_MAGIC or header['version'] != PUBLISH_VERSION:
+            del header
+            shm.close()
+            return None
+        max_rows, max_cols, max_targets = (int(header['max_rows']), int(header['max_cols']),
+                                           int(header['max_targets']))
+        del header
+        return _Segment(shm, max_rows, max_cols, max_targets)
+
+    def _current(self):
+        segment = self._segment
+        if segment is not None and segment.header['state'] == STATE_REPLACED:
+            segment.close()
+            segment = self._segment = None
+        if segment is None:
+            segment = self._segment = self._attach()
+        return segment
+
+    @property
+    def published(self):
+        """Yazıcının yayınladığı frame sayısı (yeni frame var mı kontrolü için)"""
+        segment = self._current()
+        return 0 if segment is None else int(segment.header['published'])
+
+    def read(self, copy=True):
+        """
+        Son frame'i oku
+
+        return: FrameSnapshot veya None (yayın yok ya da yazıcı o anda
+                sürekli yazıyor)
+        """
+        for _ in range(self.retries):
+            segment = self._current()
+            if segment is None:
+                return None
+            index = int(segment.header['latest'])
+            meta, target_array, map_array = segment.buffers[index]
+            seq = int(meta['seq'])
+            if seq == 0:
+                return None
+            if seq % 2:
+                continue
+
+            snapshot = FrameSnapshot()
+            snapshot.frame = int(meta['frame'])
+            snapshot.timestamp = float(meta['timestamp'])
+            snapshot.activity = meta['activity'].item().decode('utf-8', 'replace')
+            snapshot.confidence = float(meta['confidence'])
+            snapshot.extent = [float(v) for v in meta['extent']]
+            rows, cols, num_targets = int(meta['rows']), int(meta['cols']), \
+                int(meta['num_targets'])
+            snapshot.targets = target_array[:num_targets]
+            snapshot.range_doppler = map_array[:rows, :cols]
+            if copy:
+                snapshot.targets = snapshot.targets.copy()
+                snapshot.range_doppler = snapshot.range_doppler.copy()
+            snapshot._buffer = None if copy else meta
+            snapshot._seq = seq
+
+            if int(meta['seq']) == seq:
+                return snapshot
+        return None
+
+    def valid(self, snapshot):
+        """Kopyasız okunan görüntünün üzerine henüz yazılmadıysa True"""
+        if snapshot._buffer is None:
+            return True
+        return self._segment is not None and int(snapshot._buffer['seq']) == snapshot._seq
+
+    def close(self):
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
+
+
+if __name__ == '__main__':
+    import json
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Paylaşımlı bellekteki son frame\'i oku')
+    parser.add_argument('sensor_id', nargs='?', default='default')
+    parser.add_argument('--rate', type=float, default=1.0, help='Okuma hızı (Hz)')
+    parser.add_argument('--count', type=int, default=0, help='Okuma sayısı (0: sonsuz)')
+    args = parser.parse_args()
+
+    reader = FrameReader(args.sensor_id)
+    last = None
+    n = 0
+    try:
+        while not args.count or n < args.count:
+            snapshot = reader.read()
+            if snapshot is None:
+                print(f"Yayın yok: {reader.name}")
+            elif snapshot.frame != last:
+                last = snapshot.frame
+                print(json.dumps(snapshot.as_dict(), ensure_ascii=False))
+            n += 1
+            time.sleep(1.0 / args.rate)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Sabit Bellekli Geçmiş Deposu
+Sütun tabanlı halka tampon ve sunucu tarafı örnek azaltma (downsampling)
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class HistoryStore:
+    """
+    Sütun tabanlı halka tampon
+
+    Her sütun önceden ayrılmış bir numpy dizisidir; kapasite dolunca en eski
+    kayıtların üzerine yazılır. Bellek kullanımı kapasiteyle sabittir
+    (kayıt başına ~25 byte, 24 saat @ 10 Hz için ~22 MB).
+    """
+
+    def __init__(self, capacity=24 * 3600 * 10, num_activities=5):
+        """
+        capacity: Maksimum kayıt sayısı
+        num_activities: Aktivite sınıfı sayısı (mod hesabı için)
+        """
+        self.capacity = int(capacity)
+        self.num_activities = num_activities
+
+        self.timestamp = np.zeros(self.capacity, dtype=np.float64)
+        self.activity = np.zeros(self.capacity, dtype=np.int8)
+        self.confidence = np.zeros(self.capacity, dtype=np.float32)
+        self.target_count = np.zeros(self.capacity, dtype=np.int16)
+        self.target_range = np.full(self.capacity, np.nan, dtype=np.float32)
+        self.target_velocity = np.full(self.capacity, np.nan, dtype=np.float32)
+
+        self._head = 0   # Bir sonraki yazma konumu
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def append(self, activity_id, confidence, target_count,
+               target_range=np.nan, target_velocity=np.nan, timestamp=None):
+        """
+        Yeni kayıt ekle (O(1))
+
+        target_range / target_velocity: Birincil hedef (hedef yoksa NaN)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            i = self._head
+            self.timestamp[i] = timestamp
+            self.activity[i] = activity_id
+            self.confidence[i] = confidence
+            self.target_count[i] = target_count
+            self.target_range[i] = target_range
+            self.target_velocity[i] = target_velocity
+            self._head = (i + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def _ordered_indices(self, t_start, t_end):
+        """Zaman aralığındaki kayıtların (kronolojik) indekslerini döndür"""
+        start = (self._head - self._size) % self.capacity
+        # Halka iki sıralı parçadan oluşur: [start:] ve [:head]
+        if start + self._size <= self.capacity:
+            segments = [np.arange(start, start + self._size)]
+        else:
+            segments = [np.arange(start, self.capacity), np.arange(0, self._head)]
+
+        result = []
+        for seg in segments:
+            if len(seg) == 0:
+                continue
+            ts = self.timestamp[seg[0]:seg[-1] + 1]
+            i0 = np.searchsorted(ts, t_start, side='left')
+            i1 = np.searchsorted(ts, t_end, side='right')
+            result.append(seg[i0:i1])
+        if not result:
+            return np.zeros(0, dtype=np.int64)
+        return np.concatenate(result)
+
+    def query(self, t_start=None, t_end=None, max_points=500):
+        """
+        Zaman penceresini sorgula ve max_points kovaya indir
+
+        Her kova için: zaman (ortalama), aktivite (mod), güven (ort/min/max),
+        hedef sayısı (ort/max), birincil hedef mesafe/hız (ort/min/max)
+
+        return: Sütun sözlüğü (her değer bir numpy dizisi)
+        """
+        with self._lock:
+            if t_end is None:
+                t_end = np.inf
+            if t_start is None:
+                t_start = -np.inf
+            idx = self._ordered_indices(t_start, t_end)
+
+            ts = self.timestamp[idx]
+            activity = self.activity[idx].astype(np.int64)
+            confidence = self.confidence[idx]
+            target_count = self.target_count[idx]
+            target_range = self.target_range[idx]
+            target_velocity = self.target_velocity[idx]
+
+        n = len(ts)
+        if n == 0:
+            return _empty_result()
+
+        max_points = max(1, int(max_points))
+        if n <= max_points:
+            # Örnek azaltmaya gerek yok, kovalar tek kayıt
+            starts = np.arange(n)
+        else:
+            # Eşit zaman aralıklı kovalar; boş kovalar atlanır
+            edges = np.linspace(ts[0], ts[-1], max_points + 1)
+            starts = np.unique(np.searchsorted(ts, edges[:-1], side='left'))
+            starts = starts[starts < n]
+
+        counts = np.diff(np.append(starts, n))
+        bucket_ids = np.repeat(np.arange(len(starts)), counts)
+
+        # Aktivite modu: (kova, sınıf) histogramı
+        hist = np.zeros((len(starts), self.num_activities), dtype=np.int64)
+        np.add.at(hist, (bucket_ids, activity), 1)
+
+        result = {
+            'timestamp': np.add.reduceat(ts, starts) / counts,
+            'samples': counts,
+            'activity': hist.argmax(axis=1),
+            'confidence_mean': np.add.reduceat(confidence, starts) / counts,
+            'confidence_min': np.minimum.reduceat(confidence, starts),
+            'confidence_max': np.maximum.reduceat(confidence, starts),
+            'targets_mean': np.add.reduceat(target_count, starts) / counts,
+            'targets_max': np.maximum.reduceat(target_count, starts),
+        }
+
+        for name, column in (('range', target_range), ('velocity', target_velocity)):
+            valid = ~np.isnan(column)
+            valid_count = np.add.reduceat(valid.astype(np.int64), starts)
+            total = np.add.reduceat(np.where(valid, column, 0), starts)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                result[f'{name}_mean'] = np.where(valid_count > 0, total / valid_count, np.nan)
+            # fmin/fmax NaN'ları yok sayar (kova tamamen NaN ise NaN kalır)
+            result[f'{name}_min'] = np.fmin.reduceat(column, starts)
+            result[f'{name}_max'] = np.fmax.reduceat(column, starts)
+
+        return result
+
+    def get_info(self):
+        with self._lock:
+            if self._size == 0:
+                oldest = newest = None
+            else:
+                oldest = float(self.timestamp[(self._head - self._size) % self.capacity])
+                newest = float(self.timestamp[(self._head - 1) % self.capacity])
+        return {
+            'capacity': self.capacity,
+            'size': self._size,
+            'oldest': oldest,
+            'newest': newest
+        }
+
+
+def _empty_result():
+    empty_f = np.zeros(0, dtype=np.float64)
+    empty_i = np.zeros(0, dtype=np.int64)
+    result = {
+        'timestamp': empty_f, 'samples': empty_i, 'activity': empty_i,
+        'confidence_mean': empty_f, 'confidence_min': empty_f, 'confidence_max': empty_f,
+        'targets_mean': empty_f, 'targets_max': empty_i,
+    }
+    for name in ('range', 'velocity'):
+        for stat in ('mean', 'min', 'max'):
+            result[f'{name}_{stat}'] = empty_f
+    return result
+
+
+def to_json_columns(result):
+    """numpy sütunlarını JSON listelerine çevir (NaN -> None)"""
+    columns = {}
+    for key, values in result.items():
+        if values.dtype.kind == 'f':
+            rounded = np.round(values.astype(np.float64), 4)
+            columns[key] = [None if np.isnan(v) else v for v in rounded.tolist()]
+        else:
+            columns[key] = values.tolist()
+    return columns
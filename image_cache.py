@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Range-Doppler Görüntü Önbelleği
+PNG görüntüleri içerik özetiyle adreslenir; durum mesajları yalnızca
+görüntü kimliğini taşır, istemciler görüntüyü ayrıca çeker
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class ImageCache:
+    """
+    Sınırlı boyutlu LRU PNG önbelleği
+
+    Kimlik, PNG baytlarının özetidir: aynı görüntü tekrar eklenirse aynı
+    kimliği alır ve kimlik hiçbir zaman başka bir içeriği göstermez, bu
+    yüzden istemciler görüntüyü süresiz önbelleğe alabilir.
+    """
+
+    def __init__(self, capacity=64):
+        """capacity: Bellekte tutulacak görüntü sayısı"""
+        self.capacity = capacity
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def image_id(png):
+        return hashlib.blake2b(png, digest_size=8).hexdigest()
+
+    def put(self, png):
+        """PNG baytlarını ekle, kimliği döndür"""
+        image_id = self.image_id(png)
+        with self._lock:
+            if image_id in self._images:
+                self._images.move_to_end(image_id)
+            else:
+                self._images[image_id] = png
+                while len(self._images) > self.capacity:
+                    self._images.popitem(last=False)
+        return image_id
+
+    def get(self, image_id):
+        """PNG baytları (önbellekten düşmüşse None)"""
+        with self._lock:
+            png = self._images.get(image_id)
+            if png is None:
+                self.misses += 1
+            else:
+                self._images.move_to_end(image_id)
+                self.hits += 1
+        return png
+
+    def __len__(self):
+        return len(self._images)
+
+    def get_status(self):
+        with self._lock:
+            size_bytes = sum(len(png) for png in self._images.values())
+            count = len(self._images)
+        return {
+            'capacity': self.capacity,
+            'images': count,
+            'bytes': size_bytes,
+            'hits': self.hits,
+            'misses': self.misses
+        }
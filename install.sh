@@ -169,16 +169,13 @@ cd $INSTALL_DIR
 
 # Dosyaları kopyala (mevcut dizinden)
 CURRENT_DIR=$(dirname "$(readlink -f "$0")")
-cp $CURRENT_DIR/signal_processor.py $INSTALL_DIR/ 2>/dev/null || echo "signal_processor.py bulunamadı"
-cp $CURRENT_DIR/train_model.py $INSTALL_DIR/ 2>/dev/null || echo "train_model.py bulunamadı"
-cp $CURRENT_DIR/web_server.py $INSTALL_DIR/ 2>/dev/null || echo "web_server.py bulunamadı"
+cp $CURRENT_DIR/*.py $INSTALL_DIR/ 2>/dev/null || echo "Python modülleri bulunamadı"
 cp $CURRENT_DIR/dashboard.html $INSTALL_DIR/ 2>/dev/null || echo "dashboard.html bulunamadı"
-cp $CURRENT_DIR/test_pluto.py $INSTALL_DIR/ 2>/dev/null || echo "test_pluto.py bulunamadı"
 
-# Model eğit
+# Model eğit (sunucunun yüklediği anahtarlı dosya: models/activity_<anahtar>.pkl)
 echo -e "${BLUE}  • ${NC}ML modeli eğitiliyor..."
-python3 $INSTALL_DIR/train_model.py > /dev/null 2>&1 || {
-    echo -e "${YELLOW}  ! ${NC}Model eğitimi başarısız (normal, daha sonra yapabilirsiniz)"
+python3 $INSTALL_DIR/model_manager.py $INSTALL_DIR/models > /dev/null 2>&1 || {
+    echo -e "${YELLOW}  ! ${NC}Model eğitimi başarısız (sunucu ilk açılışta arka planda eğitir)"
 }
 
 echo -e "${GREEN}  ✓ ${NC}Uygulama dosyaları kuruldu"
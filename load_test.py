@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Socket.IO Yük Testi
+Sunucuyu sentetik (demo) kaynakla başlatır, N adet simüle edilmiş
+dashboard istemcisi bağlar; radar_update teslim gecikmesini, mesaj
+hızını, sunucu CPU/bellek kullanımını ve REST yoklama gecikmesini ölçer
+
+Örnek:
+    python3 load_test.py --clients 1,10,50,100 --duration 20 --rate 10
+    python3 load_test.py --url http://192.168.1.20:5000 --clients 20
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import subprocess
+import urllib.request
+from datetime import datetime
+
+import numpy as np
+import socketio
+
+
+def _percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None, 'max': None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {'p50': p50 * 1000, 'p95': p95 * 1000, 'p99': p99 * 1000,
+            'max': max(values) * 1000}
+
+
+class ProcessMonitor:
+    """Sunucu sürecinin CPU süresi ve RSS değeri (/proc, yalnızca Linux)"""
+
+    def __init__(self, pid):
+        self.pid = pid
+        self._ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        self._page = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+    def cpu_seconds(self):
+        """Sürecin kullandığı toplam CPU süresi (çocuk süreçler hariç)"""
+        try:
+            with open(f'/proc/{self.pid}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            # utime, stime: stat alanları 14 ve 15 (')' sonrası 12 ve 13)
+            return (int(fields[11]) + int(fields[12])) / self._ticks
+        except (OSError, IndexError, ValueError):
+            return None
+
+    def rss_mb(self):
+        try:
+            with open(f'/proc/{self.pid}/statm') as f:
+                return int(f.read().split()[1]) * self._page / 2**20
+        except (OSError, IndexError, ValueError):
+            return None
+
+
+class SimulatedDashboard:
+    """
+    Tek bir dashboard istemcisi
+
+    Socket.IO üzerinden radar_update alır, gecikmeyi mesajdaki yayın zaman
+    damgasından hesaplar ve dashboard gibi /api/status ile /api/statistics
+    uç noktalarını periyodik olarak yoklar.
+    """
+
+    def __init__(self, url, poll_interval=1.0, fetch_images=False):
+        self.url = url
+        self.poll_interval = poll_interval
+        self.fetch_images = fetch_images
+        self.latencies = []
+        self.poll_latencies = []
+        self.errors = 0
+        self.received = 0
+        self._measuring = False
+        self._running = False
+        self._thread = None
+        self.client = socketio.Client(reconnection=False)
+        self.client.on('radar_update', self._on_update)
+
+    def connect(self):
+        self.client.connect(self.url, transports=['websocket'], wait_timeout=10)
+        self._running = True
+        self._thread = threading.Thread(target=self._poll_loop, daemon=True)
+        self._thread.start()
+
+    def start_measuring(self):
+        self._measuring = True
+
+    def stop_measuring(self):
+        self._measuring = False
+
+    def close(self):
+        self._running = False
+        try:
+            self.client.disconnect()
+        except Exception:
+            pass
+
+    def _on_update(self, data):
+        received = time.time()
+        if not self._measuring:
+            return
+        self.received += 1
+        try:
+            published = datetime.fromisoformat(data['timestamp']).timestamp()
+            self.latencies.append(received - published)
+        except (KeyError, TypeError, ValueError):
+            self.errors += 1
+        if self.fetch_images and data.get('image_id'):
+            self._get(f"/api/frame/{data['image_id']}.png")
+
+    def _get(self, path):
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(self.url + path, timeout=10) as response:
+                response.read()
+        except Exception:
+            if self._measuring:
+                self.errors += 1
+            return
+        if self._measuring:
+            self.poll_latencies.append(time.perf_counter() - start)
+
+    def _poll_loop(self):
+        # Tüm istemciler aynı anda yoklamasın
+        time.sleep(random.uniform(0, self.poll_interval))
+        while self._running:
+            self._get('/api/status')
+            self._get('/api/statistics')
+            time.sleep(self.poll_interval)
+
+
+def start_server(port, rate):
+    """web_server.py'yi tek demo sensörüyle alt süreçte başlat"""
+    sensors = {'sensors': [{'id': 'loadtest', 'name': 'Yük Testi',
+                            'source': 'demo', 'rate': rate}]}
+    config = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+    json.dump(sensors, config)
+    config.close()
+
+    env = dict(os.environ, PLUTO_PORT=str(port), PLUTO_SENSORS=config.name)
+    server = subprocess.Popen([sys.executable, 'web_server.py'], env=env,
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return server, config.name
+
+
+def wait_for_server(url, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url + '/api/status', timeout=2):
+                return True
+        except Exception:
+            time.sleep(0.5)
+    return False
+
+
+def run_step(url, num_clients, duration, rate, poll_interval, fetch_images, monitor):
+    """N istemciyle tek ölçüm adımı"""
+    clients = [SimulatedDashboard(url, poll_interval, fetch_images)
+               for _ in range(num_clients)]
+    connected = []
+    for client in clients:
+        try:
+            client.connect()
+            connected.append(client)
+        except Exception as e:
+            print(f"  Bağlantı hatası: {e}")
+
+    time.sleep(1.0)  # Isınma
+    cpu_start = monitor.cpu_seconds() if monitor else None
+    t0 = time.time()
+    for client in connected:
+        client.start_measuring()
+    time.sleep(duration)
+    for client in connected:
+        client.stop_measuring()
+    elapsed = time.time() - t0
+    cpu_end = monitor.cpu_seconds() if monitor else None
+
+    latencies = [x for client in connected for x in client.latencies]
+    poll_latencies = [x for client in connected for x in client.poll_latencies]
+    received = sum(client.received for client in connected)
+    expected = len(connected) * rate * elapsed
+
+    result = {
+        'clients': num_clients,
+        'connected': len(connected),
+        'messages': received,
+        'messages_per_s': received / elapsed,
+        'delivery_ratio': received / expected if expected else None,
+        'latency_ms': _percentiles(latencies),
+        'poll_latency_ms': _percentiles(poll_latencies),
+        'errors': sum(client.errors for client in connected),
+        'server_cpu_percent': (None if cpu_start is None or cpu_end is None
+                               else 100 * (cpu_end - cpu_start) / elapsed),
+        'server_rss_mb': monitor.rss_mb() if monitor else None,
+    }
+
+    for client in connected:
+        client.close()
+    time.sleep(1.0)
+    return result
+
+
+def _fmt(value, spec='.1f'):
+    return '-' if value is None else format(value, spec)
+
+
+def print_result(r):
+    lat, poll = r['latency_ms'], r['poll_latency_ms']
+    print(f"{r['connected']:>7} {r['messages_per_s']:>9.1f} {_fmt(r['delivery_ratio'], '.2f'):>6} "
+          f"{_fmt(lat['p50']):>7} {_fmt(lat['p95']):>7} {_fmt(lat['p99']):>7} {_fmt(lat['max']):>7} "
+          f"{_fmt(poll['p50']):>7} {_fmt(poll['p95']):>7} "
+          f"{_fmt(r['server_cpu_percent']):>6} {_fmt(r['server_rss_mb']):>7} {r['errors']:>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Socket.IO yayın yük testi')
+    parser.add_argument('--clients', default='1,10,50,100',
+                        help='Virgülle ayrılmış istemci sayıları')
+    parser.add_argument('--duration', type=float, default=15, help='Adım süresi (s)')
+    parser.add_argument('--rate', type=float, default=10, help='Demo güncelleme hızı (Hz)')
+    parser.add_argument('--poll', type=float, default=1.0,
+                        help='İstemci başına REST yoklama aralığı (s)')
+    parser.add_argument('--fetch-images', action='store_true',
+                        help='Her güncellemede /api/frame görüntüsünü de çek')
+    parser.add_argument('--url', help='Çalışan sunucu (verilmezse yerel sunucu başlatılır)')
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--json', help='Sonuçları JSON dosyasına yaz')
+    args = parser.parse_args()
+
+    steps = [int(n) for n in args.clients.split(',')]
+    server = config_path = None
+    monitor = None
+
+    if args.url:
+        url = args.url.rstrip('/')
+    else:
+        url = f'http://127.0.0.1:{args.port}'
+        server, config_path = start_server(args.port, args.rate)
+        monitor = ProcessMonitor(server.pid)
+
+    try:
+        if not wait_for_server(url):
+            print(f"Sunucuya ulaşılamadı: {url}")
+            return 1
+        if server is not None:
+            urllib.request.urlopen(urllib.request.Request(url + '/api/start', method='POST'))
+
+        print(f"Sunucu: {url}  Güncelleme: {args.rate:g} Hz  Adım: {args.duration:g} s")
+        print(f"{'istemci':>7} {'mesaj/s':>9} {'teslim':>6} "
+              f"{'p50ms':>7} {'p95ms':>7} {'p99ms':>7} {'maxms':>7} "
+              f"{'rest50':>7} {'rest95':>7} {'cpu%':>6} {'rssMB':>7} {'hata':>5}")
+
+        results = []
+        for num_clients in steps:
+            result = run_step(url, num_clients, args.duration, args.rate,
+                              args.poll, args.fetch_images, monitor)
+            results.append(result)
+            print_result(result)
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'url': url, 'rate': args.rate, 'duration': args.duration,
+                           'results': results}, f, indent=2)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+            os.unlink(config_path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
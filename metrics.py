@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Performans Metrikleri
+Aşama bazlı gecikme histogramları, sayaçlar ve göstergeler;
+Prometheus metin formatında dışa aktarım
+"""
+
+import bisect
+import functools
+import threading
+import time
+
+from tracing import TRACER
+
+# Gecikme kovaları (saniye) - 0.5 ms ile 5 s arası
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    body = ','.join('{}="{}"'.format(
+        k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs)
+    return '{' + body + '}'
+
+
+class MetricsRegistry:
+    """Kayıtlı metrikleri tutar ve Prometheus metnini üretir"""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def generate(self):
+        """Prometheus text exposition format (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+
+class _Metric:
+    """Etiketli metrik tabanı: her etiket kombinasyonu ayrı bir alt metrik"""
+
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        if registry is not None:
+            registry.register(self)
+
+    def labels(self, *values):
+        """Etiket değerlerine ait alt metriği döndür (yoksa oluştur)"""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: {len(self.labelnames)} etiket bekleniyor")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} {self.metric_type}']
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child):
+        labels = _format_labels(self.labelnames, key)
+        return [f'{self.name}{labels} {_format_value(child.get())}']
+
+
+class _CounterChild:
+    def __init__(self):
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def get(self):
+        return self._value
+
+
+class _GaugeChild(_CounterChild):
+    def __init__(self):
+        super().__init__()
+        self._function = None
+
+    def set(self, value):
+        self._value = value
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, function):
+        """Değer her okumada function() çağrısıyla hesaplanır"""
+        self._function = function
+
+    def get(self):
+        if self._function is not None:
+            try:
+                return self._function()
+            except Exception:
+                return float('nan')
+        return self._value
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+
+    def snapshot(self):
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class Counter(_Metric):
+    metric_type = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    metric_type = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def set_function(self, function):
+        self.labels().set_function(function)
+
+
+class Histogram(_Metric):
+    metric_type = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS,
+                 registry=REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def _render_child(self, key, child):
+        counts, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+            lines.append(f'{self.name}_bucket{labels} {cumulative}')
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+        lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+# Radar boru hattı metrikleri
+STAGE_LATENCY = Histogram(
+    'radar_stage_duration_seconds',
+    'İşleme aşaması başına gecikme', labelnames=('stage',))
+FRAMES_PROCESSED = Counter(
+    'radar_frames_processed_total', 'İşlenen frame sayısı', labelnames=('sensor',))
+FRAMES_DROPPED = Counter(
+    'radar_frames_dropped_total', 'Düşürülen frame sayısı',
+    labelnames=('sensor', 'reason'))
+DETECTIONS = Counter(
+    'radar_detections_total', 'Tespit sayısı (cfar: ham, cluster: kümelenmiş)',
+    labelnames=('sensor', 'kind'))
+PREDICTION_CACHE = Counter(
+    'radar_prediction_cache_total', 'Sınıflandırma önbelleği sonuçları (hit, miss)',
+    labelnames=('sensor', 'result'))
+PREDICTION_SAVED = Counter(
+    'radar_prediction_saved_seconds_total',
+    'Sınıflandırma önbelleği isabetleriyle kazanılan tahmin süresi', labelnames=('sensor',))
+WORKER_RESTARTS = Counter(
+    'radar_worker_restarts_total', 'Çöküp yeniden başlatılan DSP işçisi sayısı',
+    labelnames=('worker',))
+QUEUE_DEPTH = Gauge(
+    'radar_queue_depth', 'Kuyruk doluluğu', labelnames=('sensor', 'queue'))
+QOS_LEVEL = Gauge(
+    'radar_qos_level', 'Yük uyarlamalı kalite seviyesi (0: tam kalite)', labelnames=('sensor',))
+CONNECTED_CLIENTS = Gauge(
+    'radar_connected_clients', 'Bağlı WebSocket istemci sayısı')
+
+
+class stage_timer:
+    """
+    Aşama süresini ölçen context manager
+
+    with stage_timer('socketio_emit'):
+        socketio.emit(...)
+    """
+
+    __slots__ = ('_stage', '_child', '_start')
+
+    def __init__(self, stage):
+        self._stage = stage
+        self._child = STAGE_LATENCY.labels(stage)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        self._child.observe(end - self._start)
+        if TRACER.enabled:
+            TRACER.add_span(self._stage, self._start, end)
+        return False
+
+
+def timed(stage):
+    """
+    Fonksiyon süresini STAGE_LATENCY histogramına yazan dekoratör
+
+    İzleme açıksa süre aynı zamanda aktif frame'e span olarak eklenir.
+    """
+    child = STAGE_LATENCY.labels(stage)
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                child.observe(end - start)
+                if TRACER.enabled:
+                    TRACER.add_span(stage, start, end)
+        return wrapper
+    return decorator
+
+
+def generate_latest(registry=REGISTRY):
+    """Kayıtlı tüm metrikleri Prometheus metni olarak döndür"""
+    return registry.generate()
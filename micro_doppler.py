@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Hedef Başına Mikro-Doppler Spektrogramı
+İzlenen her hedefin range bin'lerindeki yavaş zaman örneklerinden akan
+(streaming) STFT; spektrogram özetleri (bant genişliği, zarf)
+ActivityClassifier'a özellik olarak verilir
+"""
+
+import time
+
+import numpy as np
+
+C = 3e8
+
+# Konfigürasyon anahtarları (sensör config'inde)
+MICRO_DOPPLER_KEYS = ('micro_doppler_tracks', 'micro_doppler_window',
+                      'micro_doppler_hop', 'micro_doppler_history')
+
+# Özellik sırası (train_model.FEATURE_NAMES sonundaki iki özellik)
+FEATURE_NAMES = ('micro_doppler_bandwidth', 'micro_doppler_envelope')
+
+
+class TrackSpectrogram:
+    """
+    Tek hedefin akan STFT'si
+
+    Yavaş zaman örnekleri (hedef bin'i ± span) tampona eklenir; her hop
+    örnekte bir yeni sütun hesaplanır (yalnızca yeni pencere için FFT, eski
+    sütunlar yeniden hesaplanmaz). Sütun başına bant genişliği ve zarf,
+    history sütunluk halkada tutulur; ortalamaları için kayan toplamlar
+    sütun eklenip çıkarılırken O(1) güncellenir. Maliyet geçmiş
+    uzunluğundan bağımsızdır.
+
+    Frame'ler arasında boşluk varsa (zaman damgası beklenenden yarım
+    chirp'ten fazla sapıyorsa) pencereler boşluğu aşmaz: tampon sıfırlanır,
+    geçmiş korunur. Demo ve PlutoSDR döngüleri frame'lere duvar saati
+    zamanı verdiğinden pratikte her frame kendi sütunlarını üretir ve
+    sütunlar frame hızında (1-10 Hz) örneklenir. Bu hız adım ritmini
+    (0.5-4 Hz) örtüşmeden ölçmeye yetmediğinden ritim özelliği yoktur.
+    """
+
+    def __init__(self, range_bin, window, hop, history, chirp_duration, wavelength,
+                 threshold_db=6.0, dynamic_range_db=30.0, min_columns=4):
+        """
+        range_bin: Hedefin (kırpılmış haritadaki) range bin'i
+        window, hop: STFT penceresi ve adımı (chirp)
+        history: Özetlere katılan sütun sayısı
+        threshold_db: Gürültü tabanı (medyan) üstü sinyal eşiği
+        dynamic_range_db: Sütun tepesinin altındaki sinyal aralığı (güçlü
+                          statik yankının pencere yan lobları zarfa girmesin)
+        min_columns: Özellik üretmek için gereken en az sütun
+        """
+        self.range_bin = range_bin
+        self.window = window
+        self.hop = hop
+        self.history = history
+        self.chirp_duration = chirp_duration
+        self.threshold = 10 ** (threshold_db / 10)
+        self.dynamic_range = 10 ** (-dynamic_range_db / 10)
+        self.min_columns = min_columns
+        self.misses = 0
+
+        self._taper = np.hamming(window)
+        self._velocity = np.abs((np.arange(window) - window // 2) *
+                                wavelength / (2 * window * chirp_duration))
+        self._samples = None
+        self._start_time = None    # Tampondaki ilk örneğin zamanı
+        self._next_time = None     # Süreklilik için beklenen sonraki frame zamanı
+
+        # Sütun halkası
+        self.spectrogram = np.zeros((history, window), dtype=np.float32)
+        self.times = np.zeros(history)
+        self.bandwidth = np.zeros(history)
+        self.envelope = np.zeros(history)
+        self._index = 0
+        self.columns = 0
+        self._reset_sums()
+
+    def _reset_sums(self):
+        self._sum_bandwidth = 0.0
+        self._sum_envelope = 0.0
+
+    def push(self, samples, timestamp):
+        """
+        Frame'in yavaş zaman örneklerini ekle ve yeni sütunları hesapla
+
+        samples: (bin, chirp) kompleks
+        timestamp: Frame'in ilk chirp'inin zamanı (saniye)
+        """
+        period = self.chirp_duration
+        if (self._samples is None or self._next_time is None or
+                abs(timestamp - self._next_time) > period / 2):
+            self._samples = samples
+            self._start_time = timestamp
+        else:
+            self._samples = np.concatenate([self._samples, samples], axis=1)
+        self._next_time = timestamp + samples.shape[1] * period
+
+        length = self._samples.shape[1]
+        if length < self.window:
+            return 0
+        count = (length - self.window) // self.hop + 1
+        starts = np.arange(count) * self.hop
+        segments = self._samples[:, starts[:, None] + np.arange(self.window)]
+        spectrum = np.fft.fft(segments * self._taper, axis=2)
+        power = np.fft.fftshift((spectrum.real ** 2 + spectrum.imag ** 2).sum(axis=0), axes=1)
+        times = self._start_time + (starts + self.window / 2) * period
+
+        self._add_columns(power, times)
+        self._samples = self._samples[:, count * self.hop:]
+        self._start_time += count * self.hop * period
+        return count
+
+    def _add_columns(self, power, times):
+        # Sütun özetleri: gürültü tabanı üstündeki hücrelerin |hız| zarfı ve
+        # güç ağırlıklı RMS Doppler yayılımı (m/s)
+        floor = np.median(power, axis=1, keepdims=True)
+        signal = power > np.maximum(floor * self.threshold,
+                                    power.max(axis=1, keepdims=True) * self.dynamic_range)
+        weight = np.where(signal, power - floor, 0.0)
+        total = weight.sum(axis=1)
+        valid = total > 0
+        envelope = np.where(signal, self._velocity, 0.0).max(axis=1)
+        mean = (weight * self._velocity).sum(axis=1) / np.where(valid, total, 1)
+        spread = (weight * (self._velocity - mean[:, None]) ** 2).sum(axis=1)
+        bandwidth = np.sqrt(spread / np.where(valid, total, 1))
+
+        for column, t, bw, env in zip(power, times, bandwidth, envelope):
+            self._insert(column, t, bw, env)
+
+    def _insert(self, column, t, bandwidth, envelope):
+        i = self._index
+        if self.columns == self.history:
+            self._accumulate(self.bandwidth[i], self.envelope[i], -1)
+        self.spectrogram[i] = column
+        self.times[i] = t
+        self.bandwidth[i] = bandwidth
+        self.envelope[i] = envelope
+        self._accumulate(bandwidth, envelope, 1)
+        self._index = (i + 1) % self.history
+        self.columns = min(self.columns + 1, self.history)
+        # Kayan nokta hatası birikmesin: her turda toplamları baştan hesapla
+        if self._index == 0:
+            self._reset_sums()
+            for k in range(self.history):
+                self._accumulate(self.bandwidth[k], self.envelope[k], 1)
+
+    def _accumulate(self, bandwidth, envelope, sign):
+        self._sum_bandwidth += sign * bandwidth
+        self._sum_envelope += sign * envelope
+
+    def features(self):
+        """(bant genişliği, zarf) ortalamaları veya yeterli sütun yoksa None"""
+        n = self.columns
+        if n < self.min_columns:
+            return None
+        return (self._sum_bandwidth / n, self._sum_envelope / n)
+
+
+class MicroDopplerTracker:
+    """
+    Kümeleri range bin'e göre izlere eşler ve her ize STFT örneklerini verir
+
+    Her frame'de en yüksek SNR'lı micro_doppler_tracks küme, geçit içindeki
+    en yakın ize atanır (aynı ize düşen diğer kümeler o hedefin parçasıdır);
+    eşleşmeyen küme yeni iz açar, max_misses frame görülmeyen iz silinir.
+    Frame maliyeti iz sayısıyla sınırlıdır.
+    """
+
+    def __init__(self, config, span=2, gate=3.0, max_misses=5):
+        """
+        config: Radar konfigürasyonu
+        span: Hedef bin'inin iki yanında STFT'ye katılan bin sayısı (uzuvlar)
+        gate: Küme-iz eşleme geçidi (bin)
+        """
+        num_chirps = int(config['num_chirps'])
+        self.max_tracks = int(config.get('micro_doppler_tracks', 8))
+        self.window = max(8, min(int(config.get('micro_doppler_window', 128)), num_chirps))
+        self.hop = max(1, min(int(config.get('micro_doppler_hop', 64)), self.window))
+        self.history = int(config.get('micro_doppler_history', 64))
+        self.chirp_duration = config['chirp_duration']
+        self.wavelength = C / config['center_freq']
+        self.span = span
+        self.gate = gate
+        self.max_misses = max_misses
+        self.tracks = []
+
+    def update(self, range_fft, clusters, timestamp=None):
+        """
+        range_fft: (num_chirps, range bin) kompleks, kırpılmış (clusters ile aynı bin)
+        clusters: cluster_detections çıktısı [(range_bin, doppler_bin, snr, count), ...]
+        timestamp: Frame zamanı (None: şimdi)
+
+        return: En hareketli izin (en yüksek ortalama zarf) özellikleri,
+                iz yoksa sıfırlar
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        num_bins = range_fft.shape[1]
+        offsets = np.arange(-self.span, self.span + 1)
+
+        matched = []
+        candidates = sorted(clusters, key=lambda c: c[2], reverse=True)[:self.max_tracks]
+        for r, _, _, _ in candidates:
+            if any(abs(track.range_bin - r) <= self.gate for track in matched):
+                continue
+            free = [track for track in self.tracks
+                    if track not in matched and abs(track.range_bin - r) <= self.gate]
+            if free:
+                track = min(free, key=lambda t: abs(t.range_bin - r))
+            elif len(self.tracks) < self.max_tracks:
+                track = TrackSpectrogram(r, self.window, self.hop, self.history,
+                                         self.chirp_duration, self.wavelength)
+                self.tracks.append(track)
+            else:
+                continue
+            track.range_bin = r
+            track.misses = 0
+            matched.append(track)
+
+            columns = np.clip(int(round(r)) + offsets, 0, num_bins - 1)
+            track.push(range_fft[:, columns].T, timestamp)
+
+        for track in self.tracks:
+            if track not in matched:
+                track.misses += 1
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+
+        best = None
+        for track in self.tracks:
+            features = track.features()
+            if features is not None and (best is None or features[1] > best[1]):
+                best = features
+        return best if best is not None else (0.0, 0.0)
+
+    def reset(self):
+        self.tracks = []
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Model Yöneticisi
+Aktivite modeli arka planda yüklenir veya eğitilir; hazır olana kadar boru
+hatları ucuz bir kural tabanlı sınıflandırıcıyla çalışır. Eğitilmiş modeller
+özellik şeması ve eğitim parametrelerinin özetiyle (hash) anahtarlanarak
+saklanır, böylece yeniden eğitim yalnızca girdiler değiştiğinde yapılır.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+import numpy as np
+
+# Sınıf kimlikleri (ActivityClassifier.ACTIVITY_LABELS)
+_EMPTY, _STANDING, _WALKING = 0, 2, 3
+
+# Özellik indeksleri (train_model.FEATURE_NAMES)
+_NUM_TARGETS, _VELOCITY_MEAN, _VELOCITY_STD = 0, 3, 4
+
+
+class FallbackModel:
+    """
+    Model hazır olana kadar kullanılan kural tabanlı sınıflandırıcı
+
+    sklearn arayüzünü taklit eder (scaler olarak da kullanılır, transform
+    özellikleri değiştirmez): hedef yoksa 'Yok', hız ortalaması veya
+    sapması walking_speed'i aşıyorsa 'Yürüme', aksi halde 'Ayakta'.
+    Güven düşük tutulur; arayüz modelin henüz hazır olmadığını güvenden ve
+    /api/status içindeki model durumundan görebilir.
+    """
+
+    num_classes = 5
+
+    def __init__(self, walking_speed=0.4, confidence=0.5):
+        self.walking_speed = walking_speed
+        self.confidence = confidence
+
+    def transform(self, X):
+        return np.asarray(X, dtype=float)
+
+    def predict(self, X):
+        X = np.atleast_2d(X)
+        moving = (np.abs(X[:, _VELOCITY_MEAN]) > self.walking_speed) | \
+            (X[:, _VELOCITY_STD] > self.walking_speed)
+        return np.where(X[:, _NUM_TARGETS] == 0, _EMPTY,
+                        np.where(moving, _WALKING, _STANDING))
+
+    def predict_proba(self, X):
+        pred = self.predict(X)
+        rest = (1 - self.confidence) / (self.num_classes - 1)
+        proba = np.full((len(pred), self.num_classes), rest)
+        proba[np.arange(len(pred)), pred] = self.confidence
+        return proba
+
+
+def artifact_key():
+    """
+    Özellik şeması, eğitim parametreleri ve scikit-learn sürümünden
+    türetilen model anahtarı (ikisinden biri değişirse yeni model eğitilir)
+    """
+    import sklearn
+    from train_model import FEATURE_NAMES, TRAINING_PARAMS
+
+    spec = json.dumps({'features': FEATURE_NAMES, 'training': TRAINING_PARAMS,
+                       'sklearn': sklearn.__version__}, sort_keys=True)
+    return hashlib.sha256(spec.encode('utf-8')).hexdigest()[:16]
+
+
+class ModelManager:
+    """
+    Aktivite modelini arka planda hazırlar ve atomik olarak yayınlar
+
+    current: (version, model, scaler) - tek referans olarak değiştirilir,
+             okuyan taraf kilit almaz. version 0 yedek sınıflandırıcıdır;
+             boru hatları frame sınırında sürümü karşılaştırıp günceller.
+    artifact: (version, dosya yolu) veya None - süreç modundaki işçiler
+              modeli bu dosyadan yükler.
+    """
+
+    def __init__(self, directory='models'):
+        """directory: Eğitilmiş model dosyalarının saklandığı dizin"""
+        self.directory = directory
+        self.state = 'idle'
+        self.error = None
+        self.key = None
+        self.path = None
+        self.elapsed = None
+
+        fallback = FallbackModel()
+        self.current = (0, fallback, fallback)
+        self.artifact = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Arka planda yükleme/eğitimi başlat (yalnızca ilk çağrıda)"""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.state = 'loading'
+            self._thread = threading.Thread(target=self._prepare, daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """Model hazır olana (veya hazırlık başarısız olana) kadar bekle"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    @property
+    def ready(self):
+        return self.current[0] > 0
+
+    def _prepare(self):
+        start = time.perf_counter()
+        try:
+            from train_model import ActivityClassifier
+
+            self.key = artifact_key()
+            path = os.path.join(self.directory, f'activity_{self.key}.pkl')
+            classifier = ActivityClassifier()
+            try:
+                data = classifier.load(path)
+                if data.get('key') != self.key:
+                    raise ValueError(f"Model anahtarı uyuşmuyor: {path}")
+            except (OSError, ValueError, KeyError, EOFError) as e:
+                if not isinstance(e, FileNotFoundError):
+                    print(f"Model yüklenemedi ({e}), yeniden eğitiliyor...")
+                self.state = 'training'
+                classifier = ActivityClassifier()
+                classifier.train(save_path=None, plot=False)
+                os.makedirs(self.directory, exist_ok=True)
+                classifier.save(path, key=self.key)
+
+            self.path = path
+            version = self.current[0] + 1
+            self.artifact = (version, path)
+            self.current = (version, classifier.model, classifier.scaler)
+            self.state = 'ready'
+        except Exception as e:
+            print(f"Model hazırlanamadı, yedek sınıflandırıcı kullanılıyor: {e}")
+            self.state = 'failed'
+            self.error = str(e)
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+    def get_status(self):
+        return {
+            'state': self.state,
+            'fallback': not self.ready,
+            'version': self.current[0],
+            'key': self.key,
+            'path': self.path,
+            'elapsed_s': self.elapsed,
+            'error': self.error
+        }
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Kurulumda (Docker imajı, install.sh) anahtarlı modeli önceden hazırla:
+    # sunucu ilk açılışta eğitim beklemeden gerçek modelle başlar
+    manager = ModelManager(sys.argv[1] if len(sys.argv) > 1 else 'models')
+    manager.start()
+    if not manager.wait():
+        sys.exit(1)
+    print(f"✓ Model hazır: {manager.path} ({manager.elapsed:.1f} s)")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Simüle Edilmiş PlutoSDR
+adi.Pluto yerine geçen yerel cihaz: rx() tamponları örnekleme hızına göre
+zamanlanır (gerçek zamanlı akış), tüketici geride kalırsa çekirdek
+tamponları taşar ve örnekler kaybolur. Alım yolu cihaz olmadan
+ölçülebilir ve test edilebilir (rx_benchmark.py, sensors.json "uri": "sim").
+"""
+
+import time
+
+import numpy as np
+
+# AD9363 ADC'si 12 bit: I/Q tam ölçeği ±2048
+ADC_FULL_SCALE = 2048
+
+
+def scene_waveform(config, activity='Yürüme', frames=8, seed=0):
+    """
+    Sahne simülatöründen ardışık frame'ler (düzleştirilmiş, ADC ölçeğinde)
+
+    config: Radar konfigürasyonu (num_chirps, num_samples, ...)
+    return: complex128 dizi, uzunluk frames * num_chirps * num_samples
+    """
+    from scene_simulator import activity_scene
+
+    scene = activity_scene(activity, config, seed=seed)
+    iq = scene.frames(frames).ravel()
+    return iq * (ADC_FULL_SCALE / 4 / max(np.abs(iq).max(), 1e-12))
+
+
+class SimulatedPluto:
+    """
+    adi.Pluto arayüzünün alım için kullanılan bölümü
+
+    Akış ilk rx() çağrısında başlar; k. tampon t0 + (k+1) * rx_buffer_size /
+    sample_rate anında hazırdır ve rx() o ana kadar bekler. Çekirdekte en
+    fazla kernel_buffers dolu tampon tutulur; tüketici daha fazla geride
+    kalırsa en eskiler düşürülür (overflows, dropped_samples). Tampon boyutu
+    veya örnekleme hızı değişince akış yeniden başlar (rx_destroy_buffer).
+
+    Dönen veri pyadi-iio gibi complex128 ve tamsayı (ADC) değerlidir;
+    waveform dairesel olarak okunur.
+    """
+
+    name = 'PlutoSDR (simülasyon)'
+
+    def __init__(self, uri='sim', waveform=None, kernel_buffers=4, seed=0):
+        """
+        uri: Yalnızca bilgi amaçlı
+        waveform: Döngüsel olarak okunacak kompleks örnekler (None: gürültü)
+        kernel_buffers: libiio çekirdek tampon sayısı (pyadi-iio varsayılanı 4)
+        """
+        self.uri = uri
+        self.kernel_buffers = kernel_buffers
+        if waveform is None:
+            rng = np.random.default_rng(seed)
+            noise = rng.standard_normal((2, 1 << 16))
+            waveform = (noise[0] + 1j * noise[1]) * (ADC_FULL_SCALE / 64)
+        self._waveform = np.round(np.asarray(waveform, dtype=np.complex128).ravel())
+
+        # adi.Pluto öznitelikleri (yazılabilir, alım yalnızca ilk ikisini kullanır)
+        self.sample_rate = int(2.5e6)
+        self.rx_buffer_size = 1024
+        self.rx_rf_bandwidth = int(2e6)
+        self.rx_lo = int(2.4e9)
+        self.tx_lo = int(2.4e9)
+        self.tx_cyclic_buffer = False
+        self.gain_control_mode_chan0 = 'slow_attack'
+
+        self.overflows = 0
+        self.dropped_samples = 0
+        self.last_index = None      # Son tamponun ilk örneğinin akıştaki sırası
+        self._stream = None         # (t0, buffer_size, sample_rate)
+        self._next = 0
+        self._tiled = None
+
+    def rx_destroy_buffer(self):
+        """Akışı durdur; sonraki rx() yeni akış başlatır"""
+        self._stream = None
+
+    def _start(self, size, rate):
+        self._stream = (time.perf_counter(), size, rate)
+        self._next = 0
+        # Tampon dairesel waveform sınırını aşabilsin diye baş tarafı ekle
+        period = len(self._waveform)
+        reps = int(np.ceil(size / period)) + 1
+        self._tiled = np.tile(self._waveform, reps)
+
+    def rx(self):
+        size, rate = int(self.rx_buffer_size), float(self.sample_rate)
+        if self._stream is None or self._stream[1:] != (size, rate):
+            self._start(size, rate)
+        t0 = self._stream[0]
+        duration = size / rate
+
+        # Çekirdek tamponları dolduysa DMA yeni örnekleri yazamaz: aradakiler kaybolur
+        produced = int((time.perf_counter() - t0) / duration)
+        oldest = produced - self.kernel_buffers
+        if self._next < oldest:
+            self.overflows += 1
+            self.dropped_samples += (oldest - self._next) * size
+            self._next = oldest
+
+        remaining = t0 + (self._next + 1) * duration - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
+
+        index = self._next * size
+        offset = index % len(self._waveform)
+        self._next += 1
+        self.last_index = index
+        return self._tiled[offset:offset + size].copy()
+
+    def get_status(self):
+        return {
+            'uri': self.uri,
+            'sample_rate': self.sample_rate,
+            'rx_buffer_size': self.rx_buffer_size,
+            'overflows': self.overflows,
+            'dropped_samples': self.dropped_samples
+        }
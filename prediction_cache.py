@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Sınıflandırma Önbelleği
+Durağan sahnelerde ardışık özellik vektörleri neredeyse aynıdır; tahmin
+nicemlenmiş özellik vektörüyle önbelleğe alınır ve model yeniden çalışmaz
+"""
+
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Konfigürasyon anahtarları (sensör config'inde)
+CACHE_KEYS = ('predict_cache_size', 'predict_cache_step', 'predict_cache_ttl')
+
+
+class PredictionCache:
+    """
+    Nicemlenmiş özellik vektörü -> (class_id, class_name, confidence) LRU önbelleği
+
+    Anahtar round(features / step) tam sayı vektörüdür: her özellik step
+    kadar aralıklarla kovalanır. TTL süresi dolan kayıt ıska sayılır ve
+    model yeniden çalışır; böylece uzun sessiz dönemlerde bile sınıf
+    periyodik olarak tazelenir. Kazanılan süre, ıskalardaki ortalama tahmin
+    süresi ile isabetteki arama süresinin farkıdır.
+
+    Önbellek tek bir iş parçacığı (sensör döngüsü veya DSP işçisi)
+    tarafından kullanılır.
+    """
+
+    def __init__(self, step=2.0, capacity=128, ttl=5.0):
+        """
+        step: Nicemleme adımı (tek değer veya özellik başına dizi)
+        capacity: Saklanacak tahmin sayısı
+        ttl: Kaydın geçerlilik süresi (saniye, 0: süresiz)
+        """
+        self.step = step
+        self.capacity = int(capacity)
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.saved = 0.0
+        self._miss_time = 0.0
+        # Son get() çağrısının sonucu (sonuç kaydına eklemek için)
+        self.last_hit = False
+        self.last_saved = 0.0
+
+    def configure(self, step=None, capacity=None, ttl=None):
+        """Ayarları değiştir; adım değişirse anahtarlar geçersiz olduğundan silinir"""
+        if step is not None and not np.array_equal(step, self.step):
+            self.step = step
+            self._entries.clear()
+        if capacity is not None:
+            self.capacity = int(capacity)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        if ttl is not None:
+            self.ttl = ttl
+
+    def key(self, features):
+        quantized = np.floor(np.asarray(features, dtype=float) / self.step + 0.5)
+        return quantized.astype(np.int64).tobytes()
+
+    def get(self, features):
+        """Önbellekteki tahmin veya None (ıska)"""
+        start = time.perf_counter()
+        key = self.key(features)
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl and time.monotonic() - entry[1] > self.ttl:
+            del self._entries[key]
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            self.last_hit = False
+            self.last_saved = 0.0
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.last_hit = True
+        self.last_saved = max(0.0, self.average_miss_time - (time.perf_counter() - start))
+        self.saved += self.last_saved
+        return entry[0]
+
+    def put(self, features, prediction, elapsed):
+        """
+        Iskadan sonra hesaplanan tahmini ekle
+
+        elapsed: Tahminin süresi (saniye), kazanılan süre tahmini için
+        """
+        self._miss_time += elapsed
+        key = self.key(features)
+        self._entries[key] = (prediction, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    @property
+    def average_miss_time(self):
+        return self._miss_time / self.misses if self.misses else 0.0
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_status(self):
+        return {
+            'capacity': self.capacity,
+            'entries': len(self._entries),
+            'ttl_s': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'saved_s': self.saved
+        }
+
+
+def configure_cache(config, cache=None):
+    """
+    Sensör config'ine göre önbelleği oluştur veya mevcut olanı güncelle
+
+    return: PredictionCache veya predict_cache_size 0 ise None
+    """
+    capacity = int(config.get('predict_cache_size', 0) or 0)
+    if capacity <= 0:
+        return None
+    step = config.get('predict_cache_step', 2.0)
+    ttl = config.get('predict_cache_ttl', 5.0)
+    if cache is None:
+        return PredictionCache(step, capacity, ttl)
+    cache.configure(step, capacity, ttl)
+    return cache
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Yük Uyarlamalı Hizmet Kalitesi (QoS)
+Frame işleme süresi hedef periyodu aştığında boru hattının kalitesi kademeli
+olarak düşürülür (görüntü, sınıflandırma sıklığı, CFAR, Doppler boyutu);
+yük azalınca kademeler geri alınır. Böylece zayıf donanımda güncelleme
+gecikmesi sınırsız büyümez.
+"""
+
+import threading
+
+# Seviyeler: her seviye öncekilerin düşürmelerini de içerir
+QOS_LEVELS = ('full', 'skip_image', 'classify_interval', 'coarse_cfar', 'reduced_doppler')
+SKIP_IMAGE, CLASSIFY_INTERVAL, COARSE_CFAR, REDUCED_DOPPLER = 1, 2, 3, 4
+
+# Konfigürasyon anahtarları (sensör config'inde)
+QOS_KEYS = ('qos_enabled', 'qos_target_period', 'qos_max_level', 'qos_classify_interval',
+            'qos_cfar_levels', 'qos_doppler_factor')
+
+
+def frame_quality(config, level):
+    """
+    QoS seviyesine göre frame'in işlenme kalitesi
+
+    Konfigürasyon değişmez ve işlemci yeniden kurulmaz (statik yankı arka
+    planı, entegrasyon halkası, mikro-Doppler izleri korunur); değerler
+    FMCWProcessor.set_quality ile frame başına uygulanır. Kaba CFAR piramit
+    CFAR'ı en az qos_cfar_levels seviyeyle açar, Doppler azaltma Doppler
+    FFT'ye frame'in ilk num_chirps / qos_doppler_factor chirp'ini sokar (hız
+    çözünürlüğü kabalaşır, maksimum hız aynı kalır).
+
+    return: (cfar_levels, doppler_chirps); tam kalitede (0, None)
+    """
+    if level < COARSE_CFAR:
+        return 0, None
+    doppler_chirps = None
+    if level >= REDUCED_DOPPLER:
+        doppler_chirps = max(8, int(config['num_chirps']) //
+                             int(config.get('qos_doppler_factor', 2)))
+    return config.get('qos_cfar_levels', 2), doppler_chirps
+
+
+class QosController:
+    """
+    İşleme süresinin hedef periyoda oranını (yük) izleyip seviye seçer
+
+    Yük üstel ortalamayla (alpha) düzeltilir. Yük high'ı aşarsa en az hold
+    frame sonra bir seviye düşülür; low'un altına inerse bir seviye çıkılır.
+    Çıkıştan hemen sonra yeniden düşmek gerekirse (seviye kaldırılamıyor)
+    çıkış bekleme süresi iki katına çıkar, böylece seviyeler arasında
+    salınım seyrekleşir.
+
+    observe() herhangi bir iş parçacığından çağrılabilir; level tek değer
+    olarak değişir ve boru hattı onu frame sınırında uygular.
+    """
+
+    def __init__(self, target_period, enabled=True, max_level=len(QOS_LEVELS) - 1,
+                 high=0.9, low=0.5, alpha=0.2, hold=10, max_hold=320):
+        """
+        target_period: Hedef frame periyodu (saniye)
+        high, low: Seviye düşürme / yükseltme yük eşikleri
+        hold: Seviye değişiklikleri arasındaki en az frame sayısı
+        """
+        self.target_period = float(target_period)
+        self.enabled = bool(enabled)
+        self.max_level = int(max_level)
+        self.high = high
+        self.low = low
+        self.alpha = alpha
+        self.hold = hold
+        self.max_hold = max_hold
+
+        self.level = 0
+        self.load = None
+        self.last_duration = None
+        self.changes = 0
+        self._since_change = 0
+        self._up_hold = hold
+        self._last_step = None
+        self._lock = threading.Lock()
+
+    def configure(self, target_period=None, enabled=None, max_level=None):
+        """Ayarları değiştir; seviye yeni sınırın üstündeyse hemen indirilir"""
+        with self._lock:
+            if target_period is not None:
+                self.target_period = float(target_period)
+            if enabled is not None:
+                self.enabled = bool(enabled)
+            if max_level is not None:
+                self.max_level = int(max_level)
+            limit = self.max_level if self.enabled else 0
+            if self.level > limit:
+                self._set_level(limit, None)
+
+    def observe(self, duration):
+        """
+        Bir frame'in işleme süresini (saniye) kaydet
+
+        return: Seviye değiştiyse yeni seviye, aksi halde None
+        """
+        with self._lock:
+            self.last_duration = duration
+            if self.target_period <= 0:
+                return None
+            load = duration / self.target_period
+            self.load = load if self.load is None else \
+                self.load + self.alpha * (load - self.load)
+            self._since_change += 1
+            if not self.enabled:
+                return None
+
+            if (self.load > self.high and self.level < self.max_level and
+                    self._since_change >= self.hold):
+                if self._last_step == 'up' and self._since_change < 2 * self._up_hold:
+                    # Az önce çıkılan seviye kaldırılamadı: bir dahaki çıkışı geciktir
+                    self._up_hold = min(2 * self._up_hold, self.max_hold)
+                self._set_level(self.level + 1, 'down')
+                return self.level
+            if (self.load < self.low and self.level > 0 and
+                    self._since_change >= self._up_hold):
+                self._set_level(self.level - 1, 'up')
+                return self.level
+            if self._since_change >= 4 * self._up_hold:
+                # Uzun süre kararlı: bekleme süresini sıfırla
+                self._up_hold = self.hold
+            return None
+
+    def _set_level(self, level, step):
+        self.level = level
+        self._last_step = step
+        self._since_change = 0
+        self.changes += 1
+
+    def get_status(self):
+        return {
+            'enabled': self.enabled,
+            'level': self.level,
+            'name': QOS_LEVELS[self.level],
+            'max_level': self.max_level,
+            'target_period_s': self.target_period,
+            'load': self.load,
+            'last_duration_s': self.last_duration,
+            'changes': self.changes
+        }
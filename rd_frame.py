@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Range-Doppler Frame Sonucu
+Doğrusal güç bir kez tutulur; dB dönüşümü ve aşamaların paylaştığı
+indirgemeler (mesafe/Doppler profilleri, bant ortalamaları) ilk
+kullanımda hesaplanıp önbelleğe alınır
+"""
+
+import numpy as np
+
+# 20*log10(|X| + 1e-10) ile aynı taban
+POWER_FLOOR = 1e-20
+
+
+class RangeDopplerFrame:
+    """
+    Tek frame'in Range-Doppler sonucu
+
+    power: (num_doppler, num_range) doğrusal güç |X|^2
+    db:    10*log10(power) - yalnızca ihtiyaç duyulduğunda hesaplanır
+
+    CFAR doğrudan power üzerinde çalışır; özellik çıkarımı ve görüntü
+    oluşturma aynı (önbellekteki) dB haritasını ve profilleri paylaşır.
+    looks, haritada ortalaması alınmış frame sayısıdır (evreuyumsuz
+    entegrasyon; CFAR eşiği buna göre seçilir).
+    Nesne oluşturulduktan sonra diziler değiştirilmemelidir.
+    """
+
+    def __init__(self, power=None, db=None, looks=1):
+        if power is None and db is None:
+            raise ValueError("power veya db verilmeli")
+        self.looks = looks
+        self._power = power
+        self._db = db
+        self._range_profile = None
+        self._doppler_profile = None
+        self._noise_floor = None
+        self._pyramid = []
+
+    @classmethod
+    def from_db(cls, db):
+        """Mevcut dB haritasını sar (power gerektiğinde hesaplanır)"""
+        return cls(db=np.asarray(db))
+
+    @property
+    def shape(self):
+        return (self._power if self._power is not None else self._db).shape
+
+    @property
+    def power(self):
+        if self._power is None:
+            self._power = 10 ** (self._db / 10)
+        return self._power
+
+    @property
+    def db(self):
+        if self._db is None:
+            self._db = 10 * np.log10(self._power + POWER_FLOOR)
+        return self._db
+
+    @property
+    def range_profile(self):
+        """Mesafe bin'i başına ortalama güç (dB), Doppler ekseni boyunca"""
+        if self._range_profile is None:
+            self._range_profile = self.db.mean(axis=0)
+        return self._range_profile
+
+    @property
+    def doppler_profile(self):
+        """Doppler bin'i başına ortalama güç (dB), mesafe ekseni boyunca"""
+        if self._doppler_profile is None:
+            self._doppler_profile = self.db.mean(axis=1)
+        return self._doppler_profile
+
+    @property
+    def noise_floor(self):
+        """
+        Gürültü tabanı (dB): haritanın medyanı
+
+        Hedefler ve yan bantlar hücrelerin küçük bir kısmını kapladığından
+        medyan alıcı kazancıyla birlikte kayan gürültü seviyesini izler.
+        """
+        if self._noise_floor is None:
+            self._noise_floor = float(np.median(self.db))
+        return self._noise_floor
+
+    def power_pyramid(self, levels):
+        """
+        Blok ortalamalı güç piramidi: [seviye 1, ..., seviye levels]
+
+        Her seviye bir öncekinin 2x2 blok ortalamasıdır (tek sayılı kenar
+        satır/sütun atılır). Seviyeler ilk istekte hesaplanıp frame üzerinde
+        saklanır; aynı frame için tekrar istemek yeni hesap yapmaz.
+        """
+        pyramid = self._pyramid
+        level = pyramid[-1] if pyramid else self.power
+        while len(pyramid) < levels:
+            rows, cols = level.shape[0] // 2, level.shape[1] // 2
+            if rows == 0 or cols == 0:
+                break
+            # 2x2 bloğun dört hücresi adımlı görünümlerle toplanır
+            # (reshape + mean eksen indirgemesinden belirgin şekilde hızlı)
+            level = (level[0:2 * rows:2, 0:2 * cols:2] + level[0:2 * rows:2, 1:2 * cols:2] +
+                     level[1:2 * rows:2, 0:2 * cols:2] + level[1:2 * rows:2, 1:2 * cols:2]) * 0.25
+            pyramid.append(level)
+        return pyramid[:levels]
+
+    def doppler_band_mean(self, *bands):
+        """
+        Doppler satır aralıklarının (slice) birleşiminin ortalama gücü (dB)
+
+        Her satır aynı sayıda hücre içerdiğinden, harita dilimlerinin
+        birleştirilmiş ortalamasıyla aynıdır; maliyet O(Doppler bin).
+        """
+        rows = np.concatenate([self.doppler_profile[band] for band in bands])
+        return float(np.mean(rows))
+
+    def range_slice(self, columns):
+        """Mesafe sütunlarının alt frame'i (kopyasız; hesaplanmış dB korunur)"""
+        return RangeDopplerFrame(
+            power=None if self._power is None else self._power[:, columns],
+            db=None if self._db is None else self._db[:, columns],
+            looks=self.looks)
+
+
+def as_frame(range_doppler):
+    """RangeDopplerFrame veya dB haritası al, RangeDopplerFrame döndür"""
+    if isinstance(range_doppler, RangeDopplerFrame):
+        return range_doppler
+    return RangeDopplerFrame.from_db(range_doppler)
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Range-Doppler Görüntü Oluşturma
+Haritaları dashboard için PNG görüntülere çevirir; kayıtlı
+frame dizilerini toplu olarak video veya mozaik görüntülere dönüştürür
+"""
+
+import io
+import os
+import itertools
+import shutil
+import subprocess
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.figure import Figure
+
+from metrics import timed
+from rd_frame import as_frame
+
+
+@timed('render_range_doppler_image')
+def render_range_doppler_png(rd_map, extent):
+    """
+    Range-Doppler haritasını (dB dizisi veya RangeDopplerFrame) PNG baytlarına çevir
+
+    extent: [min_mesafe, max_mesafe, min_hız, max_hız]
+
+    pyplot durum makinesi yerine doğrudan Figure kullanılır; böylece birden
+    fazla sensör iş parçacığı aynı anda güvenle görüntü üretebilir.
+    """
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+
+    im = ax.imshow(as_frame(rd_map).db, aspect='auto', cmap='jet',
+                   extent=extent, origin='lower')
+    ax.set_xlabel('Mesafe (m)')
+    ax.set_ylabel('Hız (m/s)')
+    ax.set_title('Range-Doppler Haritası')
+    fig.colorbar(im, ax=ax, label='Güç (dB)')
+
+    # PNG'ye çevir
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=100, bbox_inches='tight')
+    return buf.getvalue()
+
+
+def colormap_lut(name='jet', size=256):
+    """Renk haritasını (size, 3) uint8 arama tablosuna çevir"""
+    return (colormaps[name](np.linspace(0, 1, size))[:, :3] * 255).astype(np.uint8)
+
+
+class SequenceRenderer:
+    """
+    Range-Doppler dizileri için hızlı görüntü oluşturucu
+
+    Her frame için yeni bir figür kurmak yerine dB değerleri sabit bir
+    [vmin, vmax] aralığında renk tablosu indekslerine çevrilir ve tablo
+    üzerinden doğrudan RGB dizisi üretilir. Küme işaretleri piksel olarak
+    çizilir. Görüntü yönü dashboard ile aynıdır: yatay eksen mesafe,
+    dikey eksen hız (pozitif hız yukarıda).
+    """
+
+    def __init__(self, vmin=None, vmax=None, cmap='jet', scale=2,
+                 marker_color=(255, 255, 255), marker_size=3):
+        """
+        vmin, vmax: Renk aralığı (dB). None ise ilk frame'den belirlenir ve
+                    sonraki frame'ler için sabit kalır
+        scale: Piksel büyütme katsayısı (en yakın komşu)
+        """
+        self.vmin = vmin
+        self.vmax = vmax
+        self.scale = int(scale)
+        self.marker_color = np.array(marker_color, dtype=np.uint8)
+        self.marker_size = marker_size
+        self._lut = colormap_lut(cmap)
+
+    def render(self, rd_map, clusters=()):
+        """
+        rd_map: (num_doppler, num_range) dB dizisi veya RangeDopplerFrame
+        clusters: cluster_detections çıktısı [(range_bin, doppler_bin, snr, count), ...]
+        return: (H, W, 3) uint8 RGB
+        """
+        db = as_frame(rd_map).db
+        if self.vmin is None:
+            self.vmin = float(np.percentile(db, 5))
+        if self.vmax is None:
+            self.vmax = float(db.max())
+
+        levels = len(self._lut) - 1
+        span = max(self.vmax - self.vmin, 1e-9)
+        index = ((db - self.vmin) * (levels / span)).clip(0, levels).astype(np.uint8)
+        rgb = self._lut[index[::-1]]
+        if self.scale > 1:
+            rgb = rgb.repeat(self.scale, axis=0).repeat(self.scale, axis=1)
+
+        num_doppler = db.shape[0]
+        height, width = rgb.shape[:2]
+        arm = self.marker_size * self.scale
+        for r, d, *_ in clusters:
+            # 'x' işareti: iki köşegen
+            x = int(round((r + 0.5) * self.scale))
+            y = int(round((num_doppler - 1 - d + 0.5) * self.scale))
+            for k in range(-arm, arm + 1):
+                for yy in (y + k, y - k):
+                    xx = x + k
+                    if 0 <= xx < width and 0 <= yy < height:
+                        rgb[yy, xx] = self.marker_color
+        return rgb
+
+
+class VideoWriter:
+    """
+    RGB frame'leri ffmpeg'e ham video olarak aktarır (bellekte tutmaz)
+
+    ffmpeg sistemde kurulu olmalıdır.
+    """
+
+    def __init__(self, path, fps=10, crf=23):
+        self.path = path
+        self.fps = fps
+        self.crf = crf
+        self._process = None
+        self._shape = None
+
+    @staticmethod
+    def available():
+        return shutil.which('ffmpeg') is not None
+
+    def _open(self, shape):
+        height, width = shape[:2]
+        # yuv420p için boyutlar çift olmalı
+        self._shape = (height + height % 2, width + width % 2)
+        self._process = subprocess.Popen(
+            ['ffmpeg', '-loglevel', 'error', '-y',
+             '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+             '-s', f'{self._shape[1]}x{self._shape[0]}', '-r', str(self.fps),
+             '-i', '-', '-pix_fmt', 'yuv420p', '-crf', str(self.crf), self.path],
+            stdin=subprocess.PIPE)
+
+    def write(self, rgb):
+        if self._process is None:
+            self._open(rgb.shape)
+        height, width = self._shape
+        if rgb.shape[:2] != self._shape:
+            padded = np.zeros((height, width, 3), dtype=np.uint8)
+            padded[:rgb.shape[0], :rgb.shape[1]] = rgb
+            rgb = padded
+        self._process.stdin.write(np.ascontiguousarray(rgb).tobytes())
+
+    def close(self):
+        if self._process is not None:
+            self._process.stdin.close()
+            if self._process.wait() != 0:
+                raise RuntimeError(f"ffmpeg başarısız: {self.path}")
+            self._process = None
+        return [self.path]
+
+
+class MosaicWriter:
+    """
+    Frame'leri columns x rows ızgaralı PNG sayfalarına yazar
+
+    Bellekte yalnızca tek bir sayfa tutulur; sayfa dolunca diske yazılır.
+    Sayfa dosyaları: <önek>_0000.png, <önek>_0001.png, ...
+    """
+
+    def __init__(self, prefix, columns=10, rows=6, gap=2):
+        self.prefix = prefix
+        self.columns = columns
+        self.rows = rows
+        self.gap = gap
+        self.files = []
+        self._sheet = None
+        self._count = 0
+        self._tile = None
+
+    def write(self, rgb):
+        from PIL import Image
+
+        if self._sheet is None:
+            self._tile = rgb.shape[:2]
+            height = self.rows * (self._tile[0] + self.gap) - self.gap
+            width = self.columns * (self._tile[1] + self.gap) - self.gap
+            self._sheet = np.zeros((height, width, 3), dtype=np.uint8)
+
+        row, column = divmod(self._count, self.columns)
+        y = row * (self._tile[0] + self.gap)
+        x = column * (self._tile[1] + self.gap)
+        self._sheet[y:y + self._tile[0], x:x + self._tile[1]] = rgb[:self._tile[0], :self._tile[1]]
+        self._count += 1
+
+        if self._count == self.columns * self.rows:
+            self._flush(Image)
+
+    def _flush(self, Image):
+        path = f"{self.prefix}_{len(self.files):04d}.png"
+        Image.fromarray(self._sheet).save(path)
+        self.files.append(path)
+        self._sheet[:] = 0
+        self._count = 0
+
+    def close(self):
+        from PIL import Image
+
+        if self._count:
+            self._flush(Image)
+        return list(self.files)
+
+
+def render_sequence(maps, writer, clusters=None, renderer=None):
+    """
+    Range-Doppler dizisini akış halinde işle ve writer'a yaz
+
+    maps: dB haritaları / RangeDopplerFrame'ler (dizi, liste veya üreteç)
+    clusters: Her frame için küme listesi (aynı uzunlukta yinelenebilir) veya None
+    writer: VideoWriter veya MosaicWriter
+    return: Yazılan dosyalar
+    """
+    if renderer is None:
+        renderer = SequenceRenderer()
+    if clusters is None:
+        clusters = itertools.repeat(())
+    try:
+        for rd_map, frame_clusters in zip(maps, clusters):
+            writer.write(renderer.render(rd_map, frame_clusters))
+    finally:
+        files = writer.close()
+    return files
+
+
+def _capture_sequence(capture, start, stop, detect):
+    """Kayıt dosyasındaki frame'leri işleyip (harita, kümeler) üret"""
+    from signal_processor import FMCWProcessor
+
+    processor = FMCWProcessor(capture.config)
+    for i in range(start, stop):
+        rd_frame = processor.process_frame_power(capture.read(i)[0])
+        clusters = ()
+        if detect:
+            clusters = processor.cluster_detections(processor.cfar_detector(rd_frame))
+        yield rd_frame, clusters
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    import argparse
+
+    from capture_recorder import CaptureFile
+
+    parser = argparse.ArgumentParser(
+        description='Kayıt dosyasını Range-Doppler videosuna/mozaiğine dönüştür')
+    parser.add_argument('capture', help='.rcap kayıt dosyası')
+    parser.add_argument('output', help='Video dosyası (.mp4) veya mozaik öneki')
+    parser.add_argument('--mosaic', metavar='CxR', help='Mozaik ızgarası, örn. 10x6')
+    parser.add_argument('--fps', type=float, default=10)
+    parser.add_argument('--scale', type=int, default=2)
+    parser.add_argument('--start', type=int, default=0)
+    parser.add_argument('--stop', type=int, default=None)
+    parser.add_argument('--vmin', type=float, default=None)
+    parser.add_argument('--vmax', type=float, default=None)
+    parser.add_argument('--no-detect', action='store_true', help='CFAR işaretlerini çizme')
+    args = parser.parse_args()
+
+    capture = CaptureFile(args.capture)
+    stop = len(capture) if args.stop is None else min(args.stop, len(capture))
+
+    if args.mosaic:
+        columns, rows = (int(v) for v in args.mosaic.lower().split('x'))
+        writer = MosaicWriter(os.path.splitext(args.output)[0], columns, rows)
+    else:
+        if not VideoWriter.available():
+            print("ffmpeg bulunamadı; --mosaic kullanın")
+            sys.exit(1)
+        writer = VideoWriter(args.output, fps=args.fps)
+
+    renderer = SequenceRenderer(args.vmin, args.vmax, scale=args.scale)
+    t0 = time.time()
+    try:
+        for rd_frame, clusters in _capture_sequence(capture, args.start, stop,
+                                                    not args.no_detect):
+            writer.write(renderer.render(rd_frame, clusters))
+    finally:
+        files = writer.close()
+    elapsed = time.time() - t0
+    count = stop - args.start
+    print(f"✓ {count} frame, {elapsed:.1f} s ({count / max(elapsed, 1e-9):.1f} frame/s)")
+    for path in files:
+        print(f"  {path}")
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+RX Alım Verimi Karşılaştırması
+rx_buffer_size, örnekleme hızı, frame geometrisi ve tamponları frame'e
+dönüştürme yöntemi başına sürekli alım hızını (örnek/s), rx() çağrı
+gecikmesini ve kayıpları (çekirdek tampon taşması) ölçer. Varsayılan olarak
+simüle edilmiş cihazla (pluto_sim.SimulatedPluto) çalışır; --uri ile gerçek
+PlutoSDR ölçülür.
+
+Örnek:
+    python3 rx_benchmark.py --geometries 128x256,256x512 --buffers frame,16384,262144
+    python3 rx_benchmark.py --sample-rates 2e6,10e6 --work-ms 5 --json sonuc.json
+    python3 rx_benchmark.py --uri ip:192.168.2.1 --duration 5
+    python3 rx_benchmark.py --min-rate 0.99 --max-drop 0   # regresyon kontrolü
+"""
+
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+from pluto_sim import SimulatedPluto, scene_waveform
+
+STRATEGIES = ('reshape', 'complex64', 'preallocated')
+
+
+def _percentiles_ms(values):
+    if not values:
+        return {'p50': None, 'p99': None, 'max': None}
+    p50, p99 = np.percentile(values, [50, 99])
+    return {'p50': p50 * 1000, 'p99': p99 * 1000, 'max': max(values) * 1000}
+
+
+class FrameAssembler:
+    """
+    rx() tamponlarından (num_chirps, num_samples) frame'ler
+
+    Tampon frame'den küçük veya büyük olabilir; artan örnekler sonraki
+    tampona devredilir. Yöntemler:
+        reshape:      tampon tam bir frame ise kopyasız görünüm (boru hattının
+                      yaptığı), aksi halde birleştirip böl; complex128 kalır
+        complex64:    tamponu complex64'e çevir (kayıt ve paylaşımlı bellek
+                      yuvalarının tipi), sonra böl
+        preallocated: önceden ayrılmış complex64 frame halkasına tek kopya
+    """
+
+    def __init__(self, num_chirps, num_samples, strategy, ring=4):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Geçersiz yöntem: {strategy}")
+        self.shape = (num_chirps, num_samples)
+        self.frame_size = num_chirps * num_samples
+        self.strategy = strategy
+        self.discarded = 0
+        self._pending = []
+        self._pending_size = 0
+        if strategy == 'preallocated':
+            self._ring = np.empty((ring, self.frame_size), dtype=np.complex64)
+            self._slot = 0
+            self._fill = 0
+
+    def reset(self):
+        """Örnek kaybından sonra yarım kalan frame'i at"""
+        if self._pending_size or (self.strategy == 'preallocated' and self._fill):
+            self.discarded += 1
+        self._pending = []
+        self._pending_size = 0
+        if self.strategy == 'preallocated':
+            self._fill = 0
+
+    def push(self, data):
+        """return: Tamamlanan frame'lerin listesi"""
+        if self.strategy == 'preallocated':
+            return self._push_preallocated(data)
+        if self.strategy == 'complex64':
+            data = data.astype(np.complex64)
+        if not self._pending and len(data) == self.frame_size:
+            return [data.reshape(self.shape)]
+
+        self._pending.append(data)
+        self._pending_size += len(data)
+        count = self._pending_size // self.frame_size
+        if count == 0:
+            return []
+        joined = np.concatenate(self._pending) if len(self._pending) > 1 else self._pending[0]
+        used = count * self.frame_size
+        rest = joined[used:]
+        self._pending = [rest] if len(rest) else []
+        self._pending_size = len(rest)
+        return list(joined[:used].reshape((count,) + self.shape))
+
+    def _push_preallocated(self, data):
+        frames = []
+        position = 0
+        while position < len(data):
+            take = min(len(data) - position, self.frame_size - self._fill)
+            self._ring[self._slot, self._fill:self._fill + take] = data[position:position + take]
+            self._fill += take
+            position += take
+            if self._fill == self.frame_size:
+                frames.append(self._ring[self._slot].reshape(self.shape))
+                self._slot = (self._slot + 1) % len(self._ring)
+                self._fill = 0
+        return frames
+
+
+def run_case(sdr, num_chirps, num_samples, sample_rate, buffer_size, strategy,
+             duration, work_ms=0.0, warmup=0.2):
+    """
+    Tek yapılandırma: duration saniye boyunca rx() + frame dönüşümü
+
+    work_ms: Frame başına tüketici işi (boru hattının işleme süresini taklit eder)
+    """
+    if hasattr(sdr, 'rx_destroy_buffer'):
+        sdr.rx_destroy_buffer()
+    sdr.sample_rate = int(sample_rate)
+    sdr.rx_buffer_size = int(buffer_size)
+    assembler = FrameAssembler(num_chirps, num_samples, strategy)
+    simulated = isinstance(sdr, SimulatedPluto)
+
+    # Isınma: akışın ve ilk ayırmaların maliyeti ölçüme girmesin
+    end = time.perf_counter() + warmup
+    while time.perf_counter() < end:
+        sdr.rx()
+    if simulated:
+        sdr.overflows = sdr.dropped_samples = 0
+    expected = sdr.last_index + buffer_size if simulated else None
+
+    rx_times, ingest_times = [], []
+    samples = frames = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        t0 = time.perf_counter()
+        data = sdr.rx()
+        t1 = time.perf_counter()
+        if simulated:
+            if sdr.last_index != expected:
+                assembler.reset()
+            expected = sdr.last_index + buffer_size
+        completed = assembler.push(data)
+        t2 = time.perf_counter()
+        rx_times.append(t1 - t0)
+        ingest_times.append(t2 - t1)
+        samples += len(data)
+        frames += len(completed)
+        if work_ms > 0 and completed:
+            time.sleep(work_ms / 1000 * len(completed))
+    elapsed = time.perf_counter() - start
+
+    rate = samples / elapsed
+    if simulated:
+        dropped, overflows = sdr.dropped_samples, sdr.overflows
+    else:
+        # Gerçek cihazda kayıp doğrudan görülmez: beklenen örneklerden eksik kalan
+        dropped, overflows = max(0, int(sample_rate * elapsed) - samples), None
+
+    rx_stats = _percentiles_ms(rx_times)
+    ingest_stats = _percentiles_ms(ingest_times)
+    return {
+        'geometry': f'{num_chirps}x{num_samples}',
+        'sample_rate': sample_rate,
+        'buffer_size': int(buffer_size),
+        'strategy': strategy,
+        'calls': len(rx_times),
+        'samples_per_s': rate,
+        'rate_ratio': rate / sample_rate,
+        'frames_per_s': frames / elapsed,
+        'rx_ms': rx_stats,
+        'ingest_ms': ingest_stats,
+        'overflows': overflows,
+        'dropped_samples': dropped,
+        'drop_ratio': dropped / (samples + dropped) if samples + dropped else 0.0,
+        'frames_discarded': assembler.discarded
+    }
+
+
+def _buffer_sizes(spec, frame_size):
+    """'frame' anahtar kelimesi boru hattının kullandığı tek frame boyutudur"""
+    sizes = []
+    for item in spec.split(','):
+        item = item.strip().lower()
+        sizes.append(frame_size if item == 'frame' else int(float(item)))
+    return sizes
+
+
+def _fmt(value, spec='.2f'):
+    return '-' if value is None else format(value, spec)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='PlutoSDR RX alım verimi karşılaştırması')
+    parser.add_argument('--uri', default='sim',
+                        help="'sim' (simüle edilmiş cihaz) veya PlutoSDR adresi (ip:192.168.2.1)")
+    parser.add_argument('--geometries', default='128x256,256x512',
+                        help='Virgülle ayrılmış CHIRPxÖRNEK frame boyutları')
+    parser.add_argument('--buffers', default='frame,16384,262144',
+                        help="rx_buffer_size değerleri ('frame': chirp x örnek)")
+    parser.add_argument('--sample-rates', default='2e6', help='Örnekleme hızları (Hz)')
+    parser.add_argument('--strategies', default=','.join(STRATEGIES),
+                        help='Frame dönüşüm yöntemleri: ' + ', '.join(STRATEGIES))
+    parser.add_argument('--duration', type=float, default=1.0, help='Durum başına süre (saniye)')
+    parser.add_argument('--work-ms', type=float, default=0.0,
+                        help='Frame başına tüketici işi (ms, işleme yükü taklidi)')
+    parser.add_argument('--kernel-buffers', type=int, default=4,
+                        help='Simüle edilmiş çekirdek tampon sayısı')
+    parser.add_argument('--min-rate', type=float,
+                        help='Sürekli hız / örnekleme hızı alt sınırı (altındaysa çıkış kodu 1)')
+    parser.add_argument('--max-drop', type=float,
+                        help='Kayıp örnek oranı üst sınırı (üstündeyse çıkış kodu 1)')
+    parser.add_argument('--json', help='Sonuçları JSON dosyasına yaz')
+    args = parser.parse_args()
+
+    sample_rates = [float(r) for r in args.sample_rates.split(',')]
+    strategies = [s.strip() for s in args.strategies.split(',')]
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            parser.error(f"Geçersiz yöntem: {strategy}")
+
+    if args.uri != 'sim':
+        import adi
+        sdr = adi.Pluto(args.uri)
+
+    print(f"{'geometri':>9} {'hız_MHz':>7} {'tampon':>7} {'yöntem':>12} {'Mörnek/s':>8} "
+          f"{'oran':>5} {'frame/s':>7} {'rx_p50':>7} {'rx_p99':>7} {'rx_max':>7} "
+          f"{'dön_p50':>7} {'taşma':>5} {'kayıp':>6}")
+
+    results = []
+    failed = False
+    for geometry in args.geometries.split(','):
+        num_chirps, num_samples = (int(n) for n in geometry.lower().split('x'))
+        if args.uri == 'sim':
+            # Sahne simülatörü tamponları: veri, boru hattının işleyeceğiyle aynı
+            config = {'sample_rate': sample_rates[0], 'chirp_bandwidth': 1e9,
+                      'chirp_duration': num_samples / sample_rates[0],
+                      'num_chirps': num_chirps, 'num_samples': num_samples,
+                      'center_freq': 2.45e9}
+            sdr = SimulatedPluto('sim', scene_waveform(config, frames=4),
+                                 kernel_buffers=args.kernel_buffers)
+        for sample_rate in sample_rates:
+            for buffer_size in _buffer_sizes(args.buffers, num_chirps * num_samples):
+                for strategy in strategies:
+                    r = run_case(sdr, num_chirps, num_samples, sample_rate, buffer_size,
+                                 strategy, args.duration, args.work_ms)
+                    results.append(r)
+                    print(f"{r['geometry']:>9} {sample_rate / 1e6:>7.2f} {buffer_size:>7} "
+                          f"{strategy:>12} {r['samples_per_s'] / 1e6:>8.3f} "
+                          f"{r['rate_ratio']:>5.3f} {r['frames_per_s']:>7.1f} "
+                          f"{_fmt(r['rx_ms']['p50']):>7} {_fmt(r['rx_ms']['p99']):>7} "
+                          f"{_fmt(r['rx_ms']['max']):>7} {_fmt(r['ingest_ms']['p50'], '.3f'):>7} "
+                          f"{_fmt(r['overflows'], 'd'):>5} {r['drop_ratio']:>6.3f}")
+                    if args.min_rate is not None and r['rate_ratio'] < args.min_rate:
+                        failed = True
+                    if args.max_drop is not None and r['drop_ratio'] > args.max_drop:
+                        failed = True
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'uri': args.uri, 'duration': args.duration, 'work_ms': args.work_ms,
+                       'kernel_buffers': args.kernel_buffers, 'results': results}, f, indent=2)
+    if failed:
+        print("✗ Eşik aşıldı (--min-rate / --max-drop)")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,1027 @@
+#!/usr/bin/env python3
+"""
+Sensör Boru Hattı Yönetimi
+Tek süreçte birden fazla bağımsız radar boru hattı (kaynak, işlemci,
+takipçi, sınıflandırıcı); model ve görüntü oluşturucu paylaşımlı
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+import numpy as np
+
+try:
+    from signal_processor import FMCWProcessor, KalmanTracker
+    from train_model import ActivityClassifier
+except ImportError:
+    FMCWProcessor = KalmanTracker = ActivityClassifier = None
+
+from capture_recorder import CaptureRecorder
+from history_store import HistoryStore
+from dsp_worker import process_raw_frame, FrameSlots, ProcessingPool
+from metrics import (FRAMES_PROCESSED, FRAMES_DROPPED, DETECTIONS, QUEUE_DEPTH,
+                     PREDICTION_CACHE, PREDICTION_SAVED, QOS_LEVEL, stage_timer)
+from tracing import TRACER
+from image_cache import ImageCache
+from scene_simulator import activity_scene
+from prediction_cache import CACHE_KEYS, configure_cache
+from event_log import SensorEvents
+from frame_publisher import FramePublisher
+from model_manager import ModelManager
+from qos import (QOS_LEVELS, SKIP_IMAGE, CLASSIFY_INTERVAL, QosController,
+                 frame_quality)
+
+# Aktivite etiketleri (ActivityClassifier.ACTIVITY_LABELS sırasıyla)
+ACTIVITY_LABELS = ['Yok', 'Oturma', 'Ayakta', 'Yürüme', 'Yatma']
+
+# Varsayılan radar konfigürasyonu
+DEFAULT_CONFIG = {
+    'sample_rate': 2e6,
+    'chirp_bandwidth': 100e6,
+    'chirp_duration': 1e-3,
+    'num_chirps': 128,
+    'num_samples': 256,
+    'center_freq': 2.45e9,
+    'tx_power': -30,
+    'cfar_guard_cells': 4,
+    'cfar_training_cells': 8,
+    'cfar_pfa': 1e-4,
+    'cfar_pyramid_levels': 0,
+    'cfar_pyramid_pfa': 1e-2,
+    'tracker_process_noise': 0.1,
+    'tracker_measurement_noise': 0.5,
+    'predict_cache_size': 128,
+    'predict_cache_step': 2.0,
+    'predict_cache_ttl': 5.0,
+    'event_occupancy_interval': 60.0,
+    'micro_doppler_tracks': 8,
+    'micro_doppler_window': 128,
+    'micro_doppler_hop': 64,
+    'micro_doppler_history': 64,
+    'range_gate_min': 0.0,
+    'range_gate_max': 0.0,
+    'velocity_gate': 0.0,
+    'clutter_alpha': 0.0,
+    'clutter_freeze': 0,
+    'mti_taps': 0,
+    'integration_frames': 1,
+    'parallel_workers': 1,
+    'qos_enabled': 0,
+    'qos_target_period': 0.0,
+    'qos_max_level': 4,
+    'qos_classify_interval': 3,
+    'qos_cfar_levels': 2,
+    'qos_doppler_factor': 2
+}
+
+# Demo sensörleri: iç mekan ölçeğinde mesafe çözünürlüğü (0.15 m) için
+# geniş bant; sahne simülatörü ve işlemci aynı eşlemeyi kullanır
+DEMO_CONFIG = {
+    'chirp_bandwidth': 1e9,
+    # Statik yankı yan lobları bastırılmazsa her frame onlarca sahte hedef
+    # üretir; arka plan ilk (boş oda) sahnede öğrenilip sabitlenir
+    'clutter_alpha': 0.05
+}
+
+# Demo sahnesinin bir aktivitede kalma süresi (saniye)
+DEMO_SCENE_SECONDS = 10
+
+# Konfigürasyon şeması: anahtar -> (tip, min, max)
+CONFIG_SCHEMA = {
+    'sample_rate': (float, 65.1e3, 61.44e6),
+    'chirp_bandwidth': (float, 1e3, 6e9),
+    'chirp_duration': (float, 1e-6, 1.0),
+    'num_chirps': (int, 8, 4096),
+    'num_samples': (int, 16, 16384),
+    'center_freq': (float, 70e6, 6e9),
+    'tx_power': (float, -89.75, 0),
+    'cfar_guard_cells': (int, 0, 32),
+    'cfar_training_cells': (int, 1, 64),
+    'cfar_pfa': (float, 1e-12, 0.5),
+    'cfar_pyramid_levels': (int, 0, 4),
+    'cfar_pyramid_pfa': (float, 1e-12, 0.5),
+    'tracker_process_noise': (float, 1e-9, 1e3),
+    'tracker_measurement_noise': (float, 1e-9, 1e3),
+    'predict_cache_size': (int, 0, 65536),
+    'predict_cache_step': (float, 1e-6, 1e6),
+    'predict_cache_ttl': (float, 0.0, 86400.0),
+    'event_occupancy_interval': (float, 0.0, 86400.0),
+    'micro_doppler_tracks': (int, 0, 64),
+    'micro_doppler_window': (int, 8, 4096),
+    'micro_doppler_hop': (int, 1, 4096),
+    'micro_doppler_history': (int, 4, 4096),
+    'range_gate_min': (float, 0.0, 1e5),
+    'range_gate_max': (float, 0.0, 1e5),
+    'velocity_gate': (float, 0.0, 1e4),
+    'clutter_alpha': (float, 0.0, 1.0),
+    'clutter_freeze': (int, 0, 1),
+    'mti_taps': (int, 0, 3),
+    'integration_frames': (int, 1, 32),
+    'parallel_workers': (int, 1, 64),
+    'qos_enabled': (int, 0, 1),
+    'qos_target_period': (float, 0.0, 60.0),
+    'qos_max_level': (int, 0, len(QOS_LEVELS) - 1),
+    'qos_classify_interval': (int, 2, 100),
+    'qos_cfar_levels': (int, 1, 4),
+    'qos_doppler_factor': (int, 2, 8)
+}
+
+# SDR donanımına yazılan anahtarlar
+SDR_KEYS = ('sample_rate', 'center_freq', 'num_chirps', 'num_samples')
+
+# Frame geometrisi (yuva ve kayıt dosyası boyutlarını belirler)
+GEOMETRY_KEYS = ('num_chirps', 'num_samples')
+
+# Değişimi işlemcinin öğrendiği statik yankı arka planını silebilecek anahtarlar
+# (geometri, mesafe penceresi ve CFAR payı, clutter_alpha=0)
+CLUTTER_RESET_KEYS = ('sample_rate', 'chirp_bandwidth', 'chirp_duration', 'num_chirps',
+                      'num_samples', 'center_freq', 'range_gate_min', 'range_gate_max',
+                      'cfar_guard_cells', 'cfar_training_cells', 'clutter_alpha')
+
+
+def validate_config(updates, base):
+    """
+    Kısmi konfigürasyon güncellemesini doğrula ve base ile birleştir
+
+    return: (yeni_config, hatalar)
+    """
+    if not isinstance(updates, dict):
+        return None, ['Konfigürasyon bir JSON nesnesi olmalı']
+
+    errors = []
+    config = dict(base)
+    for key, value in updates.items():
+        if key not in CONFIG_SCHEMA:
+            errors.append(f'Bilinmeyen anahtar: {key}')
+            continue
+        kind, low, high = CONFIG_SCHEMA[key]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            errors.append(f'{key}: sayı olmalı')
+            continue
+        if kind is int:
+            if float(value) != int(value):
+                errors.append(f'{key}: tam sayı olmalı')
+                continue
+            value = int(value)
+        else:
+            value = float(value)
+        if not low <= value <= high:
+            errors.append(f'{key}: {low:g} ile {high:g} arasında olmalı')
+            continue
+        config[key] = value
+
+    if errors:
+        return None, errors
+
+    if config['num_samples'] % 2:
+        errors.append('num_samples: çift sayı olmalı')
+    cfar_window = 2 * (config['cfar_guard_cells'] + config['cfar_training_cells']) + 1
+    if cfar_window >= min(config['num_chirps'], config['num_samples'] // 2):
+        errors.append('CFAR penceresi Range-Doppler haritasından büyük')
+    if 0 < config['range_gate_max'] <= config['range_gate_min']:
+        errors.append('range_gate_max: range_gate_min değerinden büyük olmalı')
+    if config['mti_taps'] == 1:
+        errors.append('mti_taps: 0, 2 veya 3 olmalı')
+
+    return (None if errors else config), errors
+
+
+class SharedResources:
+    """
+    Sensörler arasında paylaşılan bileşenler
+
+    Eğitilmiş model (RandomForest + scaler) bellekte bir kez tutulur;
+    her sensörün sınıflandırıcısı aynı nesnelere referans verir. Model
+    arka planda hazırlanır (ModelManager); hazır olana kadar sınıflandırıcılar
+    yedek modelle çalışır ve frame sınırında gerçek modele geçer.
+    """
+
+    def __init__(self, render_image, model_dir='models',
+                 num_workers=None, image_cache_size=64, event_log=None):
+        """
+        render_image: (rd_map, extent) -> PNG baytları
+        model_dir: Eğitilmiş model dosyalarının dizini
+        num_workers: DSP süreç havuzu işçi sayısı (None: çekirdek sayısı - 1)
+        image_cache_size: /api/frame için bellekte tutulan görüntü sayısı
+        event_log: Kalıcı olay kaydı (EventLog) veya None
+        """
+        self.render_image = render_image
+        self.image_cache = ImageCache(image_cache_size)
+        self.event_log = event_log
+        if event_log is not None:
+            QUEUE_DEPTH.labels('*', 'event_log').set_function(lambda: event_log.queue_depth)
+        self.models = ModelManager(model_dir)
+        self.num_workers = num_workers
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def get_classifier(self):
+        """
+        Paylaşılan modeli (hazır değilse yedek modeli) kullanan bir
+        ActivityClassifier döndür
+
+        return: (model sürümü, classifier); sürüm ModelManager.current ile
+                karşılaştırılarak güncellenir (update_classifier)
+        """
+        self.models.start()
+        classifier = ActivityClassifier()
+        return self.update_classifier(classifier, None), classifier
+
+    def update_classifier(self, classifier, version):
+        """
+        Yeni model yayınlandıysa sınıflandırıcıya ata (frame sınırında)
+
+        Tahmin önbelleği eski modelin sonuçlarını tuttuğu için temizlenir.
+        return: Sınıflandırıcının model sürümü
+        """
+        current = self.models.current
+        if current[0] != version:
+            classifier.model, classifier.scaler = current[1], current[2]
+            if classifier.cache is not None:
+                classifier.cache.clear()
+        return current[0]
+
+    def get_pool(self):
+        """Paylaşılan DSP süreç havuzunu döndür (ilk çağrıda başlatılır)"""
+        # İşçiler yedek modelle başlar, hazır olunca modeli dosyadan yükler
+        self.models.start()
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessingPool(self.num_workers)
+                self._pool.start()
+                QUEUE_DEPTH.labels('*', 'dsp_tasks').set_function(
+                    lambda: self._pool.queue_depth)
+        return self._pool
+
+    def shutdown(self):
+        """Süreç havuzunu ve olay kaydını durdur (boru hatları durduktan sonra)"""
+        if self._pool is not None:
+            self._pool.stop()
+        if self.event_log is not None:
+            self.event_log.stop()
+
+
+class SensorPipeline:
+    """Tek bir radar sensörünün boru hattı ve durumu"""
+
+    def __init__(self, sensor_id, shared, emit, name=None, source='demo',
+                 uri='ip:192.168.2.1', config=None, execution='thread',
+                 history_capacity=24 * 3600 * 10, demo_rate=1.0, publish=True):
+        """
+        sensor_id: Sensör kimliği (REST yolu ve Socket.IO odası)
+        shared: SharedResources
+        emit: (state, room) -> None, güncellemeyi yayınlar
+        source: 'demo' veya 'pluto'
+        uri: PlutoSDR adresi ('sim': pluto_sim.SimulatedPluto, cihazsız)
+        config: DEFAULT_CONFIG üzerine yazılacak ayarlar (CONFIG_SCHEMA ile
+                doğrulanır, geçersizse ValueError)
+        execution: 'thread' (işleme bu iş parçacığında) veya 'process'
+                   (işleme paylaşılan DSP süreç havuzunda)
+        demo_rate: Demo modunda güncelleme hızı (Hz)
+        publish: Son frame'i paylaşımlı belleğe yaz (frame_publisher.FrameReader)
+        """
+        if execution not in ('thread', 'process'):
+            raise ValueError(f"Geçersiz execution: {execution}")
+
+        self.sensor_id = sensor_id
+        self.name = name or sensor_id
+        self.source = source
+        self.uri = uri
+        self.execution = execution
+        self.demo_rate = float(demo_rate)
+        base = dict(DEFAULT_CONFIG, **DEMO_CONFIG) if source == 'demo' else DEFAULT_CONFIG
+        self.config, errors = validate_config(config or {}, base)
+        if errors:
+            raise ValueError(f"Geçersiz konfigürasyon: {'; '.join(errors)}")
+        self.room = f'sensor:{sensor_id}'
+
+        self.shared = shared
+        self._emit = emit
+
+        self.active = False
+        self.thread = None
+
+        # PlutoSDR modunda aktif konfigürasyon (ham IQ kaydı için)
+        self.radar_config = None
+        self.capture_recorder = None
+
+        self.processor = None
+        self.tracker = None
+        self.classifier = None
+        self._model_version = None
+        # Kullanıcı config'ine yazılmayan işleme ayarları (demo kalibrasyonu)
+        self._processing_overrides = {}
+        self._clutter_reset = False
+        self._calibration_frames = 0
+
+        # Canlı yapılandırma: frame sınırında uygulanacak bekleyen config
+        self._pending_config = None
+        self._config_lock = threading.Lock()
+
+        # Süreç modu: paylaşımlı bellek yuvaları ve sıra numaraları
+        self.config_version = 0
+        self._slots = None
+        # Yuvalar boru hattı iş parçacığında kapatılır, harita görünümleri
+        # dağıtıcı iş parçacığında okunur: ikisi bu kilitle sıralanır
+        self._slots_lock = threading.Lock()
+        # İşçi çöktü: yuvalar frame sınırında yenilenir (_apply_pending_config)
+        self._worker_restarted = False
+        self._seq = 0
+        self._last_published_seq = -1
+
+        # Yük uyarlamalı kalite: denetleyici seviyeyi seçer, boru hattı
+        # iş parçacığı frame sınırında uygular (_qos_level)
+        self.qos = QosController(self._qos_period(), enabled=self.config['qos_enabled'],
+                                 max_level=self.config['qos_max_level'])
+        self._qos_level = 0
+        self._qos_frame = 0
+
+        self.current_state = {
+            'sensor_id': sensor_id,
+            'targets': [],
+            'activity': 'Yok',
+            'confidence': 0.0,
+            'timestamp': None,
+            'image_id': None
+        }
+        self.statistics = {
+            'total_detections': 0,
+            'activities': {label: 0 for label in ACTIVITY_LABELS},
+            'start_time': None,
+            'prediction_cache': {'hits': 0, 'misses': 0, 'hit_rate': 0.0, 'saved_s': 0.0}
+        }
+        self.history = HistoryStore(capacity=history_capacity,
+                                    num_activities=len(ACTIVITY_LABELS))
+        self.publisher = FramePublisher(sensor_id) if publish else None
+        self.events = None
+        if shared.event_log is not None:
+            self.events = SensorEvents(sensor_id, shared.event_log, ACTIVITY_LABELS,
+                                       self.config['event_occupancy_interval'])
+
+        QUEUE_DEPTH.labels(sensor_id, 'capture').set_function(
+            lambda: self.capture_recorder.queue_depth if self.capture_recorder else 0)
+        QOS_LEVEL.labels(sensor_id).set_function(lambda: self._qos_level)
+
+    def start(self):
+        """Boru hattını başlat; zaten aktifse False"""
+        if self.active:
+            return False
+        self.active = True
+        self.statistics['start_time'] = datetime.now().isoformat()
+
+        self.thread = threading.Thread(target=self.radar_loop)
+        self.thread.daemon = True
+        self.thread.start()
+        return True
+
+    def stop(self):
+        """Boru hattını durdur; zaten durmuşsa False"""
+        if not self.active:
+            return False
+        self.active = False
+        return True
+
+    def get_config(self):
+        return dict(self.config)
+
+    def get_status(self):
+        return {
+            'sensor_id': self.sensor_id,
+            'name': self.name,
+            'source': self.source,
+            'execution': self.execution,
+            'radar_active': self.active,
+            'current_state': self.current_state,
+            'statistics': self.statistics,
+            'model': self.shared.models.get_status(),
+            'image_cache': self.shared.image_cache.get_status(),
+            'qos': dict(self.qos.get_status(), applied_level=self._qos_level)
+        }
+
+    def summary(self):
+        return {
+            'sensor_id': self.sensor_id,
+            'name': self.name,
+            'source': self.source,
+            'radar_active': self.active,
+            'activity': self.current_state['activity'],
+            'num_targets': len(self.current_state['targets']),
+            'timestamp': self.current_state['timestamp']
+        }
+
+    def start_capture(self, directory, frames_per_file=600):
+        """Ham IQ kaydını başlat: (success, message)"""
+        if self.capture_recorder is not None:
+            return False, 'Kayıt zaten aktif'
+        if self.radar_config is None:
+            return False, 'Ham IQ kaydı yalnızca PlutoSDR modunda kullanılabilir'
+
+        try:
+            recorder = CaptureRecorder(directory, self.radar_config,
+                                       frames_per_file=frames_per_file)
+        except ValueError as e:
+            return False, str(e)
+        recorder.start()
+        self.capture_recorder = recorder
+        return True, 'Kayıt başlatıldı'
+
+    def stop_capture(self):
+        """Ham IQ kaydını durdur: (success, message, status)"""
+        recorder = self.capture_recorder
+        if recorder is None:
+            return False, 'Kayıt aktif değil', None
+        self.capture_recorder = None
+        recorder.stop()
+        return True, 'Kayıt durduruldu', recorder.get_status()
+
+    def _publish(self, targets, activity, confidence, image, num_detections=None):
+        """
+        Durumu, istatistikleri ve geçmişi güncelle, odaya yayınla
+
+        image: PNG baytları veya None; durum yalnızca önbellek kimliğini taşır
+        """
+        image_id = None
+        if image is not None:
+            image_id = self.shared.image_cache.put(image)
+
+        self.current_state = {
+            'sensor_id': self.sensor_id,
+            'targets': targets,
+            'activity': activity,
+            'confidence': float(confidence),
+            'timestamp': datetime.now().isoformat(),
+            'image_id': image_id
+        }
+
+        self.statistics['total_detections'] += len(targets)
+        self.statistics['activities'][activity] += 1
+
+        # Geçmiş (birincil hedef: en yüksek SNR)
+        if targets:
+            primary = max(targets, key=lambda t: t['snr'])
+            target_range, target_velocity = primary['distance'], primary['velocity']
+        else:
+            target_range = target_velocity = np.nan
+        self.history.append(ACTIVITY_LABELS.index(activity), confidence, len(targets),
+                            target_range, target_velocity)
+        if self.events is not None:
+            self.events.update(time.time(), activity, confidence, targets)
+
+        FRAMES_PROCESSED.labels(self.sensor_id).inc()
+        if num_detections is not None:
+            DETECTIONS.labels(self.sensor_id, 'cfar').inc(num_detections)
+        DETECTIONS.labels(self.sensor_id, 'cluster').inc(len(targets))
+
+        self._emit(self.current_state, self.room)
+
+    def update_config(self, updates):
+        """
+        Konfigürasyonu doğrula ve uygula
+
+        Radar çalışıyorsa değişiklik bir sonraki frame sınırında boru hattı
+        iş parçacığı tarafından uygulanır; bağlantılar ve model etkilenmez.
+        return: (success, mesaj veya hata listesi, 'immediate' | 'next_frame')
+        """
+        new_config, errors = validate_config(updates, self.config)
+        if errors:
+            return False, errors, None
+
+        with self._config_lock:
+            if self.active:
+                self._pending_config = new_config
+                return True, 'Yapılandırma bir sonraki frame\'de uygulanacak', 'next_frame'
+            self._pending_config = new_config
+        self._apply_pending_config()
+        return True, 'Yapılandırma uygulandı', 'immediate'
+
+    def _make_tracker(self, dt):
+        return KalmanTracker(dt=dt,
+                             process_noise=self.config['tracker_process_noise'],
+                             measurement_noise=self.config['tracker_measurement_noise'])
+
+    def _frame_period(self):
+        if self.source == 'pluto':
+            return self.config['chirp_duration'] * self.config['num_chirps']
+        return 1.0 / self.demo_rate
+
+    def _qos_period(self):
+        """QoS hedef periyodu (qos_target_period, 0: frame periyodu)"""
+        return self.config['qos_target_period'] or self._frame_period()
+
+    def _apply_pending_config(self, sdr=None):
+        """Bekleyen konfigürasyonu uygula (frame sınırında çağrılır)"""
+        if self._worker_restarted:
+            self._renew_slots()
+        with self._config_lock:
+            new_config, self._pending_config = self._pending_config, None
+        if new_config is None:
+            return
+
+        old_config = self.config
+        changed = {key for key in new_config if old_config.get(key) != new_config[key]}
+        if not changed:
+            return
+        geometry_changed = bool(changed & set(GEOMETRY_KEYS))
+        if changed & set(CLUTTER_RESET_KEYS):
+            self._clutter_reset = True
+
+        self.config = new_config
+        if self.radar_config is not None:
+            self.radar_config = new_config
+
+        if sdr is not None and changed & set(SDR_KEYS):
+            self._configure_sdr(sdr)
+        if self.processor is not None:
+            self.processor.reconfigure(self._processing_config(new_config))
+        self.qos.configure(target_period=self._qos_period(),
+                           enabled=new_config['qos_enabled'],
+                           max_level=new_config['qos_max_level'])
+        if self.classifier is not None and changed & set(CACHE_KEYS):
+            self.classifier.cache = configure_cache(new_config, self.classifier.cache)
+        if self.events is not None:
+            self.events.occupancy_interval = new_config['event_occupancy_interval']
+        if self.tracker is not None:
+            self.tracker.reconfigure(dt=self._frame_period(),
+                                     process_noise=new_config['tracker_process_noise'],
+                                     measurement_noise=new_config['tracker_measurement_noise'])
+
+        if geometry_changed and self._slots is not None:
+            # Yuva boyutu frame geometrisine bağlı: yeniden oluştur
+            with self._slots_lock:
+                old_slots = self._slots
+                self._slots = FrameSlots(old_slots.num_slots,
+                                         new_config['num_chirps'], new_config['num_samples'])
+                old_slots.close()
+
+        if geometry_changed and self.capture_recorder is not None:
+            # Kayıt dosyası başlığı geometriye bağlı: yeni dosya setine geç
+            recorder = self.capture_recorder
+            self.stop_capture()
+            self.start_capture(recorder.directory, frames_per_file=recorder.frames_per_file)
+
+        # İşçiler yeni sürümü görünce işlemcilerini yeniden kurar
+        self.config_version += 1
+        print(f"[{self.sensor_id}] Yapılandırma uygulandı: {', '.join(sorted(changed))}")
+
+    def _configure_sdr(self, sdr):
+        config = self.config
+        sdr.sample_rate = int(config['sample_rate'])
+        sdr.rx_rf_bandwidth = int(config['sample_rate'])
+        sdr.rx_lo = int(config['center_freq'])
+        sdr.tx_lo = int(config['center_freq'])
+        sdr.rx_buffer_size = config['num_chirps'] * config['num_samples']
+
+    def _update_track(self, targets):
+        """Birincil hedefi Kalman filtresiyle takip et (mesafe ekseni)"""
+        if self.tracker is None:
+            return
+        if not targets:
+            self.tracker.initialized = False
+            return
+        primary = max(targets, key=lambda t: t['snr'])
+        if not self.tracker.initialized:
+            self.tracker.init_state(primary['distance'], 0.0)
+        else:
+            self.tracker.predict()
+            self.tracker.update([primary['distance'], 0.0])
+        primary['tracked_distance'] = float(self.tracker.x[0])
+
+    def radar_loop(self):
+        """Ana radar döngüsü (simülasyon veya gerçek)"""
+        print(f"[{self.sensor_id}] Radar döngüsü başlatıldı...")
+
+        if KalmanTracker is not None:
+            self.tracker = self._make_tracker(self._frame_period())
+
+        if self.source == 'pluto':
+            self._pluto_loop()
+        else:
+            self._demo_loop()
+
+    def _setup_processing(self, config):
+        """İşlemci/sınıflandırıcıyı veya süreç havuzu yuvalarını hazırla"""
+        # Yeni işlemci boş arka planla başlar; önceki çalışmanın sabitlemesi taşınmaz
+        self._processing_overrides = {}
+        self._calibration_frames = 0
+        self.tracker = self._make_tracker(self._frame_period())
+        if self.execution == 'process':
+            pool = self.shared.get_pool()
+            # Sensör tek işçiye bağlı: biri işlenirken biri kuyrukta bekler
+            self._slots = FrameSlots(2, config['num_chirps'], config['num_samples'])
+            self._worker_restarted = False
+            pool.register(self.sensor_id, self._on_worker_result, self._on_worker_restart)
+        else:
+            self.processor = FMCWProcessor(self._processing_config(config))
+            self._model_version, self.classifier = self.shared.get_classifier()
+            self.classifier.cache = configure_cache(config)
+
+    def _processing_config(self, config):
+        """İşlemcinin kullandığı config: kullanıcı config'i + iç ayarlar"""
+        if not self._processing_overrides:
+            return config
+        return dict(config, **self._processing_overrides)
+
+    def _freeze_demo_clutter(self, frozen):
+        """
+        Demo: boş odada öğrenilen statik yankı arka planını sabitle veya
+        yeniden öğrenmeye aç (kullanıcı config'i ve bekleyen güncellemeler
+        etkilenmez)
+        """
+        overrides = {'clutter_freeze': 1} if frozen else {}
+        if overrides == self._processing_overrides:
+            return
+        self._processing_overrides = overrides
+        self._calibration_frames = 0
+        if self.processor is not None:
+            self.processor.reconfigure(self._processing_config(self.config))
+        # İşçiler yeni sürümü görünce işlemcilerini yeniden kurar
+        self.config_version += 1
+
+    def _demo_loop(self):
+        """
+        Demo modu: sahne simülatörünün ürettiği ham IQ gerçek işleme
+        zincirinden (FMCWProcessor, CFAR, ActivityClassifier) geçer
+        """
+        print(f"[{self.sensor_id}] DEMO MODU: Simüle edilmiş sahne kullanılıyor")
+        try:
+            self.radar_config = self.config
+            self._setup_processing(self.config)
+
+            frames_per_scene = max(1, int(DEMO_SCENE_SECONDS * self.demo_rate))
+            scene = scene_key = None
+            frame_index = sequence_start = 0
+            self._clutter_reset = False
+            while self.active:
+                frame_start = time.perf_counter()
+                with TRACER.frame(self.sensor_id, frame_index):
+                    with TRACER.span('apply_config'):
+                        self._apply_pending_config()
+                        if self._clutter_reset:
+                            # Arka plan silindi: dizi boş odadan yeniden başlar
+                            self._clutter_reset = False
+                            sequence_start = frame_index
+                            self._freeze_demo_clutter(False)
+                        # İlk sahne boş oda: öğrenilen arka plan kişiler
+                        # girmeden sabitlenir (boş oda kalibrasyonu). Süreç
+                        # modunda işçi geç başlayıp frame düşürebilir; sahne
+                        # işlenmiş frame sayısı yetene kadar uzatılır.
+                        calibrating = (self.config['clutter_alpha'] > 0 and
+                                       not self._processing_overrides.get('clutter_freeze'))
+                        if (calibrating and frame_index - sequence_start >= frames_per_scene and
+                                self._calibration_frames >= frames_per_scene):
+                            sequence_start = frame_index - frames_per_scene
+                            self._freeze_demo_clutter(True)
+                            calibrating = False
+
+                    # Sahne her DEMO_SCENE_SECONDS saniyede bir aktivite değiştirir
+                    position = frame_index - sequence_start
+                    if calibrating:
+                        activity = ACTIVITY_LABELS[0]
+                    else:
+                        activity = ACTIVITY_LABELS[(position // frames_per_scene) %
+                                                   len(ACTIVITY_LABELS)]
+                    if scene_key != (activity, self.config_version):
+                        scene = activity_scene(activity, self.config)
+                        scene_key = (activity, self.config_version)
+
+                    with TRACER.span('simulate_frame'):
+                        iq = scene.frame()
+
+                    recorder = self.capture_recorder
+                    if recorder is not None:
+                        recorder.write(iq)
+
+                    self.handle_frame(iq)
+
+                frame_index += 1
+                interval = 1.0 / self.demo_rate
+                scene.step(max(0.0, interval - scene.frame_duration))
+                # Periyot frame başından ölçülür: işleme süresi beklemeden düşülür
+                time.sleep(max(0.0, frame_start + interval - time.perf_counter()))
+
+        except Exception as e:
+            print(f"[{self.sensor_id}] Hata oluştu: {e}")
+            self.active = False
+        finally:
+            self.radar_config = None
+            self._close_slots()
+            if self.events is not None:
+                self.events.close()
+
+    def _pluto_loop(self):
+        # Gerçek PlutoSDR Döngüsü
+        print(f"[{self.sensor_id}] PlutoSDR Modu Başlatılıyor ({self.uri})...")
+        try:
+            config = self.config
+
+            # SDR Yapılandırması ("sim": cihazsız, sahne simülatörü tamponları)
+            if self.uri.startswith('sim'):
+                from pluto_sim import SimulatedPluto, scene_waveform
+                sdr = SimulatedPluto(self.uri, scene_waveform(config))
+            else:
+                import adi
+                sdr = adi.Pluto(self.uri)
+
+            # SDR Ayarları
+            self._configure_sdr(sdr)
+            sdr.tx_cyclic_buffer = True
+            self.radar_config = config
+
+            # Processor, Tracker ve Classifier (model paylaşımlı)
+            self._setup_processing(config)
+
+            # TX Sinyali (Basit chirp)
+            # Not: Gerçek FMCW için sinyal üretimi daha karmaşık olabilir
+            # Burada basitlik adına sabit kalıyoruz
+
+            frame_index = 0
+            while self.active:
+                frame_index += 1
+                with TRACER.frame(self.sensor_id, frame_index):
+                    self._pluto_step(sdr)
+
+        except Exception as e:
+            print(f"[{self.sensor_id}] Hata oluştu: {e}")
+            self.active = False
+        finally:
+            self.radar_config = None
+            self._close_slots()
+            if self.events is not None:
+                self.events.close()
+
+    def _pluto_step(self, sdr):
+        """Tek frame: yapılandırma, veri alımı, kayıt ve işleme"""
+        # Bekleyen yapılandırma frame sınırında uygulanır
+        with TRACER.span('apply_config'):
+            self._apply_pending_config(sdr)
+        config = self.config
+
+        # Veri al
+        with TRACER.span('sdr_rx'):
+            rx_data = sdr.rx()
+        # Reshape: (num_chirps, num_samples)
+        # Not: Bu kısım donanım buffer yapısına göre değişebilir
+        rx_data_reshaped = rx_data.reshape(config['num_chirps'], config['num_samples'])
+
+        # Ham IQ kaydı (bloklamaz, yazım arka planda)
+        recorder = self.capture_recorder
+        if recorder is not None:
+            with TRACER.span('capture_write'):
+                recorder.write(rx_data_reshaped)
+
+        self.handle_frame(rx_data_reshaped)
+
+    def handle_frame(self, frame):
+        """Ham frame'i işle (iş parçacığında) veya süreç havuzuna gönder"""
+        self._apply_qos()
+        self._qos_frame += 1
+        render = self._qos_level < SKIP_IMAGE
+        classify = (self._qos_level < CLASSIFY_INTERVAL or
+                    self._qos_frame % self.config['qos_classify_interval'] == 0)
+        if self.execution == 'process':
+            self._submit_frame(frame, render, classify)
+            return
+
+        # Arka planda hazırlanan model yayınlandıysa frame sınırında geç
+        self._model_version = self.shared.update_classifier(self.classifier,
+                                                            self._model_version)
+        start = time.perf_counter()
+        try:
+            self.processor.set_quality(*frame_quality(self.config, self._qos_level))
+            rd_frame, record = process_raw_frame(
+                self.processor, self.classifier, frame,
+                self.shared.render_image if render else None,
+                timestamp=time.time(), classify=classify)
+        except Exception as e:
+            print(f"[{self.sensor_id}] Frame işlenemedi: {e}")
+            FRAMES_DROPPED.labels(self.sensor_id, 'error').inc()
+            return
+        self._handle_record(record, rd_frame.db if self.publisher is not None else None)
+        self.qos.observe(time.perf_counter() - start)
+
+    def _apply_qos(self):
+        """QoS denetleyicisinin seçtiği seviyeyi frame sınırında uygula"""
+        level = self.qos.level
+        if level == self._qos_level:
+            return
+        # Kalite frame başına işlemciye verilir (frame_quality); config
+        # sürümü değişmez, işçideki zamansal durum ve sıradaki sonuçlar korunur
+        self._qos_level = level
+        load = self.qos.load
+        print(f"[{self.sensor_id}] QoS seviyesi: {QOS_LEVELS[level]} "
+              f"(yük {load if load is not None else 0:.2f})")
+
+    def _handle_record(self, record, rd_map=None):
+        """rd_map: Paylaşımlı belleğe yayınlanacak Range-Doppler haritası (dB)"""
+        self._count_prediction(record)
+        # Demo kalibrasyonu: sabitlenmemiş arka planla işlenen frame'ler
+        if not self._processing_overrides:
+            self._calibration_frames += 1
+        self._update_track(record['targets'])
+        activity, confidence = record['activity'], record['confidence']
+        if activity is None:
+            # Sınıflandırma bu frame'de atlandı (QoS): son tahmin geçerli
+            activity = self.current_state['activity']
+            confidence = self.current_state['confidence']
+        self._publish(record['targets'], activity, confidence,
+                      record['image'], num_detections=record['num_detections'])
+        if rd_map is not None:
+            with stage_timer('shm_publish'):
+                self.publisher.publish(rd_map, record['targets'], activity, confidence,
+                                       record['map_extent'])
+
+    def _count_prediction(self, record):
+        """Sınıflandırma önbelleği isabet oranı ve kazanılan süre"""
+        cached = record.get('prediction_cached')
+        if cached is None:
+            return
+        stats = self.statistics['prediction_cache']
+        if cached:
+            stats['hits'] += 1
+            stats['saved_s'] += record['prediction_saved']
+            PREDICTION_SAVED.labels(self.sensor_id).inc(record['prediction_saved'])
+        else:
+            stats['misses'] += 1
+        stats['hit_rate'] = stats['hits'] / (stats['hits'] + stats['misses'])
+        PREDICTION_CACHE.labels(self.sensor_id, 'hit' if cached else 'miss').inc()
+
+    def _submit_frame(self, frame, render=True, classify=True):
+        """Frame'i paylaşımlı belleğe kopyala ve yalnızca yuva numarasını gönder"""
+        slot = self._slots.acquire()
+        if slot is None:
+            # Tüm yuvalar meşgul: işçiler frame hızına yetişemiyor
+            FRAMES_DROPPED.labels(self.sensor_id, 'backpressure').inc()
+            return
+
+        self._slots.frames[slot] = frame
+        self._seq += 1
+        self.shared.get_pool().submit({
+            'sensor_id': self.sensor_id,
+            'seq': self._seq,
+            'slot': slot,
+            'num_slots': self._slots.num_slots,
+            'input': self._slots.input_name,
+            'output': self._slots.output_name,
+            'config': self._processing_config(self.radar_config),
+            'config_version': self.config_version,
+            'quality': frame_quality(self.radar_config, self._qos_level),
+            'frame_shape': self._slots.frame_shape,
+            'model': self.shared.models.artifact,
+            'render': render,
+            'classify': classify,
+            'timestamp': time.time(),
+            'trace': TRACER.enabled,
+            'submitted': time.perf_counter()
+        })
+
+    def _on_worker_restart(self):
+        """İşçi çöktü (dağıtıcı iş parçacığında çağrılır)"""
+        self._worker_restarted = True
+
+    def _renew_slots(self):
+        """
+        Çöken işçiye gönderilmiş frame'lerin sonucu gelmeyecek: yuvalar hiç
+        bırakılmaz, bu yüzden yeni yuva seti kurulur (eski sete ait geç
+        sonuçlar yeni sette yuva bırakmaz). Yeni işçinin işlemcisi boş arka
+        planla başladığından demo kalibrasyonu da yeniden yapılır.
+        """
+        self._worker_restarted = False
+        with self._slots_lock:
+            old_slots = self._slots
+            FRAMES_DROPPED.labels(self.sensor_id, 'worker_restart').inc(old_slots.busy)
+            self._slots = FrameSlots(old_slots.num_slots, *old_slots.frame_shape)
+            old_slots.close()
+        self._clutter_reset = True
+        print(f"[{self.sensor_id}] DSP işçisi yeniden başlatıldı, yuvalar yenilendi")
+
+    def _on_worker_result(self, result):
+        """İşçi sonucunu yayınla (dağıtıcı iş parçacığında çağrılır)"""
+        # İzleme: gönderimden yayına kadar tek frame; işçi span'ları eklenir
+        with TRACER.frame(self.sensor_id, result['seq'], kind='result',
+                          start=result.get('submitted')):
+            TRACER.extend(result.get('spans', ()))
+            self._handle_worker_result(result)
+
+    def _handle_worker_result(self, result):
+        # Harita görünümü paylaşımlı belleği dışa aktarır; yuvalar açıkken
+        # kapatılamaz (BufferError), bu yüzden kilit bırakılmadan silinir
+        with self._slots_lock:
+            slots = self._slots
+            rd_map = None
+            try:
+                if 'error' in result:
+                    print(f"[{self.sensor_id}] Frame işlenemedi: {result['error']}")
+                    FRAMES_DROPPED.labels(self.sensor_id, 'error').inc()
+                    return
+                # Yapılandırma değişmeden önce gönderilmiş frame
+                if result['config_version'] != self.config_version:
+                    FRAMES_DROPPED.labels(self.sensor_id, 'reconfigured').inc()
+                    return
+                # Sonuçlar sensörün işçisinden sıralı gelir; yine de eskiyi yayınlama
+                if result['seq'] <= self._last_published_seq:
+                    FRAMES_DROPPED.labels(self.sensor_id, 'stale').inc()
+                    return
+                self._last_published_seq = result['seq']
+                if self.publisher is not None and slots is not None:
+                    rd_map = slots.map_view(result['slot'], result['map_shape'])
+                self._handle_record(result, rd_map)
+                # Süreç modunda gecikme kuyrukta bekleme dahil gönderimden yayına
+                self.qos.observe(time.perf_counter() - result['submitted'])
+            finally:
+                rd_map = None
+                # Geometri değiştiyse yuva eski (kapatılmış) bellek setine aittir
+                if slots is not None and slots.input_name == result['input']:
+                    slots.release(result['slot'])
+
+    def _close_slots(self):
+        if self._slots is None:
+            return
+        # Önce yeni sonuçları kes, sonra sürmekte olan işleyiciyi bekle
+        self.shared.get_pool().unregister(self.sensor_id)
+        with self._slots_lock:
+            self._slots.close()
+            self._slots = None
+
+
+class SensorManager:
+    """Sunucudaki tüm sensör boru hatlarını yönetir"""
+
+    def __init__(self, shared, emit):
+        self.shared = shared
+        self._emit = emit
+        self.pipelines = {}
+        self.default_id = None
+
+    def add(self, sensor_id, **kwargs):
+        if sensor_id in self.pipelines:
+            raise ValueError(f"Sensör zaten tanımlı: {sensor_id}")
+        pipeline = SensorPipeline(sensor_id, self.shared, self._emit, **kwargs)
+        self.pipelines[sensor_id] = pipeline
+        if self.default_id is None:
+            self.default_id = sensor_id
+        return pipeline
+
+    def get(self, sensor_id=None):
+        """Sensörü döndür (None: varsayılan sensör, bilinmiyorsa None)"""
+        if sensor_id is None:
+            sensor_id = self.default_id
+        return self.pipelines.get(sensor_id)
+
+    def __iter__(self):
+        return iter(self.pipelines.values())
+
+    def shutdown(self, timeout=5.0):
+        """
+        Boru hatlarını durdur ve paylaşımlı bellek yayınlarını kaldır
+
+        Boru hattı iş parçacıkları en fazla timeout saniye beklenir: son
+        olay segmentleri (SensorEvents.close) olay kaydı kapanmadan yazılır.
+        """
+        for pipeline in self:
+            pipeline.stop()
+        for pipeline in self:
+            if pipeline.thread is not None:
+                pipeline.thread.join(timeout)
+            if pipeline.publisher is not None:
+                pipeline.publisher.close()
+
+    def load(self, path):
+        """
+        Sensör tanımlarını JSON dosyasından yükle
+
+        {"workers": 3,
+         "sensors": [{"id": "salon", "name": "Salon", "source": "pluto",
+                      "uri": "ip:192.168.2.1", "execution": "process",
+                      "config": {...}}]}
+
+        Konfigürasyonu geçersiz sensörler atlanır (hatalar yazdırılır).
+        Dosya yoksa tek bir 'default' demo sensörü tanımlanır.
+        """
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            definitions = data.get('sensors', [])
+            if 'workers' in data:
+                self.shared.num_workers = int(data['workers'])
+            loaded = 0
+            for definition in definitions:
+                try:
+                    self.add(definition['id'],
+                             name=definition.get('name'),
+                             source=definition.get('source', 'demo'),
+                             uri=definition.get('uri', 'ip:192.168.2.1'),
+                             config=definition.get('config'),
+                             execution=definition.get('execution', 'thread'),
+                             demo_rate=definition.get('rate', 1.0),
+                             publish=definition.get('publish', True))
+                    loaded += 1
+                except ValueError as e:
+                    print(f"✗ Sensör atlandı ({definition['id']}): {e}")
+            print(f"✓ {loaded} sensör yüklendi: {path}")
+
+        if not self.pipelines:
+            self.add('default',
+                     uri=f"ip:{os.environ.get('PLUTO_IP', '192.168.2.1')}")
@@ -6,12 +6,36 @@ Range-Doppler işleme, CFAR, hedef takibi
 
 import numpy as np
 from scipy import signal
-from scipy.ndimage import maximum_filter
-import matplotlib.pyplot as plt
+from scipy.ndimage import maximum_filter, uniform_filter
+from scipy.special import gammainccinv
+
+from metrics import timed
+from tracing import TRACER
+from rd_frame import POWER_FLOOR, RangeDopplerFrame, as_frame
+from micro_doppler import MICRO_DOPPLER_KEYS, MicroDopplerTracker
+import tile_pool
 
 class FMCWProcessor:
     """FMCW Radar sinyal işleyici"""
 
+    # Yeniden hesaplama gerektiren anahtarlar (reconfigure için)
+    RESOLUTION_KEYS = ('sample_rate', 'chirp_bandwidth', 'chirp_duration',
+                       'num_chirps', 'center_freq')
+    GEOMETRY_KEYS = ('num_chirps', 'num_samples')
+    CFAR_KEYS = ('cfar_guard_cells', 'cfar_training_cells', 'cfar_pfa')
+    GATE_KEYS = ('range_gate_min', 'range_gate_max', 'velocity_gate')
+    CLUTTER_KEYS = ('clutter_alpha', 'clutter_freeze', 'mti_taps')
+    INTEGRATION_KEYS = ('integration_frames',)
+    PARALLEL_KEYS = ('parallel_workers',)
+
+    # Döşeme başına en az range bin / chirp (küçük frame'lerde iş parçacığı
+    # yükü kazancı aşmasın)
+    TILE_MIN_BINS = 64
+    TILE_MIN_CHIRPS = 16
+
+    # clutter_freeze açıkken silinen arka plan bu kadar frame yeniden öğrenilir
+    CLUTTER_RELEARN_FRAMES = 10
+
     def __init__(self, config):
         """
         config: Konfigürasyon sözlüğü
@@ -20,9 +44,49 @@ class FMCWProcessor:
             - chirp_duration: Chirp süresi (saniye)
             - num_chirps: Bir frame'deki chirp sayısı
             - num_samples: Her chirp'teki örnek sayısı
+            - cfar_guard_cells, cfar_training_cells, cfar_pfa: CFAR
+              varsayılanları (opsiyonel)
+            - range_gate_min, range_gate_max: Mesafe kapısı (m, 0: kapalı)
+            - velocity_gate: Maksimum |hız| (m/s, 0: kapalı)
+            - clutter_alpha: Statik arka plan öğrenme katsayısı (0: kapalı)
+            - clutter_freeze: 1 ise arka plan güncellenmez, yalnızca çıkarılır.
+              Arka plan silinirse (geometri veya mesafe penceresi değişimi)
+              ilk CLUTTER_RELEARN_FRAMES frame yeniden öğrenilip sabitlenir
+            - mti_taps: MTI süzgeci (0: kapalı, 2 veya 3 darbeli)
+            - integration_frames: Evreuyumsuz entegre edilecek frame sayısı
+              (1: kapalı)
+            - cfar_pyramid_levels: Kabadan inceye CFAR seviyesi (0: kapalı)
+            - cfar_pyramid_pfa: Kaba seviyedeki yanlış alarm oranı
+            - micro_doppler_tracks: Mikro-Doppler STFT'si tutulan en fazla
+              hedef (0: kapalı)
+            - micro_doppler_window, micro_doppler_hop, micro_doppler_history:
+              STFT penceresi/adımı (chirp) ve özetlenen sütun sayısı
+            - parallel_workers: FFT ve CFAR döşemelerini çalıştıran iş
+              parçacığı sayısı (1: sıralı)
         """
-        self.config = config
+        self.config = dict(config)
         self.c = 3e8  # Işık hızı (m/s)
+        # Frame başına QoS kalitesi (set_quality)
+        self._quality_cfar_levels = 0
+        self._quality_doppler_chirps = None
+
+        self._update_resolution()
+        self._update_roi()
+        self._windows = {}
+        self._cfar_kernels = {}
+        self.reset_clutter()
+        self.reset_integration()
+        self.reset_micro_doppler()
+        self._update_parallel()
+
+        print(f"FMCW Processor Initialized:")
+        print(f"  Range Resolution: {self.range_resolution:.3f} m")
+        print(f"  Max Range: {self.max_range:.2f} m")
+        print(f"  Velocity Resolution: {self.velocity_resolution:.3f} m/s")
+
+    def _update_resolution(self):
+        """Çözünürlük sabitlerini hesapla"""
+        config = self.config
 
         # Mesafe çözünürlüğü
         self.range_resolution = self.c / (2 * config['chirp_bandwidth'])
@@ -31,104 +95,612 @@ class FMCWProcessor:
         self.max_range = (self.c * config['sample_rate'] * config['chirp_duration']) / \
                         (2 * config['chirp_bandwidth'])
 
-        # Hız çözünürlüğü
+        # Hız çözünürlüğü (Doppler FFT'ye giren chirp sayısına göre)
         self.velocity_resolution = self.c / \
-            (2 * config['center_freq'] * config['chirp_duration'] * config['num_chirps'])
+            (2 * config['center_freq'] * config['chirp_duration'] * self.doppler_chirps)
 
-        print(f"FMCW Processor Initialized:")
-        print(f"  Range Resolution: {self.range_resolution:.3f} m")
-        print(f"  Max Range: {self.max_range:.2f} m")
-        print(f"  Velocity Resolution: {self.velocity_resolution:.3f} m/s")
+    @property
+    def doppler_chirps(self):
+        """Doppler FFT'ye giren chirp sayısı (QoS azaltması yoksa num_chirps)"""
+        num_chirps = int(self.config['num_chirps'])
+        if self._quality_doppler_chirps:
+            return min(self._quality_doppler_chirps, num_chirps)
+        return num_chirps
+
+    def set_quality(self, cfar_levels=0, doppler_chirps=None):
+        """
+        Frame başına QoS kalitesi; konfigürasyon ve zamansal durum değişmez
+
+        cfar_levels: Piramit CFAR'ın en az seviyesi (0: config'e göre)
+        doppler_chirps: Doppler FFT'ye giren ilk chirp sayısı (None: tümü).
+            Range FFT, statik yankı arka planı ve mikro-Doppler izleri yine
+            tüm chirp'lerle güncellenir; azaltılmış frame'ler entegrasyon
+            halkasına girmez.
+        """
+        previous = self.doppler_chirps
+        self._quality_cfar_levels = int(cfar_levels or 0)
+        self._quality_doppler_chirps = int(doppler_chirps) if doppler_chirps else None
+        if self.doppler_chirps != previous:
+            self._update_resolution()
+            self._update_roi()
+
+    def _update_parallel(self):
+        """Döşeme havuzunu seç (aynı çalışan sayısındaki işlemciler paylaşır)"""
+        self.parallel_workers = max(1, int(self.config.get('parallel_workers', 1)))
+        self._pool = tile_pool.get_pool(self.parallel_workers)
+
+    def _update_roi(self):
+        """
+        Mesafe/hız kapılarından ilgi bölgesini (ROI) hesapla
+
+        Range FFT çıktısı Doppler FFT'den önce [range_bin_offset, range_bin_stop)
+        aralığına kırpılır. Bu aralık, kenardaki test hücrelerinin CFAR eğitim
+        hücrelerini bulabilmesi için ROI'nin her iki yanında guard + training
+        kadar pay içerir. roi_range / roi_doppler, kırpılmış harita içinde
+        CFAR test hücrelerinin ve özelliklerin kullanıldığı bölgedir.
+        """
+        config = self.config
+        num_range = config['num_samples'] // 2
+        num_doppler = self.doppler_chirps
+
+        gate_min = config.get('range_gate_min', 0) or 0
+        gate_max = config.get('range_gate_max', 0) or 0
+        velocity_gate = config.get('velocity_gate', 0) or 0
+
+        if gate_min > 0 or gate_max > 0:
+            lo = int(np.floor(gate_min / self.range_resolution))
+            hi = int(np.ceil(gate_max / self.range_resolution)) + 1 if gate_max > 0 else num_range
+            lo = min(max(lo, 0), num_range - 1)
+            hi = min(max(hi, lo + 1), num_range)
+
+            halo = config.get('cfar_guard_cells', 4) + config.get('cfar_training_cells', 8)
+            start = max(0, lo - halo)
+            stop = min(num_range, hi + halo)
+        else:
+            lo, hi = 0, num_range
+            start, stop = 0, num_range
+
+        self.range_bin_offset = start
+        self.range_bin_stop = stop
+        self.roi_range = slice(lo - start, hi - start)
+
+        if velocity_gate > 0:
+            k = int(np.floor(velocity_gate / self.velocity_resolution))
+            self.roi_doppler = slice(max(0, num_doppler // 2 - k),
+                                     min(num_doppler, num_doppler // 2 + k + 1))
+        else:
+            self.roi_doppler = slice(0, num_doppler)
+
+    def roi_view(self, range_doppler):
+        """Kırpılmış haritanın/frame'in ROI mesafe bölümü (CFAR payı hariç, kopyasız)"""
+        if isinstance(range_doppler, RangeDopplerFrame):
+            return range_doppler.range_slice(self.roi_range)
+        return range_doppler[:, self.roi_range]
+
+    def roi_extent(self):
+        """roi_view() için görüntü extent'i [min_m, max_m, min_v, max_v]"""
+        first = self.range_bin_offset + self.roi_range.start
+        last = self.range_bin_offset + self.roi_range.stop
+        half_doppler = self.doppler_chirps * self.velocity_resolution / 2
+        return [first * self.range_resolution, last * self.range_resolution,
+                -half_doppler, half_doppler]
+
+    def map_extent(self):
+        """process_frame_power() haritasının (CFAR payı dahil) extent'i"""
+        half_doppler = self.doppler_chirps * self.velocity_resolution / 2
+        return [self.range_bin_offset * self.range_resolution,
+                self.range_bin_stop * self.range_resolution, -half_doppler, half_doppler]
+
+    def reconfigure(self, config):
+        """
+        Konfigürasyonu değiştir; yalnızca etkilenen önhesaplanmış durum
+        (çözünürlük sabitleri, pencereler, CFAR çekirdekleri) yeniden kurulur
+
+        Frame sınırında (process_frame çağrıları arasında) çağrılmalıdır.
+        return: Değişen anahtarlar kümesi
+        """
+        new_config = dict(config)
+        changed = {key for key in set(self.config) | set(new_config)
+                   if self.config.get(key) != new_config.get(key)}
+        if not changed:
+            return changed
+
+        self.config = new_config
+        window = (self.range_bin_offset, self.range_bin_stop)
+        if changed & set(self.RESOLUTION_KEYS):
+            self._update_resolution()
+        if changed & set(self.GEOMETRY_KEYS):
+            self._windows = {}
+        if changed & set(self.CFAR_KEYS):
+            self._cfar_kernels = {}
+        if changed & set(self.PARALLEL_KEYS):
+            self._update_parallel()
+        if changed & set(self.RESOLUTION_KEYS + self.GEOMETRY_KEYS +
+                         self.CFAR_KEYS + self.GATE_KEYS):
+            self._update_roi()
+        # Arka plan kırpılmış mesafe penceresine bağlı; alpha=0 öğrenileni siler
+        if (changed & set(self.GEOMETRY_KEYS) or
+                window != (self.range_bin_offset, self.range_bin_stop) or
+                not new_config.get('clutter_alpha', 0)):
+            self.reset_clutter()
+        if (changed & set(self.INTEGRATION_KEYS + self.CLUTTER_KEYS) or
+                window != (self.range_bin_offset, self.range_bin_stop)):
+            self.reset_integration()
+        # İzler kırpılmış range bin'lerine ve chirp zamanlamasına bağlı
+        if (changed & set(MICRO_DOPPLER_KEYS + self.RESOLUTION_KEYS + self.GEOMETRY_KEYS) or
+                window != (self.range_bin_offset, self.range_bin_stop)):
+            self.reset_micro_doppler()
+        return changed
+
+    def reset_clutter(self):
+        """Öğrenilmiş statik arka planı sil"""
+        self._clutter_background = None
+        self._clutter_frames = 0
+
+    @property
+    def clutter_frames(self):
+        """Arka plana katılmış frame sayısı"""
+        return self._clutter_frames
+
+    def _suppress_clutter(self, range_fft):
+        """
+        Statik yankıları (duvar, mobilya) Doppler FFT'den önce bastır
+
+        Arka plan, her mesafe bin'inin yavaş zaman ortalamasının üstel ağırlıklı
+        ortalamasıdır; güncelleme frame başına O(range bin). İlk frame'lerde
+        katsayı 1/n'e yükseltilir, böylece tahmin hızla oturur. clutter_freeze
+        ile boş odada öğrenilen arka plan sabitlenebilir; sabitken arka plan
+        silinirse bastırma kapanık kalmasın diye CLUTTER_RELEARN_FRAMES frame
+        yeniden öğrenilir (oda o sırada boş değilse yeniden kalibre edin).
+
+        range_fft: (num_chirps, kırpılmış range bin) kompleks
+        """
+        alpha = self.config.get('clutter_alpha', 0)
+        if alpha > 0:
+            if (not self.config.get('clutter_freeze', 0) or
+                    self._clutter_frames < self.CLUTTER_RELEARN_FRAMES):
+                profile = range_fft.mean(axis=0)
+                self._clutter_frames += 1
+                if self._clutter_background is None:
+                    self._clutter_background = profile
+                else:
+                    weight = max(alpha, 1.0 / self._clutter_frames)
+                    self._clutter_background += weight * (profile - self._clutter_background)
+            if self._clutter_background is not None:
+                range_fft = range_fft - self._clutter_background
+
+        # MTI: chirp'ler arası (dairesel) fark süzgeci; sıfır Doppler'i söndürür
+        taps = self.config.get('mti_taps', 0)
+        if taps == 2:
+            range_fft = range_fft - np.roll(range_fft, 1, axis=0)
+        elif taps == 3:
+            range_fft = (range_fft - 2 * np.roll(range_fft, 1, axis=0) +
+                         np.roll(range_fft, 2, axis=0))
+        return range_fft
+
+    def reset_micro_doppler(self):
+        """Hedef başına mikro-Doppler izlerini sil"""
+        self._range_fft = None
+        if self.config.get('micro_doppler_tracks', 8) > 0:
+            self.micro_doppler = MicroDopplerTracker(self.config)
+        else:
+            self.micro_doppler = None
+
+    @timed('micro_doppler')
+    def micro_doppler_features(self, clusters, timestamp=None):
+        """
+        Son işlenen frame'in yavaş zaman örnekleriyle izlerin STFT'sini
+        güncelle (process_frame_power'dan sonra çağrılmalı)
+
+        clusters: cluster_detections çıktısı (kırpılmış bin'ler)
+        timestamp: Frame zamanı (saniye, None: şimdi)
+        return: (bandwidth, envelope); kapalıysa None
+        """
+        if self.micro_doppler is None or self._range_fft is None:
+            return None
+        return self.micro_doppler.update(self._range_fft, clusters, timestamp)
+
+    def reset_integration(self):
+        """Entegrasyon halkasını boşalt"""
+        self._integration_ring = None
+        self._integration_sum = None
+        self._integration_index = 0
+        self._integration_count = 0
+
+    @property
+    def integrated_frames(self):
+        """Entegre haritadaki frame sayısı"""
+        return self._integration_count
+
+    def _integrate(self, power):
+        """
+        Son K frame'in doğrusal gücünü evreuyumsuz olarak topla
+
+        Halka (K, num_doppler, num_range) boyutunda bir kez ayrılır; her frame
+        en yeni harita eklenip en eskisi çıkarılır, maliyet O(harita). Kayan
+        nokta hatası birikmesin diye halka her turda bir kez baştan toplanır.
+        Halka dolana kadar mevcut frame'lerin ortalaması döner.
+
+        power: (num_doppler, num_range) doğrusal güç
+        return: (ortalama güç, entegre frame sayısı)
+        """
+        frames = int(self.config.get('integration_frames', 1) or 1)
+        if frames <= 1:
+            return power, 1
+
+        ring = self._integration_ring
+        if ring is None or ring.shape != (frames,) + power.shape:
+            ring = self._integration_ring = np.zeros((frames,) + power.shape)
+            self._integration_sum = np.zeros(power.shape)
+            self._integration_index = 0
+            self._integration_count = 0
+
+        index = self._integration_index
+        total = self._integration_sum
+        total -= ring[index]
+        total += power
+        ring[index] = power
+        self._integration_index = (index + 1) % frames
+        self._integration_count = min(self._integration_count + 1, frames)
+        if self._integration_index == 0:
+            np.sum(ring, axis=0, out=total)
+
+        count = self._integration_count
+        return total / count, count
+
+    def _get_windows(self, shape):
+        """(num_chirps, num_samples) için Hamming pencerelerini önbellekten al"""
+        windows = self._windows.get(shape)
+        if windows is None:
+            num_chirps, num_samples = shape
+            windows = (np.hamming(num_samples),
+                       np.hamming(num_chirps)[:, np.newaxis])
+            self._windows[shape] = windows
+        return windows
+
+    def _get_cfar_kernel(self, guard_cells, training_cells, pfa, looks=1):
+        """
+        CA-CFAR çekirdeğini önbellekten al
+
+        looks: Haritada ortalaması alınmış frame sayısı. K frame'in ortalaması
+               alınan gürültü gücü Gamma(K, 1/K) dağılır; aynı pfa için gereken
+               eşik, tek frame eşiğine göre Gamma kuyruk oranıyla düşürülür.
+        return: (dış pencere, iç pencere, eğitim hücresi sayısı, eşik (dB))
+        """
+        key = (guard_cells, training_cells, pfa, looks)
+        kernel = self._cfar_kernels.get(key)
+        if kernel is None:
+            outer = 2 * (guard_cells + training_cells) + 1
+            inner = 2 * guard_cells + 1
+            count = outer ** 2 - inner ** 2
+
+            # SNR eşiği (Shnidman formülü)
+            num_training = training_cells * 4  # 4 taraf
+            threshold_factor = num_training * (pfa**(-1/num_training) - 1)
+            if looks > 1:
+                threshold_factor *= gammainccinv(looks, pfa) / looks / -np.log(pfa)
+
+            kernel = (outer, inner, count, 10 * np.log10(threshold_factor))
+            self._cfar_kernels[key] = kernel
+        return kernel
 
     def process_frame(self, raw_data):
         """
         Ham veriyi işle ve Range-Doppler haritası oluştur
 
         raw_data: (num_chirps, num_samples) boyutunda kompleks numpy array
-        return: Range-Doppler haritası (dB)
+        return: Range-Doppler haritası (dB), mesafe kapısı açıksa
+                (num_chirps, range_bin_stop - range_bin_offset) boyutunda
+        """
+        return self.process_frame_power(raw_data).db
+
+    @timed('process_frame')
+    def process_frame_power(self, raw_data):
+        """
+        process_frame ile aynı işleme; sonucu doğrusal güç olarak tutan
+        RangeDopplerFrame döndürür (dB yalnızca gerekirse hesaplanır)
+
+        integration_frames > 1 ise dönen güç son K frame'in ortalamasıdır
+        (frame.looks entegre frame sayısını taşır). parallel_workers > 1 ise
+        FFT'ler döşemeler halinde havuzda çalışır (sonuç aynıdır).
         """
-        # Windowing (Hamming) - yan lobları azaltmak için
-        range_window = np.hamming(raw_data.shape[1])
-        doppler_window = np.hamming(raw_data.shape[0])
+        # Windowing (Hamming) - yan lobları azaltmak için (önbellekten)
+        doppler_chirps = self.doppler_chirps
+        range_window, doppler_window = self._get_windows((doppler_chirps, raw_data.shape[1]))
 
         # Range FFT (her chirp için)
-        range_fft = np.fft.fft(raw_data * range_window, axis=1)
-        range_fft = range_fft[:, :raw_data.shape[1]//2]  # Pozitif frekanslar
+        with TRACER.span('range_fft'):
+            if self._pool is not None:
+                range_fft = self._range_fft_tiles(raw_data, range_window)
+            else:
+                range_fft = np.fft.fft(raw_data * range_window, axis=1)
+                range_fft = range_fft[:, :raw_data.shape[1]//2]  # Pozitif frekanslar
+
+                # Mesafe kapısı: Doppler FFT yalnızca ROI (+ CFAR payı) için
+                range_fft = range_fft[:, self.range_bin_offset:self.range_bin_stop]
+
+        # Statik yankı bastırma (arka plan çıkarma, MTI)
+        with TRACER.span('clutter_suppression'):
+            range_fft = self._suppress_clutter(range_fft)
+        # Mikro-Doppler STFT'si için yavaş zaman örnekleri (kopyasız referans)
+        self._range_fft = range_fft
+
+        # QoS Doppler azaltması: yalnızca ilk chirp'ler (kopyasız görünüm)
+        reduced = doppler_chirps < range_fft.shape[0]
+        if reduced:
+            range_fft = range_fft[:doppler_chirps]
+
+        # Doppler FFT (chirp'ler arası) ve doğrusal güç |X|^2
+        with TRACER.span('doppler_fft'):
+            if self._pool is not None:
+                power = self._doppler_power_tiles(range_fft, doppler_window)
+            else:
+                range_doppler = np.fft.fft(range_fft * doppler_window, axis=0)
+                range_doppler = np.fft.fftshift(range_doppler, axes=0)
+                power = range_doppler.real ** 2 + range_doppler.imag ** 2
+
+        # Evreuyumsuz çok frame'li entegrasyon (halka tam Doppler boyutunda)
+        with TRACER.span('integration'):
+            power, looks = (power, 1) if reduced else self._integrate(power)
+
+        return RangeDopplerFrame(power=power, looks=looks)
+
+    def _range_fft_tiles(self, raw_data, range_window):
+        """
+        Range FFT chirp blokları halinde (her chirp'in FFT'si tüm örneklere
+        bağlı olduğundan bu adım mesafe yerine chirp ekseninde bölünür);
+        çıktı doğrudan kırpılmış mesafe aralığıdır
+        """
+        start, stop = self.range_bin_offset, self.range_bin_stop
+        range_fft = np.empty((raw_data.shape[0], stop - start), dtype=np.complex128)
+
+        def tile(rows):
+            range_fft[rows] = np.fft.fft(raw_data[rows] * range_window, axis=1)[:, start:stop]
+
+        tile_pool.run(self._pool, tile, tile_pool.split(
+            0, raw_data.shape[0], self.parallel_workers, self.TILE_MIN_CHIRPS))
+        return range_fft
 
-        # Doppler FFT (chirp'ler arası)
-        range_doppler = np.fft.fft(range_fft.T * doppler_window, axis=1).T
-        range_doppler = np.fft.fftshift(range_doppler, axes=0)
+    def _doppler_power_tiles(self, range_fft, doppler_window):
+        """Doppler FFT ve güç mesafe döşemelerinde (range bin'ler bağımsız, halo yok)"""
+        power = np.empty(range_fft.shape)
 
-        # dB'ye çevir
-        range_doppler_db = 20 * np.log10(np.abs(range_doppler) + 1e-10)
+        def tile(columns):
+            spectrum = np.fft.fft(range_fft[:, columns] * doppler_window, axis=0)
+            power[:, columns] = np.fft.fftshift(spectrum.real ** 2 + spectrum.imag ** 2,
+                                                axes=0)
 
-        return range_doppler_db
+        tile_pool.run(self._pool, tile, tile_pool.split(
+            0, range_fft.shape[1], self.parallel_workers, self.TILE_MIN_BINS))
+        return power
 
-    def cfar_detector(self, range_doppler_db, guard_cells=4, training_cells=8, pfa=1e-4):
+    @timed('cfar_detector')
+    def cfar_detector(self, range_doppler_db, guard_cells=None, training_cells=None, pfa=None,
+                      levels=None):
         """
         CFAR (Constant False Alarm Rate) hedef algılama
 
-        range_doppler_db: Range-Doppler haritası (dB)
-        guard_cells: Koruma hücresi sayısı
-        training_cells: Eğitim hücresi sayısı
-        pfa: Yanlış alarm oranı
+        range_doppler_db: Range-Doppler haritası (dB) veya RangeDopplerFrame
+        guard_cells: Koruma hücresi sayısı (None: config / 4)
+        training_cells: Eğitim hücresi sayısı (None: config / 8)
+        pfa: Yanlış alarm oranı (None: config / 1e-4)
+        levels: Kabadan inceye piramit seviyesi (None: config ve set_quality
+                seviyesinin büyüğü, 0: tam harita)
 
         return: Tespit edilen hedefler listesi [(range_bin, doppler_bin, snr), ...]
         """
-        # CFAR eşiği hesapla (CA-CFAR: Cell Averaging CFAR)
-        num_training = training_cells * 4  # 4 taraf
-
-        # SNR eşiği (Shnidman formülü)
-        threshold_factor = num_training * (pfa**(-1/num_training) - 1)
+        if guard_cells is None:
+            guard_cells = self.config.get('cfar_guard_cells', 4)
+        if training_cells is None:
+            training_cells = self.config.get('cfar_training_cells', 8)
+        if pfa is None:
+            pfa = self.config.get('cfar_pfa', 1e-4)
+        if levels is None:
+            levels = max(self.config.get('cfar_pyramid_levels', 0), self._quality_cfar_levels)
+
+        frame = as_frame(range_doppler_db)
+        if levels > 0:
+            detections = self._pyramid_cfar(frame, guard_cells, training_cells, pfa, levels)
+            if detections is not None:
+                return detections
 
-        detections = []
+        # CFAR eşiği hesapla (CA-CFAR: Cell Averaging CFAR)
+        kernel = self._get_cfar_kernel(guard_cells, training_cells, pfa, frame.looks)
 
-        for r in range(guard_cells + training_cells,
-                      range_doppler_db.shape[1] - guard_cells - training_cells):
-            for d in range(guard_cells + training_cells,
-                          range_doppler_db.shape[0] - guard_cells - training_cells):
+        # Test hücreleri: tam eğitim penceresi olan ve ROI içinde kalan bölge
+        cells = self._cfar_cells(frame.shape, guard_cells + training_cells,
+                                 self.roi_doppler, self.roi_range)
+        if cells is None:
+            return []
+        if self._pool is not None:
+            return self._cfar_tiles(frame.power, cells, guard_cells + training_cells, kernel)
+        return self._cfar_window(frame.power, cells, guard_cells + training_cells, kernel)
 
-                # Test hücresi
-                cut = range_doppler_db[d, r]
+    @staticmethod
+    def _cfar_cells(shape, margin, rows, columns):
+        """
+        Tam eğitim penceresi olan ve rows/columns aralığında kalan test hücreleri
 
-                # Eğitim hücreleri (CUT etrafında, guard hücreler hariç)
-                training_sum = 0
-                count = 0
+        return: (d_lo, d_hi, r_lo, r_hi) veya boşsa None
+        """
+        num_doppler, num_range = shape
+        d_lo = max(margin, rows.start)
+        d_hi = min(num_doppler - margin, rows.stop)
+        r_lo = max(margin, columns.start)
+        r_hi = min(num_range - margin, columns.stop)
+        if d_lo >= d_hi or r_lo >= r_hi:
+            return None
+        return d_lo, d_hi, r_lo, r_hi
+
+    @staticmethod
+    def _cfar_mask(power, cells, margin, kernel):
+        """
+        CA-CFAR karşılaştırması, yalnızca cells penceresi için
 
-                for i in range(-training_cells - guard_cells, training_cells + guard_cells + 1):
-                    for j in range(-training_cells - guard_cells, training_cells + guard_cells + 1):
-                        if abs(i) > guard_cells or abs(j) > guard_cells:
-                            training_sum += 10**(range_doppler_db[d+i, r+j] / 10)
-                            count += 1
+        Eğitim toplamları pencerenin margin kadar genişletilmiş bölümü üzerinde
+        hesaplanır; tam haritada aynı hücreler için hesaplananla aynıdır.
+        return: (tespit maskesi, test hücresi gücü, ortalama gürültü gücü)
+        """
+        outer, inner, count, threshold_db = kernel
+        d_lo, d_hi, r_lo, r_hi = cells
+        patch = power[d_lo - margin:d_hi + margin, r_lo - margin:r_hi + margin]
+
+        # Eğitim hücreleri toplamı = dış kare - koruma karesi (doğrusal güç)
+        with TRACER.span('cfar_training_sums'):
+            outer_sum = uniform_filter(patch, size=outer, mode='constant') * outer**2
+            inner_sum = uniform_filter(patch, size=inner, mode='constant') * inner**2
+            training_sum = (outer_sum - inner_sum)[margin:-margin or None,
+                                                   margin:-margin or None]
+
+        # Ortalama gürültü gücü
+        noise_avg = np.maximum(training_sum / count, 1e-30)
+
+        # Tespit (test hücresi > eşik); eşik doğrusal alanda karşılaştırılır
+        cut = power[d_lo:d_hi, r_lo:r_hi] + POWER_FLOOR
+        return cut > noise_avg * 10 ** (threshold_db / 10), cut, noise_avg
+
+    def _cfar_window(self, power, cells, margin, kernel):
+        """cells penceresinde CA-CFAR; log10 yalnızca tespit edilen hücreler için"""
+        mask, cut, noise_avg = self._cfar_mask(power, cells, margin, kernel)
+        d_lo, _, r_lo, _ = cells
+
+        # Sıralama: önce range, sonra Doppler bin
+        r_idx, d_idx = np.nonzero(mask.T)
+        snr = 10 * np.log10(cut[d_idx, r_idx] / noise_avg[d_idx, r_idx])
+        return [(int(r + r_lo), int(d + d_lo), float(v))
+                for r, d, v in zip(r_idx, d_idx, snr)]
+
+    def _cfar_tiles(self, power, cells, margin, kernel):
+        """
+        CA-CFAR mesafe döşemelerinde
 
-                # Ortalama gürültü gücü
-                noise_avg = 10 * np.log10(training_sum / count)
+        Her döşeme yalnızca kendi test hücresi sütunlarını değerlendirir;
+        eğitim pencereleri komşu döşemelere margin kadar taşar (halo, tam
+        haritadan okunur). Test hücreleri örtüşmediğinden sınırda tekrar eden
+        tespit olmaz ve döşemeler mesafe sırasında birleştirildiğinden çıktı
+        sırası _cfar_window ile aynıdır.
+        """
+        d_lo, d_hi, r_lo, r_hi = cells
 
-                # Eşik
-                threshold = noise_avg + 10 * np.log10(threshold_factor)
+        def tile(columns):
+            return self._cfar_window(power, (d_lo, d_hi, columns.start, columns.stop),
+                                     margin, kernel)
 
-                # Tespit
-                if cut > threshold:
-                    snr = cut - noise_avg
-                    detections.append((r, d, snr))
+        results = tile_pool.run(self._pool, tile, tile_pool.split(
+            r_lo, r_hi, self.parallel_workers, self.TILE_MIN_BINS))
+        return [detection for detections in results for detection in detections]
 
-        return detections
+    def _pyramid_cfar(self, frame, guard_cells, training_cells, pfa, levels):
+        """
+        Kabadan inceye CFAR
+
+        Piramidin en üst seviyesinde (2^levels x 2^levels blok ortalaması)
+        koruma/eğitim pencereleri blok boyutuna ölçeklenmiş, daha serbest
+        eşikli (cfar_pyramid_pfa) bir CA-CFAR çalışır. Blok ortalaması
+        gürültü varyansını düşürdüğünden eşik blok hücre sayısı kadar
+        'look' için seçilir. Kaba tespitler bir blok genişletilir ve tam
+        çözünürlüklü CFAR yalnızca bu blokların hücrelerinde çalışır; her
+        hücre bir kez değerlendirildiğinden tekrar eden tespit olmaz. Sonuç
+        cfar_detector ile aynı biçim ve sıradadır.
+
+        return: Tespit listesi; harita piramit için çok küçükse None
+        """
+        pyramid = frame.power_pyramid(levels)
+        if not pyramid:
+            return None
+        coarse = pyramid[-1]
+        block = 2 ** len(pyramid)
+
+        # Kaba CFAR: pencereler blok boyutuna ölçeklenir
+        coarse_guard = -(-guard_cells // block)
+        coarse_training = max(1, -(-training_cells // block))
+        coarse_margin = coarse_guard + coarse_training
+        coarse_kernel = self._get_cfar_kernel(
+            coarse_guard, coarse_training, self.config.get('cfar_pyramid_pfa', 1e-2),
+            frame.looks * block ** 2)
+        coarse_cells = self._cfar_cells(
+            coarse.shape, coarse_margin,
+            slice(self.roi_doppler.start // block, -(-self.roi_doppler.stop // block)),
+            slice(self.roi_range.start // block, -(-self.roi_range.stop // block)))
+        if coarse_cells is None:
+            return None
+
+        with TRACER.span('cfar_coarse'):
+            hits, _, _ = self._cfar_mask(coarse, coarse_cells, coarse_margin, coarse_kernel)
+            d_lo, d_hi, r_lo, r_hi = coarse_cells
+            candidates = np.zeros(coarse.shape, dtype=bool)
+            candidates[d_lo:d_hi, r_lo:r_hi] = hits
+            # Blok sınırına denk gelen hedefler için bir blok genişlet
+            candidates = maximum_filter(candidates, size=3)
+
+        # Aday blokları tam çözünürlüğe aç; atılan tek sayılı kenar
+        # satır/sütunları son bloğa dahil et
+        fine = np.zeros(frame.shape, dtype=bool)
+        rows, columns = coarse.shape[0] * block, coarse.shape[1] * block
+        fine[:rows, :columns] = candidates.repeat(block, axis=0).repeat(block, axis=1)
+        fine[rows:, :columns] = fine[rows - 1, :columns]
+        fine[:, columns:] = fine[:, columns - 1:columns]
+
+        margin = guard_cells + training_cells
+        cells = self._cfar_cells(frame.shape, margin, self.roi_doppler, self.roi_range)
+        if cells is None:
+            return []
+        d_lo, d_hi, r_lo, r_hi = cells
+        d_idx, r_idx = np.nonzero(fine[d_lo:d_hi, r_lo:r_hi])
+        if len(d_idx) == 0:
+            return []
+        d_idx += d_lo
+        r_idx += r_lo
+
+        # Tam çözünürlüklü CFAR yalnızca aday hücrelerde: eğitim toplamları
+        # adayları kapsayan pencerenin toplam alan tablosundan (integral
+        # görüntü) hücre başına dört okumayla alınır
+        outer, inner, count, threshold_db = self._get_cfar_kernel(
+            guard_cells, training_cells, pfa, frame.looks)
+        with TRACER.span('cfar_training_sums'):
+            d0, r0 = d_idx.min() - margin, r_idx.min() - margin
+            d1, r1 = d_idx.max() + margin + 1, r_idx.max() + margin + 1
+            table = np.zeros((d1 - d0 + 1, r1 - r0 + 1))
+            np.cumsum(frame.power[d0:d1, r0:r1], axis=0, out=table[1:, 1:])
+            np.cumsum(table[1:, 1:], axis=1, out=table[1:, 1:])
+            d_local, r_local = d_idx - d0, r_idx - r0
+
+            def box_sum(half):
+                top, bottom = d_local - half, d_local + half + 1
+                left, right = r_local - half, r_local + half + 1
+                return (table[bottom, right] - table[top, right] -
+                        table[bottom, left] + table[top, left])
+
+            training_sum = box_sum(margin) - box_sum(guard_cells)
+
+        noise_avg = np.maximum(training_sum / count, 1e-30)
+        cut = frame.power[d_idx, r_idx] + POWER_FLOOR
+        mask = cut > noise_avg * 10 ** (threshold_db / 10)
+
+        # Sıralama: önce range, sonra Doppler bin (cfar_detector ile aynı)
+        d_idx, r_idx, cut, noise_avg = d_idx[mask], r_idx[mask], cut[mask], noise_avg[mask]
+        order = np.lexsort((d_idx, r_idx))
+        snr = 10 * np.log10(cut[order] / noise_avg[order])
+        return [(int(r), int(d), float(v))
+                for r, d, v in zip(r_idx[order], d_idx[order], snr)]
 
     def range_doppler_to_physical(self, range_bin, doppler_bin):
         """
         Bin indekslerini fiziksel mesafe ve hıza çevir
 
+        range_bin: process_frame çıktısındaki (kırpılmış) mesafe indeksi
         return: (distance_m, velocity_m_s)
         """
-        distance = range_bin * self.range_resolution
+        distance = (range_bin + self.range_bin_offset) * self.range_resolution
 
         # Doppler bin'i hıza çevir
-        num_doppler_bins = self.config['num_chirps']
+        num_doppler_bins = self.doppler_chirps
         doppler_bin_centered = doppler_bin - num_doppler_bins // 2
         velocity = doppler_bin_centered * self.velocity_resolution
 
         return distance, velocity
 
+    @timed('cluster_detections')
     def cluster_detections(self, detections, eps=1.5):
         """
         Yakın tespitleri grupla (basit kümeleme)
@@ -182,17 +754,14 @@ class KalmanTracker:
         measurement_noise: Ölçüm gürültüsü
         """
         self.dt = dt
+        self.process_noise = process_noise
+        self.measurement_noise = measurement_noise
 
         # State: [x, y, vx, vy]
         self.x = np.zeros(4)
 
         # State transition matrix
-        self.F = np.array([
-            [1, 0, dt, 0],
-            [0, 1, 0, dt],
-            [0, 0, 1, 0],
-            [0, 0, 0, 1]
-        ])
+        self.F = self._transition_matrix(dt)
 
         # Measurement matrix (sadece pozisyon ölçülür)
         self.H = np.array([
@@ -211,6 +780,27 @@ class KalmanTracker:
 
         self.initialized = False
 
+    @staticmethod
+    def _transition_matrix(dt):
+        return np.array([
+            [1, 0, dt, 0],
+            [0, 1, 0, dt],
+            [0, 0, 1, 0],
+            [0, 0, 0, 1]
+        ])
+
+    def reconfigure(self, dt=None, process_noise=None, measurement_noise=None):
+        """Parametreleri değiştir (mevcut durum ve kovaryans korunur)"""
+        if dt is not None and dt != self.dt:
+            self.dt = dt
+            self.F = self._transition_matrix(dt)
+        if process_noise is not None and process_noise != self.process_noise:
+            self.process_noise = process_noise
+            self.Q = np.eye(4) * process_noise
+        if measurement_noise is not None and measurement_noise != self.measurement_noise:
+            self.measurement_noise = measurement_noise
+            self.R = np.eye(2) * measurement_noise
+
     def init_state(self, x, y):
         """İlk durumu ayarla"""
         self.x = np.array([x, y, 0, 0])
@@ -250,6 +840,9 @@ def visualize_range_doppler(range_doppler_db, detections=None,
     range_doppler_db: Range-Doppler matrisi (dB)
     detections: Tespit edilen hedefler (opsiyonel)
     """
+    # Yalnızca görselleştirmede gerekli; sunucu başlangıcında yüklenmez
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 8))
 
     # Range-Doppler haritası
@@ -289,7 +882,7 @@ if __name__ == '__main__':
     # Simülasyon parametreleri
     config = {
         'sample_rate': 2e6,
-        'chirp_bandwidth': 100e6,
+        'chirp_bandwidth': 1e9,   # 0.15 m mesafe çözünürlüğü
         'chirp_duration': 1e-3,
         'num_chirps': 128,
         'num_samples': 256,
@@ -299,25 +892,13 @@ if __name__ == '__main__':
     # Processor oluştur
     processor = FMCWProcessor(config)
 
-    # Simüle edilmiş veri (2 hedef)
-    np.random.seed(42)
-    raw_data = np.random.randn(config['num_chirps'], config['num_samples']) * 0.1 + \
-               1j * np.random.randn(config['num_chirps'], config['num_samples']) * 0.1
-
-    # Hedef 1: 3 metre, durağan
-    target1_range_bin = int(3.0 / processor.range_resolution)
-    target1_doppler_bin = config['num_chirps'] // 2
-    for i in range(config['num_chirps']):
-        raw_data[i, target1_range_bin] += 5 * np.exp(1j * 2 * np.pi * i / config['num_chirps'] *
-                                                     (target1_doppler_bin - config['num_chirps']//2))
-
-    # Hedef 2: 5 metre, 1 m/s hızla uzaklaşan
-    target2_range_bin = int(5.0 / processor.range_resolution)
-    target2_velocity = 1.0  # m/s
-    target2_doppler_bin = int(target2_velocity / processor.velocity_resolution) + config['num_chirps']//2
-    for i in range(config['num_chirps']):
-        raw_data[i, target2_range_bin] += 3 * np.exp(1j * 2 * np.pi * i / config['num_chirps'] *
-                                                     (target2_doppler_bin - config['num_chirps']//2))
+    # Simüle edilmiş veri (2 hedef) - vektörize sahne simülatörü
+    from scene_simulator import SceneSimulator, PointTarget
+    scene = SceneSimulator(config, targets=[
+        PointTarget(3.0, 0.0, 0.5),   # 3 metre, durağan
+        PointTarget(5.0, 1.0, 0.3),   # 5 metre, 1 m/s hızla uzaklaşan
+    ], noise_std=0.1, seed=42)
+    raw_data = scene.frame()
 
     # İşle
     range_doppler_db = processor.process_frame(raw_data)
@@ -337,6 +918,7 @@ if __name__ == '__main__':
         print(f"  Target {i+1}: {distance:.2f}m, {velocity:.2f}m/s, SNR={snr:.1f}dB")
 
     # Görselleştir
+    import matplotlib.pyplot as plt
     visualize_range_doppler(range_doppler_db, clusters,
                            processor.range_resolution,
                            processor.velocity_resolution)
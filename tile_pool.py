@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Döşeme (Tile) Paralel İşleme
+Büyük Range-Doppler frame'lerinde FFT ve CFAR adımları mesafe ekseni
+boyunca döşemelere bölünüp kalıcı bir iş parçacığı havuzunda çalıştırılır.
+NumPy FFT'leri, SciPy süzgeçleri ve eleman bazlı işlemler GIL'i bıraktığından
+döşemeler çekirdekler arasında gerçekten paralel ilerler.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Çalışan sayısı -> kalıcı havuz (aynı sayıyı kullanan sensörler paylaşır)
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(workers):
+    """
+    workers iş parçacıklı kalıcı havuz; workers <= 1 ise None (sıralı işleme)
+
+    Havuzlar süreç boyunca yaşar; her frame'de iş parçacığı oluşturulmaz.
+    """
+    if workers <= 1:
+        return None
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix=f'dsp-tile-{workers}')
+        return pool
+
+
+def split(start, stop, count, min_size=1):
+    """
+    [start, stop) aralığını en fazla count ardışık, örtüşmeyen parçaya böl
+
+    min_size: Parça başına en az eleman (küçük aralıklarda parça sayısı düşer)
+    return: slice listesi (boş aralıkta boş liste)
+    """
+    length = stop - start
+    if length <= 0:
+        return []
+    count = max(1, min(count, length // max(1, min_size)))
+    edges = [start + (length * i) // count for i in range(count + 1)]
+    return [slice(edges[i], edges[i + 1]) for i in range(count)]
+
+
+def run(pool, function, tiles):
+    """
+    function(tile) çağrılarını havuzda çalıştır; sonuçlar döşeme sırasında
+
+    pool None ise veya tek döşeme varsa çağıran iş parçacığında çalışır.
+    Döşemelerden birinin istisnası çağırana aktarılır.
+    """
+    if pool is None or len(tiles) <= 1:
+        return [function(tile) for tile in tiles]
+    return list(pool.map(function, tiles))
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Frame İzleme (Tracing)
+Tek tek yavaş frame'lerin aşama zaman çizelgesini kaydeder ve
+Chrome/Perfetto trace JSON olarak dışa aktarır
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+
+
+class _NullScope:
+    """İzleme kapalıyken dönen, hiçbir şey yapmayan context manager"""
+
+    __slots__ = ()
+    spans = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Span:
+    __slots__ = ('_tracer', '_name', '_start')
+
+    def __init__(self, tracer, name):
+        self._tracer = tracer
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._tracer.add_span(self._name, self._start, time.perf_counter())
+        return False
+
+
+class _FrameScope:
+    """Bir frame'in span'larını iş parçacığına özel listede toplar"""
+
+    __slots__ = ('_tracer', 'sensor_id', 'frame_id', 'kind', 'start', 'spans',
+                 '_retain', '_previous')
+
+    def __init__(self, tracer, sensor_id, frame_id, kind, start, retain):
+        self._tracer = tracer
+        self.sensor_id = sensor_id
+        self.frame_id = frame_id
+        self.kind = kind
+        self.start = start
+        self.spans = []
+        self._retain = retain
+
+    def __enter__(self):
+        local = self._tracer._local
+        self._previous = getattr(local, 'scope', None)
+        local.scope = self
+        if self.start is None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        self._tracer._local.scope = self._previous
+        if self._retain:
+            self._tracer._finish(self, end)
+        return False
+
+
+class Tracer:
+    """
+    Frame bazlı span kaydedici
+
+    Span'lar önce iş parçacığına özel frame listesinde toplanır; frame
+    süresi eşiği aşarsa kayıt halka tampona yazılır. Halka yuvası
+    itertools.count() ile alınır ve liste elemanı ataması tek adımdır,
+    bu yüzden yazarlar kilit almaz. İzleme kapalıyken span() ve frame()
+    yalnızca bir öznitelik kontrolü yapıp boş bir nesne döndürür.
+    """
+
+    def __init__(self, capacity=256, threshold=0.1):
+        """
+        capacity: Saklanacak yavaş frame sayısı
+        threshold: Frame'in saklanması için gereken minimum süre (saniye)
+        """
+        self.enabled = False
+        self.threshold = threshold
+        self.capacity = capacity
+        self._ring = [None] * capacity
+        self._counter = itertools.count()
+        self.frames_seen = 0
+        self._local = threading.local()
+        # perf_counter -> Unix zamanı (trace dosyasında mutlak zaman için)
+        self._epoch = time.time() - time.perf_counter()
+
+    def configure(self, enabled=None, threshold=None, capacity=None):
+        if threshold is not None:
+            self.threshold = float(threshold)
+        if capacity is not None and capacity != self.capacity:
+            self.capacity = int(capacity)
+            self.clear()
+        if enabled is not None:
+            self.enabled = bool(enabled)
+
+    def clear(self):
+        self._ring = [None] * self.capacity
+        self._counter = itertools.count()
+        self.frames_seen = 0
+
+    def frame(self, sensor_id, frame_id, kind='frame', start=None, retain=True):
+        """
+        Frame kapsamı; içindeki tüm span'lar bu frame'e aittir
+
+        start: Frame başlangıcı (perf_counter), None ise şimdi
+        retain: False ise kayıt halkaya yazılmaz, span'lar scope.spans
+                üzerinden alınır (işçi süreçten sonuç kaydıyla göndermek için)
+        """
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _FrameScope(self, sensor_id, frame_id, kind, start, retain)
+
+    def span(self, name):
+        """Aşama span'ı (aktif frame yoksa kaydedilmez)"""
+        if not self.enabled:
+            return _NULL_SCOPE
+        return _Span(self, name)
+
+    def add_span(self, name, start, end):
+        """Ölçülmüş süreyi aktif frame'e ekle (start/end: perf_counter)"""
+        scope = getattr(self._local, 'scope', None)
+        if scope is not None:
+            scope.spans.append((name, start, end, os.getpid(), threading.get_ident()))
+
+    def extend(self, spans):
+        """Başka bir süreçte kaydedilmiş span'ları aktif frame'e ekle"""
+        scope = getattr(self._local, 'scope', None)
+        if scope is not None:
+            scope.spans.extend(tuple(span) for span in spans)
+
+    def _finish(self, scope, end):
+        self.frames_seen += 1   # yalnızca istatistik; yarış kaybı önemsiz
+        if end - scope.start < self.threshold:
+            return
+        record = {
+            'sensor_id': scope.sensor_id,
+            'frame_id': scope.frame_id,
+            'kind': scope.kind,
+            'start': scope.start,
+            'end': end,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'spans': scope.spans,
+        }
+        ring = self._ring
+        ring[next(self._counter) % len(ring)] = record
+
+    def records(self):
+        """Saklanan frame kayıtları (eskiden yeniye)"""
+        records = [r for r in list(self._ring) if r is not None]
+        records.sort(key=lambda r: r['start'])
+        return records
+
+    def get_status(self):
+        records = self.records()
+        return {
+            'enabled': self.enabled,
+            'threshold_ms': self.threshold * 1000,
+            'capacity': self.capacity,
+            'frames_seen': self.frames_seen,
+            'frames_retained': len(records),
+            'slowest_ms': max(((r['end'] - r['start']) * 1000 for r in records),
+                              default=None)
+        }
+
+    def chrome_trace(self):
+        """
+        Chrome/Perfetto trace JSON (Trace Event Format) nesnesi
+
+        Her frame ve span bir 'X' (complete) olayıdır; zamanlar mikrosaniye.
+        chrome://tracing veya ui.perfetto.dev ile açılabilir.
+        """
+        events = []
+        threads = {}
+
+        def us(t):
+            return (t + self._epoch) * 1e6
+
+        for record in self.records():
+            key = (record['pid'], record['tid'])
+            threads.setdefault(key, f"{record['sensor_id']} {record['kind']}")
+            events.append({
+                'name': f"{record['kind']} {record['frame_id']}",
+                'cat': 'frame', 'ph': 'X',
+                'ts': us(record['start']),
+                'dur': (record['end'] - record['start']) * 1e6,
+                'pid': record['pid'], 'tid': record['tid'],
+                'args': {'sensor_id': record['sensor_id'], 'frame_id': record['frame_id']}
+            })
+            for name, start, end, pid, tid in record['spans']:
+                threads.setdefault((pid, tid), f"{record['sensor_id']} worker")
+                events.append({
+                    'name': name, 'cat': 'stage', 'ph': 'X',
+                    'ts': us(start), 'dur': (end - start) * 1e6,
+                    'pid': pid, 'tid': tid,
+                    'args': {'frame_id': record['frame_id']}
+                })
+
+        for (pid, tid), name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': name}})
+
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def dump(self, path):
+        """Trace JSON'u dosyaya yaz"""
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+        return path
+
+
+TRACER = Tracer()
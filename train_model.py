@@ -4,14 +4,41 @@ Aktivite Sınıflandırma Modeli
 Range-Doppler verisinden insan aktivitelerini tespit eder
 """
 
+import os
+import time
 import numpy as np
 import pickle
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, confusion_matrix
-import matplotlib.pyplot as plt
-import seaborn as sns
+
+from metrics import timed
+from rd_frame import as_frame
+from tracing import TRACER
+
+# Özellik vektörü şeması (extract_features sırasıyla); değişirse önbellekteki
+# eğitilmiş modeller geçersiz olur (model_manager.artifact_key)
+FEATURE_NAMES = (
+    'num_targets', 'distance_mean', 'distance_std', 'velocity_mean', 'velocity_std',
+    'snr_max', 'snr_mean', 'low_velocity_energy', 'mid_velocity_energy',
+    'high_velocity_energy', 'micro_doppler_ratio', 'distance_spread', 'velocity_spread',
+    'range_peak_idx', 'range_peak_value', 'micro_doppler_bandwidth',
+    'micro_doppler_envelope'
+)
+
+# Eğitim girdileri: sentetik veri ve model hiperparametreleri. Sentetik veri
+# üretimi değiştirildiğinde synthetic_data_version artırılmalıdır.
+TRAINING_PARAMS = {
+    'synthetic_data_version': 5,
+    'samples_per_class': 200,
+    'seed': 42,
+    'test_size': 0.2,
+    'n_estimators': 100,
+    'max_depth': 10,
+    'min_samples_split': 5,
+    'random_state': 42
+}
 
 class ActivityClassifier:
     """
@@ -36,14 +63,19 @@ class ActivityClassifier:
     def __init__(self):
         self.model = None
         self.scaler = StandardScaler()
-        self.feature_names = []
+        self.feature_names = list(FEATURE_NAMES)
+        # Opsiyonel PredictionCache (durağan sahnelerde modeli atlamak için)
+        self.cache = None
 
-    def extract_features(self, range_doppler_db, targets):
+    @timed('extract_features')
+    def extract_features(self, range_doppler_db, targets, micro_doppler=None):
         """
         Range-Doppler verisinden özellikler çıkar
 
-        range_doppler_db: Range-Doppler haritası (dB)
+        range_doppler_db: Range-Doppler haritası (dB) veya RangeDopplerFrame
         targets: Tespit edilen hedefler [(distance, velocity, snr, count), ...]
+        micro_doppler: Hedef başına STFT özetleri (bandwidth, envelope) -
+                       FMCWProcessor.micro_doppler_features; None ise sıfır
 
         return: Özellik vektörü
         """
@@ -55,7 +87,7 @@ class ActivityClassifier:
 
         if num_targets == 0:
             # Boş oda - diğer özellikleri sıfırla
-            features.extend([0] * 18)
+            features.extend([0] * (len(FEATURE_NAMES) - 1))
             return np.array(features)
 
         # 2. Ortalama mesafe
@@ -83,34 +115,34 @@ class ActivityClassifier:
         features.append(avg_snr)
 
         # 8-11. Mikro-Doppler özellikleri (Range-Doppler haritasından)
-        # Düşük hız bölgesi (mikro-Doppler) enerjisi
-        num_doppler = range_doppler_db.shape[0]
+        # Bant ortalamaları frame'in önbellekteki Doppler profilinden hesaplanır.
+        # Güç seviyeleri gürültü tabanına göredir (dB): mutlak seviye alıcı
+        # kazancına bağlıdır, simülatör ve PlutoSDR'da farklıdır.
+        frame = as_frame(range_doppler_db)
+        num_doppler = frame.shape[0]
         center_doppler = num_doppler // 2
+        noise_floor = frame.noise_floor
 
         # Düşük hız enerjisi (-0.5 m/s ile +0.5 m/s arası)
-        low_velocity_slice = range_doppler_db[center_doppler-5:center_doppler+5, :]
-        low_velocity_energy = np.mean(low_velocity_slice)
+        low_velocity_energy = frame.doppler_band_mean(
+            slice(center_doppler-5, center_doppler+5)) - noise_floor
         features.append(low_velocity_energy)
 
         # Orta hız enerjisi (0.5-2 m/s)
-        mid_velocity_slice = np.concatenate([
-            range_doppler_db[center_doppler-20:center_doppler-5, :],
-            range_doppler_db[center_doppler+5:center_doppler+20, :]
-        ])
-        mid_velocity_energy = np.mean(mid_velocity_slice)
+        mid_velocity_energy = frame.doppler_band_mean(
+            slice(center_doppler-20, center_doppler-5),
+            slice(center_doppler+5, center_doppler+20)) - noise_floor
         features.append(mid_velocity_energy)
 
         # Yüksek hız enerjisi (>2 m/s)
-        high_velocity_slice = np.concatenate([
-            range_doppler_db[:center_doppler-20, :],
-            range_doppler_db[center_doppler+20:, :]
-        ])
-        high_velocity_energy = np.mean(high_velocity_slice)
+        high_velocity_energy = frame.doppler_band_mean(
+            slice(None, center_doppler-20),
+            slice(center_doppler+20, None)) - noise_floor
         features.append(high_velocity_energy)
 
-        # Enerji oranı (mikro-Doppler / total)
-        total_energy = np.mean(range_doppler_db)
-        micro_doppler_ratio = low_velocity_energy / (total_energy + 1e-10)
+        # Enerji oranı (mikro-Doppler / total), dB farkı
+        total_energy = np.mean(frame.doppler_profile) - noise_floor
+        micro_doppler_ratio = low_velocity_energy - total_energy
         features.append(micro_doppler_ratio)
 
         # 12-15. Uzamsal özellikler
@@ -126,20 +158,20 @@ class ActivityClassifier:
         features.append(velocity_spread)
 
         # Range profil özellikleri
-        range_profile = np.mean(range_doppler_db, axis=0)
+        range_profile = frame.range_profile
         range_peak_idx = np.argmax(range_profile)
-        range_peak_value = range_profile[range_peak_idx]
+        range_peak_value = range_profile[range_peak_idx] - noise_floor
 
         features.append(range_peak_idx)
         features.append(range_peak_value)
 
-        # 16-20. Zaman serisi özellikleri (birden fazla frame gerekirse)
-        # Şimdilik statik
-        features.extend([0] * 4)
+        # 16-17. Zaman serisi özellikleri (izlenen hedefin mikro-Doppler
+        # spektrogramından): Doppler bant genişliği, hız zarfı
+        features.extend(micro_doppler if micro_doppler is not None else [0] * 2)
 
         return np.array(features)
 
-    def generate_synthetic_data(self, num_samples_per_class=200):
+    def generate_synthetic_data(self, num_samples_per_class=TRAINING_PARAMS['samples_per_class']):
         """
         Eğitim için sentetik veri üret
         (Gerçek veri toplanana kadar)
@@ -147,87 +179,95 @@ class ActivityClassifier:
         X = []
         y = []
 
-        np.random.seed(42)
-
+        np.random.seed(TRAINING_PARAMS['seed'])
+        uniform = np.random.uniform
+
+        # Aralıklar demo zincirinde ölçülmüştür (scene_simulator.activity_scene,
+        # boş odada öğrenilmiş clutter, 1-10 Hz frame hızı). Mesafe ve hız
+        # ortalaması tüm sınıflarda aynı aralıktadır: sınıf kişinin odadaki
+        # konumundan değil yansıma gücü ve mikro-hareketten ayırt edilir.
+        # Clutter çıkarıldıktan sonra durağan kişi, solunum yan bantlarında
+        # birkaç küme olarak görünür. Enerji ve mesafe profili seviyeleri
+        # gürültü tabanına göredir (kazançtan bağımsız); SNR ve mikro-Doppler
+        # aralıkları ise simülatörün sahnelerine aittir.
         for class_id in range(5):
             for _ in range(num_samples_per_class):
+                common = [
+                    uniform(2, 7),  # mesafe
+                    uniform(0.1, 5),  # küme mesafe sapması
+                    uniform(-3, 3),  # yan bantlar simetrik: ortalama hız ~0
+                    uniform(0.3, 9),
+                ]
+
                 if class_id == 0:  # Yok
-                    features = [0] * 19  # Tüm özellikler sıfır
+                    features = [0] * len(FEATURE_NAMES)  # Tüm özellikler sıfır
 
                 elif class_id == 1:  # Oturma
                     features = [
-                        1,  # 1 hedef
-                        np.random.uniform(2, 6),  # mesafe 2-6m
-                        0.1,  # düşük mesafe sapması
-                        np.random.uniform(-0.1, 0.1),  # çok düşük hız
-                        0.05,  # düşük hız sapması
-                        np.random.uniform(10, 20),  # SNR
-                        np.random.uniform(8, 18),
-                        np.random.uniform(-10, -5),  # yüksek düşük hız enerjisi
-                        np.random.uniform(-20, -15),
-                        np.random.uniform(-30, -25),
-                        np.random.uniform(0.6, 0.8),  # yüksek mikro-Doppler oranı
-                        0.2, 0.1,  # düşük dağılım
-                        np.random.randint(20, 50),
-                        np.random.uniform(-5, 0),
-                        0, 0, 0, 0
+                        np.random.randint(3, 7),
+                        *common,
+                        uniform(46, 49.8),  # orta SNR
+                        uniform(32, 45),
+                        uniform(-1, 0.2),
+                        uniform(-1.25, -0.6),
+                        uniform(-1.05, -0.83),
+                        uniform(0, 1.1),
+                        uniform(0.2, 13), uniform(0.7, 23),
+                        np.random.randint(0, 126),
+                        uniform(0.3, 1.5),
+                        uniform(0.12, 0.22),  # dar Doppler bandı
+                        uniform(0.3, 9)  # iz başında zarf gürültülü
                     ]
 
                 elif class_id == 2:  # Ayakta
                     features = [
-                        1,
-                        np.random.uniform(2, 6),
-                        0.1,
-                        np.random.uniform(-0.2, 0.2),  # biraz daha fazla hareket
-                        0.1,
-                        np.random.uniform(12, 22),
-                        np.random.uniform(10, 20),
-                        np.random.uniform(-12, -7),
-                        np.random.uniform(-22, -17),
-                        np.random.uniform(-32, -27),
-                        np.random.uniform(0.5, 0.7),
-                        0.3, 0.2,
-                        np.random.randint(20, 50),
-                        np.random.uniform(-3, 2),
-                        0, 0, 0, 0
+                        np.random.randint(3, 8),
+                        *common,
+                        uniform(50.5, 55),  # dik gövde: en yüksek SNR
+                        uniform(35, 50),
+                        uniform(-0.5, 0.7),
+                        uniform(-1.2, -0.7),
+                        uniform(-1.1, -0.85),
+                        uniform(0.4, 1.55),
+                        uniform(0.2, 13), uniform(0.7, 23),
+                        np.random.randint(0, 126),
+                        uniform(0.35, 1.7),
+                        uniform(0.16, 0.24),
+                        uniform(0.45, 9)  # gövde salınımı
                     ]
 
                 elif class_id == 3:  # Yürüme
                     features = [
-                        np.random.randint(1, 3),  # 1-2 hedef
-                        np.random.uniform(2, 8),
-                        0.5,
-                        np.random.uniform(0.5, 2.0),  # belirgin hız
-                        0.3,
-                        np.random.uniform(15, 25),
-                        np.random.uniform(12, 22),
-                        np.random.uniform(-15, -10),  # orta düşük hız enerjisi
-                        np.random.uniform(-12, -8),  # yüksek orta hız enerjisi
-                        np.random.uniform(-25, -20),
-                        np.random.uniform(0.3, 0.5),
-                        0.8, 0.6,
-                        np.random.randint(30, 70),
-                        np.random.uniform(0, 5),
-                        0, 0, 0, 0
+                        np.random.randint(7, 12),  # uzuvlar ayrı kümeler
+                        *common,
+                        uniform(44, 50),
+                        uniform(24, 36),  # zayıf uzuv kümeleri
+                        uniform(-0.4, 0.55),
+                        uniform(-1.15, -0.6),
+                        uniform(-1.06, -0.83),
+                        uniform(0.45, 1.4),
+                        uniform(0.5, 13), uniform(2, 25),
+                        np.random.randint(13, 40),
+                        uniform(1.4, 3.3),  # uzuvlar mesafe profiline yayılır
+                        uniform(0.2, 0.6),  # geniş Doppler bandı
+                        uniform(0.5, 4)  # kol/bacak hız zarfı
                     ]
 
                 elif class_id == 4:  # Yatma
                     features = [
-                        1,
-                        np.random.uniform(2, 7),
-                        0.2,
-                        np.random.uniform(-0.05, 0.05),  # minimal hareket
-                        0.02,
-                        np.random.uniform(8, 15),  # düşük SNR (yatay)
-                        np.random.uniform(6, 13),
-                        np.random.uniform(-8, -3),
-                        np.random.uniform(-25, -20),
-                        np.random.uniform(-35, -30),
-                        np.random.uniform(0.7, 0.9),  # çok yüksek mikro-Doppler
-                        0.5, 0.05,
-                        np.random.randint(15, 45),
-                        np.random.uniform(-8, -3),
-                        0, 0, 0, 0
+                        np.random.randint(3, 7),
+                        *common,
+                        uniform(39.5, 42.5),  # düşük SNR (yatay)
+                        uniform(26, 35),
+                        uniform(-1.15, -0.15),
+                        uniform(-1.15, -0.7),
+                        uniform(-1.05, -0.8),
+                        uniform(-0.2, 0.7),
+                        uniform(0.2, 13), uniform(0.7, 23),
+                        np.random.randint(0, 126),
+                        uniform(0.3, 1.25),
+                        uniform(0.2, 0.6),
+                        uniform(0.5, 9)  # zayıf yankıda solunum izi gürültülü
                     ]
 
                 X.append(features)
@@ -235,12 +275,14 @@ class ActivityClassifier:
 
         return np.array(X), np.array(y)
 
-    def train(self, X=None, y=None, save_path='activity_model.pkl'):
+    def train(self, X=None, y=None, save_path='activity_model.pkl', plot=True):
         """
         Modeli eğit
 
         X: Özellik matrisi (N, num_features)
         y: Etiketler (N,)
+        save_path: Model dosyası (None: kaydetme)
+        plot: Confusion matrix görselini kaydet
         """
         if X is None or y is None:
             print("Sentetik veri üretiliyor...")
@@ -251,16 +293,17 @@ class ActivityClassifier:
 
         # Train/test split
         X_train, X_test, y_train, y_test = train_test_split(
-            X_scaled, y, test_size=0.2, random_state=42, stratify=y
+            X_scaled, y, test_size=TRAINING_PARAMS['test_size'],
+            random_state=TRAINING_PARAMS['random_state'], stratify=y
         )
 
         # Model eğit
         print("Model eğitiliyor...")
         self.model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=10,
-            min_samples_split=5,
-            random_state=42
+            n_estimators=TRAINING_PARAMS['n_estimators'],
+            max_depth=TRAINING_PARAMS['max_depth'],
+            min_samples_split=TRAINING_PARAMS['min_samples_split'],
+            random_state=TRAINING_PARAMS['random_state']
         )
         self.model.fit(X_train, y_train)
 
@@ -277,55 +320,87 @@ class ActivityClassifier:
                                    target_names=list(self.ACTIVITY_LABELS.values())))
 
         # Confusion matrix
-        cm = confusion_matrix(y_test, y_pred)
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-                   xticklabels=list(self.ACTIVITY_LABELS.values()),
-                   yticklabels=list(self.ACTIVITY_LABELS.values()))
-        plt.ylabel('Gerçek')
-        plt.xlabel('Tahmin')
-        plt.title('Confusion Matrix')
-        plt.tight_layout()
-        plt.savefig('confusion_matrix.png', dpi=150)
-        print("✓ Confusion matrix kaydedildi: confusion_matrix.png")
+        if plot:
+            # Yalnızca grafik için gerekli; sunucu başlangıcında yüklenmez
+            import matplotlib.pyplot as plt
+            import seaborn as sns
+
+            cm = confusion_matrix(y_test, y_pred)
+            plt.figure(figsize=(10, 8))
+            sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
+                       xticklabels=list(self.ACTIVITY_LABELS.values()),
+                       yticklabels=list(self.ACTIVITY_LABELS.values()))
+            plt.ylabel('Gerçek')
+            plt.xlabel('Tahmin')
+            plt.title('Confusion Matrix')
+            plt.tight_layout()
+            plt.savefig('confusion_matrix.png', dpi=150)
+            plt.close()
+            print("✓ Confusion matrix kaydedildi: confusion_matrix.png")
 
         # Modeli kaydet
-        with open(save_path, 'wb') as f:
-            pickle.dump({
-                'model': self.model,
-                'scaler': self.scaler
-            }, f)
-        print(f"✓ Model kaydedildi: {save_path}")
+        if save_path is not None:
+            self.save(save_path)
 
         return accuracy
 
+    def save(self, model_path, **metadata):
+        """
+        Modeli kaydet (metadata: dosyaya eklenecek ek alanlar)
+
+        Geçici dosyaya yazılıp yeniden adlandırılır: aynı anda okuyan süreç
+        (işçiler, başka sunucu) yarım dosya görmez.
+        """
+        temp = f'{model_path}.{os.getpid()}.tmp'
+        with open(temp, 'wb') as f:
+            pickle.dump(dict(metadata, model=self.model, scaler=self.scaler), f)
+        os.replace(temp, model_path)
+        print(f"✓ Model kaydedildi: {model_path}")
+
     def load(self, model_path='activity_model.pkl'):
-        """Kaydedilmiş modeli yükle"""
+        """Kaydedilmiş modeli yükle; dosyadaki tüm alanları döndürür"""
         with open(model_path, 'rb') as f:
             data = pickle.load(f)
             self.model = data['model']
             self.scaler = data['scaler']
         print(f"✓ Model yüklendi: {model_path}")
+        return data
 
+    @timed('predict')
     def predict(self, features):
         """
         Aktivite tahmini yap
 
         features: Özellik vektörü
         return: (class_id, class_name, confidence)
+
+        cache tanımlıysa önce nicemlenmiş özellik vektörü aranır; isabette
+        model çalışmadan önbellekteki tahmin döner.
         """
         if self.model is None:
             raise ValueError("Model henüz yüklenmedi veya eğitilmedi!")
 
+        cache = self.cache
+        if cache is not None:
+            prediction = cache.get(features)
+            if prediction is not None:
+                return prediction
+            start = time.perf_counter()
+
         # Normalize
-        features_scaled = self.scaler.transform(features.reshape(1, -1))
+        with TRACER.span('scaler_transform'):
+            features_scaled = self.scaler.transform(features.reshape(1, -1))
 
         # Tahmin
-        pred_class = self.model.predict(features_scaled)[0]
-        pred_proba = self.model.predict_proba(features_scaled)[0]
+        with TRACER.span('model_predict'):
+            pred_class = self.model.predict(features_scaled)[0]
+            pred_proba = self.model.predict_proba(features_scaled)[0]
         confidence = pred_proba[pred_class]
 
-        return pred_class, self.ACTIVITY_LABELS[pred_class], confidence
+        prediction = (pred_class, self.ACTIVITY_LABELS[pred_class], confidence)
+        if cache is not None:
+            cache.put(features, prediction, time.perf_counter() - start)
+        return prediction
 
 def main():
     """Test ve eğitim"""
@@ -347,27 +422,32 @@ def main():
     test_cases = [
         {
             'name': 'Boş Oda',
-            'features': np.array([0] * 19)
+            'activity': 'Yok',
+            'features': np.zeros(len(FEATURE_NAMES))
         },
         {
             'name': 'Oturan Kişi',
-            'features': np.array([1, 3.5, 0.1, 0.05, 0.05, 15, 13, -7, -18, -28,
-                                 0.7, 0.2, 0.1, 35, -2, 0, 0, 0, 0])
+            'activity': 'Oturma',
+            'features': np.array([4, 3.5, 0.9, 0.1, 2, 48, 41, -0.4, -0.9, -0.94,
+                                 0.5, 2, 5, 40, 0.8, 0.17, 0.4])
         },
         {
             'name': 'Ayakta Duran Kişi',
-            'features': np.array([1, 4.0, 0.1, 0.15, 0.1, 18, 16, -9, -19, -29,
-                                 0.6, 0.3, 0.2, 38, 0, 0, 0, 0, 0])
+            'activity': 'Ayakta',
+            'features': np.array([4, 4.2, 0.8, 0.1, 2, 53, 45, 0.1, -0.95, -0.97,
+                                 1.0, 2, 5, 38, 0.9, 0.2, 0.6])
         },
         {
             'name': 'Yürüyen Kişi',
-            'features': np.array([2, 5.0, 0.5, 1.2, 0.3, 20, 18, -12, -10, -22,
-                                 0.4, 0.8, 0.6, 50, 3, 0, 0, 0, 0])
+            'activity': 'Yürüme',
+            'features': np.array([9, 4.1, 0.8, 0.1, 1.8, 47, 30, 0.1, -0.85, -0.94,
+                                 0.9, 2.5, 6, 26, 2.3, 0.4, 2])
         },
         {
             'name': 'Yatan Kişi',
-            'features': np.array([1, 4.5, 0.2, 0.03, 0.02, 10, 8, -5, -22, -32,
-                                 0.8, 0.5, 0.05, 30, -5, 0, 0, 0, 0])
+            'activity': 'Yatma',
+            'features': np.array([4, 4.8, 0.7, 0.1, 1.6, 41, 32, -0.65, -0.93, -0.92,
+                                 0.25, 1.7, 4, 50, 0.7, 0.35, 4])
         }
     ]
 
@@ -376,9 +456,7 @@ def main():
         print(f"\nSenaryo: {test['name']}")
         print(f"  Tahmin: {pred_name}")
         print(f"  Güven: {confidence * 100:.1f}%")
-        print(f"  {'✓ Doğru' if pred_name.lower() in test['name'].lower() or
-                                   (pred_name == 'Yok' and 'Boş' in test['name'])
-                                   else '✗ Yanlış'}")
+        print(f"  {'✓ Doğru' if pred_name == test['activity'] else '✗ Yanlış'}")
 
 if __name__ == '__main__':
     main()
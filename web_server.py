@@ -4,222 +4,61 @@ PlutoSDR Varlık Sensörü Web Sunucusu
 Flask + SocketIO ile gerçek zamanlı görselleştirme
 """
 
-from flask import Flask, render_template, jsonify, request, send_file
-from flask_socketio import SocketIO, emit
+from flask import Flask, jsonify, request, send_file, Response
+from flask_socketio import SocketIO, emit, join_room, leave_room
 from flask_cors import CORS
-import numpy as np
-import json
+import os
 import time
-import threading
+import atexit
 from datetime import datetime
-import io
-import base64
-from PIL import Image
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-
-# Kendi modüllerimiz (varsayalım ki aynı dizinde)
-try:
-    from signal_processor import FMCWProcessor, KalmanTracker
-    from train_model import ActivityClassifier
-except:
-    print("UYARI: signal_processor veya train_model modülleri bulunamadı.")
-    print("Bu demo modu çalışıyor.")
+
+# Kendi modüllerimiz (aynı dizinde)
+from rd_render import render_range_doppler_png
+from history_store import to_json_columns
+from metrics import stage_timer, generate_latest, CONNECTED_CLIENTS
+from tracing import TRACER
+from sensor_pipeline import SensorManager, SharedResources, ACTIVITY_LABELS
+from event_log import EventLog
+from capture_recorder import MAX_FRAMES_PER_FILE
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'pluto-sensor-secret-2025'
 CORS(app)
 socketio = SocketIO(app, cors_allowed_origins="*")
 
-# Global değişkenler
-radar_active = False
-current_state = {
-    'targets': [],
-    'activity': 'Yok',
-    'confidence': 0.0,
-    'timestamp': None,
-    'range_doppler_image': None
-}
-statistics = {
-    'total_detections': 0,
-    'activities': {label: 0 for label in ['Yok', 'Oturma', 'Ayakta', 'Yürüme', 'Yatma']},
-    'start_time': None
-}
-
-# Radar thread
-radar_thread = None
-
-def radar_loop():
-    """Ana radar döngüsü (simülasyon veya gerçek)"""
-    global radar_active, current_state, statistics
-
-    print("Radar döngüsü başlatıldı...")
-
-    # Demo modu kontrolü
-    demo_mode = True
-    try:
-        import adi
-        # PlutoSDR bağlantısını kontrol et
-        # Bu kısım gerçek donanım varsa demo_mode'u False yapar
-        # Ancak şimdilik güvenli olması için demo_mode = True bırakıyoruz
-        # Kullanıcı donanımı bağladığında burayı manuel olarak değiştirebilir
-        # sdr = adi.Pluto("ip:192.168.2.1")
-        # demo_mode = False
-        pass
-    except:
-        print("PlutoSDR kütüphaneleri veya cihaz bulunamadı, Demo modu aktif.")
-        demo_mode = True
-
-    if demo_mode:
-        print("DEMO MODU: Simüle edilmiş veri kullanılıyor")
-
-        activities = ['Yok', 'Oturma', 'Ayakta', 'Yürüme', 'Yatma']
-        activity_index = 0
-
-        while radar_active:
-            # Simüle edilmiş hedef ve aktivite
-            activity = activities[activity_index % len(activities)]
-
-            if activity == 'Yok':
-                targets = []
-            elif activity == 'Oturma':
-                targets = [{
-                    'distance': 3.2 + np.random.randn() * 0.1,
-                    'velocity': 0.05 + np.random.randn() * 0.02,
-                    'snr': 15 + np.random.randn() * 2
-                }]
-            elif activity == 'Ayakta':
-                targets = [{
-                    'distance': 4.0 + np.random.randn() * 0.15,
-                    'velocity': 0.1 + np.random.randn() * 0.05,
-                    'snr': 17 + np.random.randn() * 2
-                }]
-            elif activity == 'Yürüme':
-                targets = [{
-                    'distance': 3.5 + np.random.randn() * 0.5,
-                    'velocity': 1.2 + np.random.randn() * 0.3,
-                    'snr': 20 + np.random.randn() * 2
-                }]
-            elif activity == 'Yatma':
-                targets = [{
-                    'distance': 4.5 + np.random.randn() * 0.2,
-                    'velocity': 0.02 + np.random.randn() * 0.01,
-                    'snr': 10 + np.random.randn() * 2
-                }]
-
-            confidence = 0.75 + np.random.rand() * 0.2
-
-            # Durumu güncelle
-            current_state = {
-                'targets': targets,
-                'activity': activity,
-                'confidence': float(confidence),
-                'timestamp': datetime.now().isoformat(),
-                'range_doppler_image': generate_demo_image()
-            }
-
-            # İstatistikleri güncelle
-            statistics['total_detections'] += len(targets)
-            statistics['activities'][activity] += 1
-
-            # WebSocket ile gönder
-            socketio.emit('radar_update', current_state)
-
-            # Aktiviteyi değiştir
-            activity_index += 1
-
-            time.sleep(1.0)  # 1 Hz güncelleme
+def emit_update(state, room):
+    """Sensör güncellemesini yalnızca o sensörün odasına gönder"""
+    with stage_timer('socketio_emit'):
+        socketio.emit('radar_update', state, to=room)
 
-    else:
-        # Gerçek PlutoSDR Döngüsü
-        print("PlutoSDR Modu Başlatılıyor...")
-        try:
-            # SDR Yapılandırması
-            import adi
-            sdr = adi.Pluto("ip:192.168.2.1")
-
-            # Config
-            config = {
-                'sample_rate': 2e6,
-                'chirp_bandwidth': 100e6,
-                'chirp_duration': 1e-3,
-                'num_chirps': 128,
-                'num_samples': 256,
-                'center_freq': 2.45e9,
-                'tx_power': -30
-            }
-
-            # SDR Ayarları
-            sdr.sample_rate = int(config['sample_rate'])
-            sdr.rx_rf_bandwidth = int(config['sample_rate'])
-            sdr.rx_lo = int(config['center_freq'])
-            sdr.tx_lo = int(config['center_freq'])
-            sdr.tx_cyclic_buffer = True
-            sdr.rx_buffer_size = config['num_chirps'] * config['num_samples']
-
-            # Processor ve Classifier
-            processor = FMCWProcessor(config)
-            classifier = ActivityClassifier()
-            try:
-                classifier.load('activity_model.pkl')
-            except:
-                print("Model yüklenemedi, yeniden eğitiliyor...")
-                classifier.train()
-
-            # TX Sinyali (Basit chirp)
-            # Not: Gerçek FMCW için sinyal üretimi daha karmaşık olabilir
-            # Burada basitlik adına sabit kalıyoruz
-
-            while radar_active:
-                # Veri al
-                rx_data = sdr.rx()
-                # Reshape: (num_chirps, num_samples)
-                # Not: Bu kısım donanım buffer yapısına göre değişebilir
-
-                # İşleme (Sanal kod, donanım olmadan test edilemez)
-                # range_doppler_db = processor.process_frame(rx_data_reshaped)
-                # detections = processor.cfar_detector(range_doppler_db)
-                # clusters = processor.cluster_detections(detections)
-
-                # features = classifier.extract_features(range_doppler_db, clusters)
-                # pred_class, pred_name, confidence = classifier.predict(features)
-
-                # WebSocket güncelle...
-                pass
-
-        except Exception as e:
-            print(f"Hata oluştu: {e}")
-            print("Demo moduna geçiliyor...")
-            # Demo moduna fallback yapılabilir
-
-def generate_demo_image():
-    """Demo Range-Doppler görüntüsü üret"""
-    fig, ax = plt.subplots(figsize=(8, 6))
-
-    # Random Range-Doppler haritası
-    rd_map = np.random.randn(64, 128) * 5 - 20
-
-    # Birkaç hedef ekle
-    rd_map[32, 30] = 10  # Merkez
-    rd_map[28, 50] = 5   # Biraz sağda
-
-    im = ax.imshow(rd_map, aspect='auto', cmap='jet',
-                   extent=[0, 10, -2, 2], origin='lower')
-    ax.set_xlabel('Mesafe (m)')
-    ax.set_ylabel('Hız (m/s)')
-    ax.set_title('Range-Doppler Haritası')
-    plt.colorbar(im, ax=ax, label='Güç (dB)')
-
-    # PNG'ye çevir
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-    buf.seek(0)
-    plt.close(fig)
-
-    # Base64 encode
-    img_base64 = base64.b64encode(buf.read()).decode('utf-8')
-    return img_base64
+# Ham IQ kayıtları yalnızca bu dizinin altına yazılır
+CAPTURE_ROOT = 'captures'
+
+# Kalıcı olay kaydı: PLUTO_EVENT_DB boş verilirse kapalı
+event_log = None
+if os.environ.get('PLUTO_EVENT_DB', 'data/events.db'):
+    event_log = EventLog(os.environ.get('PLUTO_EVENT_DB', 'data/events.db'))
+    event_log.start()
+
+# Sensörler (model ve görüntü oluşturucu tüm sensörlerde ortak)
+shared_resources = SharedResources(render_image=render_range_doppler_png,
+                                   image_cache_size=int(os.environ.get('PLUTO_IMAGE_CACHE', 64)),
+                                   event_log=event_log)
+# Model arka planda yüklenir/eğitilir; sensörler bu sırada yedek modelle çalışır
+shared_resources.models.start()
+sensors = SensorManager(shared_resources, emit_update)
+sensors.load(os.environ.get('PLUTO_SENSORS', 'config/sensors.json'))
+
+def shutdown():
+    """Önce boru hatları (son olay segmentleri yazılır), sonra havuz ve olay kaydı"""
+    sensors.shutdown()
+    shared_resources.shutdown()
+
+atexit.register(shutdown)
+
+# Frame izleme: PLUTO_TRACE_MS verilirse bu eşiği aşan frame'ler saklanır
+if os.environ.get('PLUTO_TRACE_MS'):
+    TRACER.configure(enabled=True, threshold=float(os.environ['PLUTO_TRACE_MS']) / 1000)
 
 # Web API Endpoints
 @app.route('/')
@@ -227,84 +66,337 @@ def index():
     """Ana sayfa - dashboard HTML döndür"""
     return send_file('dashboard.html')
 
-@app.route('/api/status')
-def get_status():
-    """Sistem durumunu döndür"""
+@app.route('/api/sensors')
+def list_sensors():
+    """Tanımlı sensörleri listele"""
     return jsonify({
-        'radar_active': radar_active,
-        'current_state': current_state,
-        'statistics': statistics
+        'default': sensors.default_id,
+        'sensors': [pipeline.summary() for pipeline in sensors]
     })
 
-@app.route('/api/start', methods=['POST'])
-def start_radar():
-    """Radar'ı başlat"""
-    global radar_active, radar_thread, statistics
+def unknown_sensor(sensor_id):
+    return jsonify({'success': False, 'message': f'Bilinmeyen sensör: {sensor_id}'}), 404
 
-    if not radar_active:
-        radar_active = True
-        statistics['start_time'] = datetime.now().isoformat()
+def invalid_parameter():
+    return jsonify({'success': False, 'message': 'Geçersiz parametre'}), 400
 
-        radar_thread = threading.Thread(target=radar_loop)
-        radar_thread.daemon = True
-        radar_thread.start()
+def time_window(default_window=3600):
+    """İstekteki start/end (unix zamanı) veya window (saniye) parametreleri"""
+    end = float(request.args.get('end', time.time()))
+    if 'start' in request.args:
+        start = float(request.args['start'])
+    else:
+        start = end - float(request.args.get('window', default_window))
+    return start, end
 
+# Sensörsüz yollar varsayılan sensöre yönlendirilir
+@app.route('/api/status', defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/status')
+def get_status(sensor_id):
+    """Sistem durumunu döndür"""
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return unknown_sensor(sensor_id)
+    return jsonify(pipeline.get_status())
+
+@app.route('/api/start', methods=['POST'], defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/start', methods=['POST'])
+def start_radar(sensor_id):
+    """Radar'ı başlat"""
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return unknown_sensor(sensor_id)
+
+    if pipeline.start():
         return jsonify({'success': True, 'message': 'Radar başlatıldı'})
     else:
         return jsonify({'success': False, 'message': 'Radar zaten aktif'})
 
-@app.route('/api/stop', methods=['POST'])
-def stop_radar():
+@app.route('/api/stop', methods=['POST'], defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/stop', methods=['POST'])
+def stop_radar(sensor_id):
     """Radar'ı durdur"""
-    global radar_active
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return unknown_sensor(sensor_id)
 
-    if radar_active:
-        radar_active = False
+    if pipeline.stop():
         return jsonify({'success': True, 'message': 'Radar durduruldu'})
     else:
         return jsonify({'success': False, 'message': 'Radar zaten durmuş'})
 
-@app.route('/api/statistics')
-def get_statistics():
+@app.route('/api/statistics', defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/statistics')
+def get_statistics(sensor_id):
     """İstatistikleri döndür"""
-    return jsonify(statistics)
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return unknown_sensor(sensor_id)
+    return jsonify(pipeline.statistics)
+
+@app.route('/api/history', defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/history')
+def get_history(sensor_id):
+    """
+    Zaman penceresini örnek azaltılmış olarak döndür
+
+    Parametreler: start, end (unix zamanı) veya window (saniye, varsayılan 3600),
+    points (maksimum nokta sayısı, varsayılan 500)
+    """
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return unknown_sensor(sensor_id)
 
-@app.route('/api/config', methods=['GET', 'POST'])
-def config():
+    try:
+        start, end = time_window()
+        points = min(int(request.args.get('points', 500)), 5000)
+    except ValueError:
+        return invalid_parameter()
+
+    history = pipeline.history
+    columns = to_json_columns(history.query(start, end, points))
+    columns['activity'] = [ACTIVITY_LABELS[i] for i in columns['activity']]
+    return jsonify({
+        'sensor_id': pipeline.sensor_id,
+        'start': start,
+        'end': end,
+        'points': len(columns['timestamp']),
+        'info': history.get_info(),
+        'series': columns
+    })
+
+def event_query(sensor_id):
+    """Olay sorgusu ön kontrolü: (pipeline, (start, end), hata yanıtı veya None)"""
+    if event_log is None:
+        return None, None, (jsonify({'success': False, 'message': 'Olay kaydı kapalı'}), 503)
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return None, None, unknown_sensor(sensor_id)
+    try:
+        return pipeline, time_window(), None
+    except ValueError:
+        return None, None, invalid_parameter()
+
+@app.route('/api/events/<kind>', defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/events/<kind>')
+def get_events(sensor_id, kind):
+    """
+    Kalıcı olay kaydı (en yeniden eskiye)
+
+    kind: activities (aktivite segmentleri), tracks (iz özetleri),
+    occupancy (doluluk örnekleri)
+    Parametreler: start, end veya window (varsayılan 3600), activity,
+    limit (varsayılan 1000)
+    """
+    tables = {'activities': 'activity', 'tracks': 'track', 'occupancy': 'occupancy'}
+    if kind not in tables:
+        return jsonify({'success': False, 'message': f'Bilinmeyen olay türü: {kind}'}), 404
+    pipeline, window, error = event_query(sensor_id)
+    if error is not None:
+        return error
+    start, end = window
+
+    activity = request.args.get('activity')
+    if activity is not None and activity not in ACTIVITY_LABELS:
+        return invalid_parameter()
+    try:
+        limit = min(int(request.args.get('limit', 1000)), 10000)
+    except ValueError:
+        return invalid_parameter()
+
+    events = event_log.query(tables[kind], pipeline.sensor_id, start, end, activity, limit)
+    return jsonify({
+        'sensor_id': pipeline.sensor_id,
+        'start': start,
+        'end': end,
+        'count': len(events),
+        'events': events
+    })
+
+@app.route('/api/events/summary', defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/events/summary')
+def get_event_summary(sensor_id):
+    """Aktivite başına süre/sayı/güven toplamları ve iz özeti (start, end, window)"""
+    pipeline, window, error = event_query(sensor_id)
+    if error is not None:
+        return error
+    start, end = window
+    return jsonify({
+        'sensor_id': pipeline.sensor_id,
+        'start': start,
+        'end': end,
+        'activities': event_log.activity_summary(pipeline.sensor_id, start, end),
+        'tracks': event_log.track_summary(pipeline.sensor_id, start, end),
+        'log': event_log.get_status()
+    })
+
+@app.route('/api/config', methods=['GET', 'POST'], defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/config', methods=['GET', 'POST'])
+def config(sensor_id):
     """Yapılandırma ayarları"""
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return unknown_sensor(sensor_id)
+
     if request.method == 'POST':
-        # Yapılandırma güncelle
-        config_data = request.json
-        # TODO: Konfigürasyonu kaydet
-        return jsonify({'success': True, 'message': 'Yapılandırma kaydedildi'})
+        # Yapılandırmayı doğrula ve canlı uygula (frame sınırında)
+        config_data = request.get_json(silent=True)
+        success, message, applied = pipeline.update_config(config_data)
+        if not success:
+            return jsonify({'success': False, 'message': 'Geçersiz yapılandırma',
+                            'errors': message}), 400
+        return jsonify({'success': True, 'message': message, 'applied': applied,
+                        'config': pipeline.get_config()})
     else:
         # Mevcut yapılandırmayı döndür
-        default_config = {
-            'sample_rate': 2e6,
-            'chirp_bandwidth': 100e6,
-            'chirp_duration': 1e-3,
-            'num_chirps': 128,
-            'center_freq': 2.45e9,
-            'tx_power': -30
-        }
-        return jsonify(default_config)
+        return jsonify(pipeline.get_config())
+
+def capture_directory(name):
+    """
+    İstemcinin verdiği kayıt dizini (CAPTURE_ROOT'a göre)
+
+    Mutlak yollar ve '..' ile CAPTURE_ROOT dışına çıkan dizinler reddedilir
+    return: Dizin yolu veya None
+    """
+    if not isinstance(name, str) or not name:
+        return None
+    root = os.path.abspath(CAPTURE_ROOT)
+    directory = os.path.normpath(os.path.join(root, name))
+    if os.path.isabs(name) or directory == root or \
+            os.path.commonpath([root, directory]) != root:
+        return None
+    return os.path.join(CAPTURE_ROOT, os.path.relpath(directory, root))
+
+@app.route('/api/capture/start', methods=['POST'], defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/capture/start', methods=['POST'])
+def start_capture(sensor_id):
+    """Ham IQ kaydını başlat"""
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return unknown_sensor(sensor_id)
+
+    options = request.get_json(silent=True) or {}
+    directory = capture_directory(options.get('directory', pipeline.sensor_id))
+    if directory is None:
+        return jsonify({'success': False,
+                        'message': f'Kayıt dizini {CAPTURE_ROOT}/ altında olmalı'}), 400
+    frames_per_file = options.get('frames_per_file', 600)
+    if (isinstance(frames_per_file, bool) or not isinstance(frames_per_file, int) or
+            not 1 <= frames_per_file <= MAX_FRAMES_PER_FILE):
+        return jsonify({'success': False,
+                        'message': f'frames_per_file 1-{MAX_FRAMES_PER_FILE} arası '
+                                   f'tam sayı olmalı'}), 400
+    success, message = pipeline.start_capture(directory, frames_per_file=frames_per_file)
+    return jsonify({'success': success, 'message': message})
+
+@app.route('/api/capture/stop', methods=['POST'], defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/capture/stop', methods=['POST'])
+def stop_capture(sensor_id):
+    """Ham IQ kaydını durdur"""
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return unknown_sensor(sensor_id)
+
+    success, message, status = pipeline.stop_capture()
+    response = {'success': success, 'message': message}
+    if status is not None:
+        response['status'] = status
+    return jsonify(response)
+
+@app.route('/api/capture/status', defaults={'sensor_id': None})
+@app.route('/api/sensors/<sensor_id>/capture/status')
+def capture_status(sensor_id):
+    """Kayıt durumunu döndür"""
+    pipeline = sensors.get(sensor_id)
+    if pipeline is None:
+        return unknown_sensor(sensor_id)
+
+    if pipeline.capture_recorder is None:
+        return jsonify({'active': False})
+    return jsonify(pipeline.capture_recorder.get_status())
+
+@app.route('/api/frame/<image_id>.png')
+def get_frame_image(image_id):
+    """Önbellekteki Range-Doppler görüntüsü (içerik adresli, değişmez)"""
+    png = shared_resources.image_cache.get(image_id)
+    if png is None:
+        return jsonify({'success': False, 'message': 'Görüntü önbellekte yok'}), 404
+    response = Response(png, mimetype='image/png')
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    response.set_etag(image_id)
+    return response.make_conditional(request)
+
+@app.route('/metrics')
+def get_metrics():
+    """Prometheus formatında performans metrikleri"""
+    return Response(generate_latest(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/trace')
+def get_trace():
+    """Saklanan yavaş frame'ler (Chrome/Perfetto trace JSON)"""
+    response = jsonify(TRACER.chrome_trace())
+    response.headers['Content-Disposition'] = \
+        f'attachment; filename=radar_trace_{datetime.now():%Y%m%d_%H%M%S}.json'
+    return response
+
+@app.route('/api/trace/status')
+def trace_status():
+    """İzleme durumu"""
+    return jsonify(TRACER.get_status())
+
+@app.route('/api/trace', methods=['POST'])
+def configure_trace():
+    """İzlemeyi aç/kapat: {"enabled": true, "threshold_ms": 150, "clear": false}"""
+    data = request.get_json(silent=True) or {}
+    try:
+        threshold = data.get('threshold_ms')
+        TRACER.configure(enabled=data.get('enabled'),
+                         threshold=None if threshold is None else float(threshold) / 1000)
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'threshold_ms sayı olmalı'}), 400
+    if data.get('clear'):
+        TRACER.clear()
+    return jsonify({'success': True, **TRACER.get_status()})
 
 # WebSocket Events
 @socketio.on('connect')
 def handle_connect():
     """WebSocket bağlantısı"""
     print(f"Client bağlandı: {request.sid}")
-    emit('connected', {'message': 'PlutoSDR Sensor\'e bağlandınız'})
+    CONNECTED_CLIENTS.inc()
+    # Varsayılan sensörün odasına otomatik katıl
+    join_room(sensors.get().room)
+    emit('connected', {'message': 'PlutoSDR Sensor\'e bağlandınız',
+                       'sensor_id': sensors.default_id,
+                       'sensors': list(sensors.pipelines)})
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """WebSocket bağlantısı kesildi"""
     print(f"Client ayrıldı: {request.sid}")
+    CONNECTED_CLIENTS.dec()
+
+@socketio.on('join_sensor')
+def handle_join_sensor(data):
+    """Bir sensörün güncellemelerine abone ol"""
+    pipeline = sensors.get((data or {}).get('sensor_id'))
+    if pipeline is not None:
+        join_room(pipeline.room)
+        emit('radar_update', pipeline.current_state)
+
+@socketio.on('leave_sensor')
+def handle_leave_sensor(data):
+    """Sensör aboneliğini bırak"""
+    pipeline = sensors.get((data or {}).get('sensor_id'))
+    if pipeline is not None:
+        leave_room(pipeline.room)
 
 @socketio.on('request_update')
-def handle_request_update():
+def handle_request_update(data=None):
     """Anlık durum güncellemesi talep et"""
-    emit('radar_update', current_state)
+    pipeline = sensors.get((data or {}).get('sensor_id'))
+    if pipeline is not None:
+        emit('radar_update', pipeline.current_state)
 
 def main():
     """Ana fonksiyon"""
@@ -313,13 +405,14 @@ def main():
     print("=" * 60)
     print()
     print("Sunucu başlatılıyor...")
-    print("Dashboard adresi: http://localhost:5000")
+    port = int(os.environ.get('PLUTO_PORT', 5000))
+    print(f"Dashboard adresi: http://localhost:{port}")
     print()
     print("CTRL+C ile durdurun")
     print("=" * 60)
 
     # Sunucuyu başlat
-    socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True)
+    socketio.run(app, host='0.0.0.0', port=port, debug=False, allow_unsafe_werkzeug=True)
 
 if __name__ == '__main__':
     main()